@@ -0,0 +1,156 @@
+import functools
+import glob
+import hashlib
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import uuid
+
+from .utils import Pipe, Model, Seabed, System
+from .modes import (
+    write_in_place_input_file,
+    write_in_place_pp_file,
+    write_modal_inp,
+    write_modal_pp_file,
+    run_abaqus,
+    pp_abaqus,
+    process_in_place,
+    get_modes,
+)
+
+IN_PLACE_RESULTS = ["in_place_nodes.dat", "gaps.dat"]
+MODAL_RESULTS = ["modes.npy", "mode_*.dat", "freqs.dat"]
+
+
+class ResultCache:
+    def __init__(self, path, max_size=2**30):
+        self.path = Path(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def __getstate__(self):
+        return {"path": self.path, "max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_size"])
+
+    @staticmethod
+    def get_key(*parts):
+        h = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode()
+            h.update(len(part).to_bytes(8, "little"))
+            h.update(part)
+        return h.hexdigest()
+
+    def restore(self, key, model_path, patterns):
+        entry = Path(self.path, key)
+        if entry.is_dir():
+            files = _match(entry, patterns)
+            for f in files:
+                shutil.copyfile(Path(entry, f), Path(model_path, f))
+            # directory mtime is the LRU clock
+            os.utime(entry)
+            self._record("hit")
+            return True
+        self._record("miss")
+        return False
+
+    def store(self, key, model_path, patterns):
+        entry = Path(self.path, key)
+        if entry.is_dir():
+            return
+        tmp = Path(self.path, f".{key}.{uuid.uuid4().hex}")
+        tmp.mkdir()
+        for f in _match(model_path, patterns):
+            shutil.copyfile(Path(model_path, f), Path(tmp, f))
+        try:
+            tmp.rename(entry)
+        except OSError:
+            # another process stored the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        entries = [e for e in self.path.iterdir() if e.is_dir() and e.name[0] != "."]
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        sizes = {e: sum(f.stat().st_size for f in e.iterdir()) for e in entries}
+        total = sum(sizes.values())
+        for e in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(e, ignore_errors=True)
+            total -= sizes[e]
+
+    def get_stats(self):
+        entries = [e for e in self.path.iterdir() if e.is_dir() and e.name[0] != "."]
+        events = Path(self.path, "events.log")
+        log = events.read_text().split() if events.is_file() else []
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": log.count("hit"),
+            "total_misses": log.count("miss"),
+            "entries": len(entries),
+            "size": sum(f.stat().st_size for e in entries for f in e.iterdir()),
+        }
+
+    def _record(self, event):
+        if event == "hit":
+            self.hits += 1
+        else:
+            self.misses += 1
+        with open(Path(self.path, "events.log"), "a") as f:
+            f.write(event + "\n")
+
+
+def run_in_place(
+    cache: ResultCache, model_path, model: Model, pipe: Pipe, seabed: Seabed, system
+):
+    write_in_place_input_file(model_path, model, pipe, seabed)
+    write_in_place_pp_file(model_path)
+    key = get_deck_key(model_path, ["in_place.inp", "in_place_pp.py"], system)
+    if cache.restore(key, model_path, IN_PLACE_RESULTS):
+        return
+    run_abaqus(model_path, "in_place", system)
+    pp_abaqus(model_path, "in_place_pp.py", system, ["in_place_coords.npy"])
+    process_in_place(model_path, model)
+    cache.store(key, model_path, IN_PLACE_RESULTS)
+
+
+def run_modal(
+    cache: ResultCache, model_path, pipe: Pipe, seabed: Seabed, model: Model, system
+):
+    write_modal_inp(model_path, pipe, seabed, model)
+    write_modal_pp_file(model_path)
+    # modal.inp includes the in-place node file, so it is part of the deck
+    deck = ["modal.inp", "in_place_nodes.dat", "modal_pp.py"]
+    key = get_deck_key(model_path, deck, system)
+    if not cache.restore(key, model_path, MODAL_RESULTS):
+        run_abaqus(model_path, "modal", system)
+        pp_abaqus(model_path, "modal_pp.py", system, ["modes.npy", "freqs.dat"])
+        cache.store(key, model_path, MODAL_RESULTS)
+    return get_modes(model_path)
+
+
+def get_deck_key(model_path, files, system: System):
+    texts = [Path(model_path, f).read_bytes() for f in files]
+    return ResultCache.get_key(*texts, get_abaqus_version(system.abaqus_bat_path))
+
+
+@functools.lru_cache
+def get_abaqus_version(abaqus_bat_path):
+    p = subprocess.run(
+        [abaqus_bat_path, "information=release"], capture_output=True, text=True
+    )
+    return str(p.stdout)
+
+
+def _match(path, patterns):
+    return sorted(
+        {f for pattern in patterns for f in glob.glob(pattern, root_dir=path)}
+    )
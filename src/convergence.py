@@ -0,0 +1,216 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .utils import Pipe, Model, Seabed, System
+from .sweep import SweepCase, run_case, get_workers
+from .jobs import terminate_jobs
+
+# the high modes of a coarse mesh are far from converged, and rarely govern
+# VIV, so by default only the lowest modes of each direction are compared
+MODES_PER_DIRECTION = 2
+
+POLL_INTERVAL = 1.0
+
+
+@dataclass
+class ConvergenceResult:
+    element_lengths: list
+    frequencies: np.ndarray
+    changes: np.ndarray
+    element_length: float
+
+    def to_csv(self, path):
+        modes = self.frequencies.shape[1]
+        with open(path, "w") as f:
+            f.write(
+                ",".join(
+                    ["element_length", "change"] + [f"f{m+1}" for m in range(modes)]
+                )
+                + "\n"
+            )
+            for h, change, freqs in zip(
+                self.element_lengths, self.changes, self.frequencies
+            ):
+                values = [f"{h:g}", f"{change:.6e}"] + [f"{v:.6e}" for v in freqs]
+                f.write(",".join(values) + "\n")
+
+
+def cli(input_file_path, model_path=None):
+    import tomllib
+
+    from .survey import apply_survey
+
+    if model_path is None:
+        model_path = os.getcwd()
+
+    with open(Path(input_file_path), "rb") as i:
+        inputs = tomllib.load(i)
+    inputs = apply_survey(inputs, model_path)
+
+    convergence = inputs["Convergence"]
+    result = run_convergence(
+        model_path,
+        Model(**inputs["Model"]),
+        Pipe(**inputs["Pipe"]),
+        Seabed(**inputs["Seabed"]),
+        System(**inputs["System"]),
+        convergence["element_lengths"],
+        tolerance=convergence.get("tolerance", 0.01),
+        modes_per_direction=convergence.get("modes_per_direction", MODES_PER_DIRECTION),
+        max_cpus=convergence.get("max_cpus"),
+        max_tokens=convergence.get("max_tokens"),
+        in_place_solver=convergence.get("in_place_solver", "abaqus"),
+        modal_solver=convergence.get("modal_solver", "abaqus"),
+    )
+    result.to_csv(Path(model_path, "convergence.csv"))
+    return result
+
+
+def run_convergence(
+    model_path,
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    system: System,
+    element_lengths,
+    tolerance=0.01,
+    modes_per_direction=MODES_PER_DIRECTION,
+    max_cpus=None,
+    max_tokens=None,
+    in_place_solver="abaqus",
+    modal_solver="abaqus",
+):
+    lengths = sorted(set(element_lengths), reverse=True)
+    if len(lengths) < 2:
+        raise ValueError("A convergence study needs at least two element lengths")
+
+    cases = [
+        SweepCase(
+            f"element_length_{h:g}",
+            {"Model.element_length": h},
+            model._replace(element_length=h),
+            pipe,
+            seabed,
+            system,
+        )
+        for h in lengths
+    ]
+    workers = get_workers(
+        cases, max_cpus, max_tokens, "abaqus" in (in_place_solver, modal_solver)
+    )
+
+    frequencies = [None] * len(cases)
+    directions = [None] * len(cases)
+    # coarse meshes are submitted first, they are the cheapest to run, and no
+    # more than one wave of workers is queued so finer meshes are only started
+    # while the study has not converged
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {}
+
+        def submit(n):
+            case_path = Path(model_path, cases[n].name)
+            case_path.mkdir(parents=True, exist_ok=True)
+            future = pool.submit(
+                run_case, case_path, cases[n], in_place_solver, modal_solver
+            )
+            futures[future] = n
+
+        for n in range(workers):
+            submit(n)
+        submitted = workers
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                n = futures.pop(future)
+                freqs, dirs = future.result()
+                frequencies[n], directions[n] = np.asarray(freqs), list(dirs)
+            changes = get_changes(frequencies, directions, modes_per_direction)
+            if get_converged(changes, tolerance) is not None:
+                # finer meshes are no longer needed, those still queued are
+                # cancelled and the Abaqus jobs of those running terminated
+                for f in futures:
+                    f.cancel()
+                stop(futures, cases, model_path)
+                break
+            for _ in done:
+                if submitted < len(cases):
+                    submit(submitted)
+                    submitted += 1
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # results are only meaningful up to the first mesh not yet run
+    run = next((n for n, f in enumerate(frequencies) if f is None), len(frequencies))
+    changes = get_changes(frequencies[:run], directions[:run], modes_per_direction)
+    converged = get_converged(changes, tolerance)
+
+    modes = max(len(f) for f in frequencies[:run])
+    table = np.full((run, modes), np.nan)
+    for n, f in enumerate(frequencies[:run]):
+        table[n, : len(f)] = f
+
+    return ConvergenceResult(
+        lengths[:run],
+        table,
+        np.append(changes, np.nan)[:run],
+        None if converged is None else lengths[converged],
+    )
+
+
+def stop(futures, cases, model_path):
+    # a case may start its modal job after its in-place job was terminated,
+    # so running jobs are terminated until every case has stopped
+    while futures:
+        for future, n in futures.items():
+            if future.running():
+                terminate_jobs(Path(model_path, cases[n].name), cases[n].system)
+        done, _ = wait(futures, timeout=POLL_INTERVAL)
+        for future in done:
+            futures.pop(future)
+
+
+def get_changes(frequencies, directions, modes_per_direction=None):
+    changes = []
+    for n in range(len(frequencies) - 1):
+        coarse, fine = frequencies[n], frequencies[n + 1]
+        if coarse is None or fine is None:
+            changes.append(np.nan)
+            continue
+        pairs = get_mode_pairs(directions[n], directions[n + 1], modes_per_direction)
+        if not pairs:
+            changes.append(np.nan)
+            continue
+        c, f = np.array(pairs).T
+        changes.append(np.max(np.abs(coarse[c] - fine[f]) / fine[f]))
+    return np.array(changes)
+
+
+def get_mode_pairs(coarse, fine, modes_per_direction=None):
+    # modes of different directions swap order as the mesh is refined, so the
+    # n-th mode of each direction is compared with the n-th on the finer mesh
+    pairs = []
+    for d in dict.fromkeys(coarse):
+        pairs += list(
+            zip(
+                [i for i, c in enumerate(coarse) if c == d],
+                [i for i, f in enumerate(fine) if f == d],
+            )
+        )[:modes_per_direction]
+    return sorted(pairs)
+
+
+def get_converged(changes, tolerance):
+    # the coarsest mesh whose frequencies change by less than the tolerance
+    # on the next refinement
+    for n, change in enumerate(changes):
+        if np.isnan(change):
+            # a coarser pair is still running
+            return None
+        if change <= tolerance:
+            return n
+    return None
@@ -0,0 +1,309 @@
+import asyncio
+import atexit
+from collections import namedtuple
+import json
+import os
+from pathlib import Path
+import queue
+import re
+import subprocess
+import threading
+import time
+
+StaIncrement = namedtuple(
+    "StaIncrement",
+    "step increment attempt cutback severe_iterations equilibrium_iterations "
+    "total_iterations total_time step_time increment_size",
+)
+
+JobStatus = namedtuple("JobStatus", "increments completed errors diverging")
+
+TERMINATE_GRACE = 30
+
+# a worker that does not reply in this time is taken to have hung
+WORKER_TIMEOUT = 3600
+
+WORKER_SCRIPT = Path(__file__).with_name("pp_worker.py")
+
+WORKER_MARKER = "@@pp "
+
+STA_ROW = re.compile(
+    r"^\s*(\d+)\s+(\d+)\s+(\d+)(U?)\s+(\d+)\s+(\d+)\s+(\d+)"
+    r"\s+([-+.\dEe]+)\s+([-+.\dEe]+)\s+([-+.\dEe]+)"
+)
+
+
+class AbaqusError(Exception):
+    def __init__(self, jobname, message, status=None):
+        super().__init__(f"{jobname}: {message}")
+        self.jobname = jobname
+        self.status = status
+
+
+class JobFailed(AbaqusError):
+    pass
+
+
+class JobTimeout(AbaqusError):
+    pass
+
+
+class JobDiverged(AbaqusError):
+    pass
+
+
+class ScriptFailed(AbaqusError):
+    pass
+
+
+class MissingResults(AbaqusError):
+    pass
+
+
+class WorkerUnavailable(Exception):
+    pass
+
+
+class PostProcessingWorker:
+    def __init__(self, abaqus_bat_path):
+        try:
+            self.process = subprocess.Popen(
+                [abaqus_bat_path, "python", str(WORKER_SCRIPT)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+        except OSError as e:
+            raise WorkerUnavailable(str(e)) from e
+        # stdout is read on a thread, so a hung worker can be timed out on
+        # Windows pipes too
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, daemon=True).start()
+        self._read()
+
+    def run(self, model_path, script):
+        request = {"cwd": str(Path(model_path).resolve()), "script": script}
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            raise WorkerUnavailable(str(e)) from e
+        reply = self._read()
+        if not reply["ok"]:
+            raise ScriptFailed(script, reply["error"].strip().splitlines()[-1])
+
+    def close(self):
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write(json.dumps({"exit": True}) + "\n")
+                self.process.stdin.close()
+                self.process.wait(TERMINATE_GRACE)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+    def _pump(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _read(self):
+        deadline = time.monotonic() + WORKER_TIMEOUT
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.process.kill()
+                raise WorkerUnavailable(f"no reply within {WORKER_TIMEOUT} s")
+            if line is None:
+                raise WorkerUnavailable(
+                    f"worker exited with code {self.process.wait()}"
+                )
+            if line.startswith(WORKER_MARKER):
+                return json.loads(line[len(WORKER_MARKER) :])
+
+
+# one worker per Abaqus installation and process, None once it failed to start;
+# keyed by pid as forked pool workers inherit the parent's pipes
+_workers = {}
+
+
+def get_worker(abaqus_bat_path):
+    key = (os.getpid(), abaqus_bat_path)
+    if key not in _workers:
+        try:
+            _workers[key] = PostProcessingWorker(abaqus_bat_path)
+        except WorkerUnavailable:
+            _workers[key] = None
+    return _workers[key]
+
+
+@atexit.register
+def close_workers():
+    for (pid, _), worker in _workers.items():
+        if worker is not None and pid == os.getpid():
+            worker.close()
+    _workers.clear()
+
+
+class JobMonitor:
+    def __init__(self, model_path, jobname):
+        self.sta = Path(model_path, f"{jobname}.sta")
+        self.msg = Path(model_path, f"{jobname}.msg")
+        self._msg_offset = 0
+        self.errors = []
+        self.diverging = False
+
+    def poll(self):
+        increments, completed = [], None
+        if self.sta.is_file():
+            increments, completed = parse_sta(self.sta.read_text(errors="replace"))
+        if self.msg.is_file():
+            # .msg files grow large, so only read what was appended
+            with open(self.msg, "r", errors="replace") as f:
+                f.seek(self._msg_offset)
+                text = f.read()
+                self._msg_offset = f.tell()
+            for line in text.splitlines():
+                if "***ERROR" in line:
+                    self.errors.append(line.strip())
+                if "DIVERG" in line:
+                    self.diverging = True
+        return JobStatus(increments, completed, list(self.errors), self.diverging)
+
+
+def parse_sta(text):
+    increments = []
+    for line in text.splitlines():
+        row = STA_ROW.match(line)
+        if row:
+            g = row.groups()
+            increments.append(
+                StaIncrement(
+                    *map(int, g[:3]), g[3] == "U", *map(int, g[4:7]), *map(float, g[7:])
+                )
+            )
+    completed = None
+    if "HAS COMPLETED SUCCESSFULLY" in text:
+        completed = True
+    elif "HAS NOT BEEN COMPLETED" in text:
+        completed = False
+    return increments, completed
+
+
+def get_consecutive_cutbacks(increments):
+    count = 0
+    for i in reversed(increments):
+        if not i.cutback:
+            break
+        count += 1
+    return count
+
+
+def check_budget(status: JobStatus, elapsed, system):
+    if system.max_wall_time is not None and elapsed > system.max_wall_time:
+        return JobTimeout, f"exceeded wall-clock budget of {system.max_wall_time} s"
+    converged = [i for i in status.increments if not i.cutback]
+    if system.max_increments is not None and len(converged) > system.max_increments:
+        return JobTimeout, f"exceeded increment budget of {system.max_increments}"
+    if system.max_cutbacks is not None and (
+        get_consecutive_cutbacks(status.increments) >= system.max_cutbacks
+    ):
+        return JobDiverged, f"{system.max_cutbacks} consecutive cutbacks"
+    return None, None
+
+
+async def run_job(
+    model_path, jobname, system, on_progress=None, poll_interval=1.0, oldjob=None
+):
+    options = [f"j={jobname}", "ask_delete=no", f"cpus={system.cpus}"]
+    if oldjob is not None:
+        options.append(f"oldjob={oldjob}")
+    process = await asyncio.create_subprocess_exec(
+        system.abaqus_bat_path, *options, "-int", cwd=model_path
+    )
+    monitor = JobMonitor(model_path, jobname)
+    waiter = asyncio.ensure_future(process.wait())
+    start = time.monotonic()
+    reported = 0
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({waiter}, timeout=poll_interval)
+            status = monitor.poll()
+            if on_progress is not None and len(status.increments) > reported:
+                reported = len(status.increments)
+                on_progress(jobname, status.increments[-1])
+            if done:
+                break
+            error, message = check_budget(status, time.monotonic() - start, system)
+            if error is not None:
+                raise error(jobname, message, status)
+    except BaseException:
+        # over budget, cancelled by a failing sibling job or interrupted, the
+        # job must not keep running and holding its tokens
+        if process.returncode is None:
+            await terminate(process, model_path, jobname, system)
+        raise
+
+    if status.completed is not True:
+        message = status.errors[0] if status.errors else "analysis did not complete"
+        if status.diverging:
+            raise JobDiverged(jobname, message, status)
+        raise JobFailed(jobname, message, status)
+    return status
+
+
+async def run_jobs(jobs, system, on_progress=None):
+    return await asyncio.gather(
+        *(run_job(path, jobname, system, on_progress) for path, jobname in jobs)
+    )
+
+
+async def terminate(process, model_path, jobname, system):
+    killer = await asyncio.create_subprocess_exec(
+        system.abaqus_bat_path, "terminate", f"job={jobname}", cwd=model_path
+    )
+    await killer.wait()
+    try:
+        await asyncio.wait_for(process.wait(), TERMINATE_GRACE)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+def terminate_jobs(model_path, system, jobnames=("in_place", "modal")):
+    # Abaqus holds a .lck file while a job runs
+    for jobname in jobnames:
+        if Path(model_path, f"{jobname}.lck").is_file():
+            subprocess.run(
+                [system.abaqus_bat_path, "terminate", f"job={jobname}"],
+                cwd=model_path,
+            )
+
+
+async def run_script(model_path, script, system, outputs=()):
+    process = await asyncio.create_subprocess_exec(
+        system.abaqus_bat_path, "python", script, cwd=model_path
+    )
+    returncode = await process.wait()
+    if returncode != 0:
+        raise ScriptFailed(script, f"exited with code {returncode}")
+    check_results(model_path, script, outputs)
+
+
+def run_post_processing(model_path, script, system, outputs=()):
+    worker = get_worker(system.abaqus_bat_path) if system.pp_worker else None
+    if worker is not None:
+        try:
+            worker.run(model_path, script)
+            check_results(model_path, script, outputs)
+            return
+        except WorkerUnavailable:
+            _workers[os.getpid(), system.abaqus_bat_path] = None
+    asyncio.run(run_script(model_path, script, system, outputs))
+
+
+def check_results(model_path, name, outputs):
+    missing = [f for f in outputs if not Path(model_path, f).is_file()]
+    if missing:
+        raise MissingResults(name, f"missing {', '.join(missing)}")
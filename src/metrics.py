@@ -0,0 +1,150 @@
+from contextlib import contextmanager, nullcontext
+import json
+import os
+from pathlib import Path
+import re
+import time
+
+METRICS_FILE = "metrics.jsonl"
+
+# the JOB TIME SUMMARY Abaqus writes at the end of the .msg and .dat files
+JOB_TIME = re.compile(
+    r"^\s*(USER TIME|SYSTEM TIME|TOTAL CPU TIME|WALLCLOCK TIME) \(SEC\)\s*=\s*(\S+)",
+    re.M,
+)
+
+
+class Metrics:
+    def __init__(self, model_path, case=None):
+        self.path = Path(model_path, METRICS_FILE)
+        self.case = case
+
+    @contextmanager
+    def stage(self, name, model_path=None, files=(), jobname=None):
+        model_path = self.path.parent if model_path is None else Path(model_path)
+        start = time.perf_counter()
+        before = os.times()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            # failed stages are recorded too, a run that fails is often the
+            # one whose cost needs explaining
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            after = os.times()
+            record = {
+                "case": self.case,
+                "stage": name,
+                "path": str(model_path),
+                "wall_time": time.perf_counter() - start,
+                "cpu_time": after.user + after.system - before.user - before.system,
+                # only counts subprocesses that exited during the stage, so
+                # post-processing in a persistent worker is not included
+                "child_cpu_time": (
+                    after.children_user
+                    + after.children_system
+                    - before.children_user
+                    - before.children_system
+                ),
+                "files": get_file_sizes(model_path, files),
+            }
+            if jobname is not None:
+                record["solver"] = read_job_time(model_path, jobname)
+            if error is not None:
+                record["error"] = error
+            self.record(record)
+
+    def record(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def get_stage(metrics):
+    if metrics is None:
+        return lambda *args, **kwargs: nullcontext()
+    return metrics.stage
+
+
+def get_file_sizes(model_path, files):
+    sizes = {}
+    for f in files:
+        path = Path(model_path, f)
+        if path.is_file():
+            sizes[f] = path.stat().st_size
+    return sizes
+
+
+def read_job_time(model_path, jobname):
+    for suffix in (".dat", ".msg"):
+        path = Path(model_path, f"{jobname}{suffix}")
+        if not path.is_file():
+            continue
+        times = parse_job_time(path.read_text(errors="replace"))
+        if times:
+            return times
+    return {}
+
+
+def parse_job_time(text):
+    times = {}
+    for label, value in JOB_TIME.findall(text):
+        key = label.lower().replace(" ", "_")
+        try:
+            times[key] = float(value)
+        except ValueError:
+            continue
+    return times
+
+
+def read_metrics(model_path):
+    records = []
+    for path in sorted(Path(model_path).rglob(METRICS_FILE)):
+        with open(path) as f:
+            records += [json.loads(line) for line in f if line.strip()]
+    return records
+
+
+def aggregate_metrics(records):
+    stages = {}
+    for r in records:
+        s = stages.setdefault(
+            r["stage"],
+            {
+                "count": 0,
+                "failed": 0,
+                "wall_time": 0.0,
+                "max_wall_time": 0.0,
+                "cpu_time": 0.0,
+                "child_cpu_time": 0.0,
+                "solver_cpu_time": 0.0,
+                "file_size": 0,
+            },
+        )
+        s["count"] += 1
+        s["failed"] += "error" in r
+        s["wall_time"] += r["wall_time"]
+        s["max_wall_time"] = max(s["max_wall_time"], r["wall_time"])
+        s["cpu_time"] += r["cpu_time"]
+        s["child_cpu_time"] += r["child_cpu_time"]
+        s["solver_cpu_time"] += r.get("solver", {}).get("total_cpu_time", 0.0)
+        s["file_size"] += sum(r["files"].values())
+    return stages
+
+
+def write_metrics_summary(path, stages):
+    columns = [
+        "count",
+        "failed",
+        "wall_time",
+        "max_wall_time",
+        "cpu_time",
+        "child_cpu_time",
+        "solver_cpu_time",
+        "file_size",
+    ]
+    with open(path, "w") as f:
+        f.write(",".join(["stage"] + columns) + "\n")
+        for stage, s in stages.items():
+            f.write(",".join([stage] + [f"{s[c]:g}" for c in columns]) + "\n")
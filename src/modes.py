@@ -1,12 +1,144 @@
+import asyncio
+from collections.abc import Mapping
+import dataclasses
+from functools import cached_property
 import glob
+import logging
 import math
+import shutil
 from textwrap import dedent
-import subprocess
 from pathlib import Path
 
 import numpy as np
 
-from .utils import Pipe, Model, Seabed, System
+from .utils import Pipe, Model, Seabed, System, get_A
+from .jobs import run_job, run_jobs, run_post_processing
+from .metrics import get_stage
+
+logger = logging.getLogger(__name__)
+
+
+SOLVERS = ("abaqus", "native")
+
+MODES_FILE = "modes.npy"
+
+EIGENSOLVERS = ("lanczos", "ams", "subspace")
+
+# TOML has no null, so these ask for every mode up to max_frequency
+ALL_MODES = ("all", 0)
+
+DIRECTIONS = ("axial", "cross-flow", "inline")
+
+JOB_FILES = {
+    job: [f"{job}{suffix}" for suffix in (".odb", ".dat", ".msg", ".sta")]
+    for job in ("in_place", "modal")
+}
+IN_PLACE_FILES = ["in_place_coords.npy", "in_place_nodes.dat", "gaps.dat"]
+MODAL_FILES = [MODES_FILE, "freqs.dat"]
+
+IN_PLACE_OUTPUT = (
+    "*OUTPUT, FIELD, VARIABLE=PRESELECT\n"
+    "*ELEMENT OUTPUT, ELSET=PIPELINE, VARIABLE=PRESELECT\n"
+    "ESF1, SF, SE, S\n"
+    "*NODE OUTPUT, NSET=PIPELINE, VARIABLE=PRESELECT\n"
+    "COORD\n"
+)
+MODAL_SET_UP_OUTPUT = (
+    "*OUTPUT, FIELD, FREQ=10, VARIABLE=PRESELECT \n"
+    "**   \n"
+    "*ELEMENT OUTPUT, ELSET=PIPE     \n"
+    "SF, SE, ESF1, TEMP\n"
+    "*NODE OUTPUT, NSET=PIPE\n"
+    "U, COORD\n"
+    "** \n"
+    "*OUTPUT, HISTORY, FREQ=0, VARIABLE=PRESELECT\n"
+    "**\n"
+)
+MODAL_FREQUENCY_OUTPUT = (
+    "*NODE PRINT, GLOBAL=YES, NSET=PIPE, FREQ=999\n"
+    "U,\n"
+    "*OUTPUT, FIELD, VARIABLE=ALL, FREQUENCY=999\n"
+    "*MODAL FILE\n"
+)
+
+# minimal only writes what post-processing reads, the end of step COORD of
+# each in-place load case and the modal U
+OUTPUT_REQUESTS = {
+    "full": {
+        "in_place_set_up": IN_PLACE_OUTPUT,
+        "in_place_step": IN_PLACE_OUTPUT,
+        "modal_set_up": MODAL_SET_UP_OUTPUT,
+        "modal_frequency": MODAL_FREQUENCY_OUTPUT,
+    },
+    "minimal": {
+        "in_place_set_up": "*OUTPUT, FIELD, OP=NEW, FREQUENCY=0\n",
+        "in_place_step": dedent(
+            """\
+            *OUTPUT, FIELD, OP=NEW, FREQUENCY=999
+            *NODE OUTPUT, NSET=PIPELINE
+            COORD
+            """
+        ),
+        "modal_set_up": dedent(
+            """\
+            *OUTPUT, FIELD, OP=NEW, FREQUENCY=0
+            *OUTPUT, HISTORY, OP=NEW, FREQUENCY=0
+            """
+        ),
+        "modal_frequency": dedent(
+            """\
+            *OUTPUT, FIELD, OP=NEW
+            *NODE OUTPUT, NSET=PIPE
+            U
+            """
+        ),
+    },
+}
+
+FREQUENCY_STEP = "*STEP, NLGEOM, UNSYMM=YES, INC=2000\n"
+# only the state at the end of the pre-stressing step is kept
+RESTART_WRITE = "*RESTART, WRITE, OVERLAY, NUMBER INTERVAL=1\n"
+RESTART_FILES = (".res", ".mdl", ".stt", ".prt", ".sim", ".odb")
+RESTART_JOB = "modal_base"
+# the only inputs that are confined to the frequency step, any other change
+# reaches the model data or the pre-stressing step a restart shares with its
+# base run
+FREQUENCY_STEP_INPUTS = ("number_of_modes", "max_frequency", "shift", "eigensolver")
+
+
+class ModeSet(Mapping):
+    def __init__(self, frequencies, shapes, numbers=None, fields=None):
+        # shapes are modes x nodes x (axial, vertical, lateral) displacements
+        self.frequencies = frequencies
+        self.shapes = shapes
+        if numbers is None:
+            numbers = range(1, len(shapes) + 1)
+        self.numbers = list(numbers)
+        self.fields = fields or {}
+        self._index = {k: n for n, k in enumerate(self.numbers)}
+
+    @cached_property
+    def mode_shapes(self):
+        return rotate_modes(self.shapes)
+
+    @cached_property
+    def directions(self):
+        return get_directions(self.shapes)
+
+    def __getitem__(self, k):
+        n = self._index[k]
+        return {
+            "mode_shape": self.mode_shapes[n],
+            "direction": self.directions[n],
+            "frequency": self.frequencies[n],
+            **{f: v[n] for f, v in self.fields.items()},
+        }
+
+    def __iter__(self):
+        return iter(self.numbers)
+
+    def __len__(self):
+        return len(self.numbers)
 
 
 def get_mode_shapes(
@@ -15,16 +147,167 @@ def get_mode_shapes(
     pipe: Pipe,
     seabed: Seabed,
     system: System,
+    in_place_solver="abaqus",
+    modal_solver="abaqus",
+    cache=None,
+    incremental=False,
+    load_cases=None,
+    metrics=None,
+    restart=False,
+    restart_from=None,
 ):
-    run_in_place(model_path, model, pipe, seabed, system)
-    pp_in_place(model_path, system)
-    run_modal(model_path, pipe, seabed, model, system)
-    modes = pp_modal(model_path, system)
+    for solver in (in_place_solver, modal_solver):
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+    if restart or restart_from is not None:
+        if modal_solver != "abaqus" or cache is not None or incremental or load_cases:
+            raise ValueError(
+                "Restarts need the Abaqus modal solver without a cache, "
+                "incremental run or load cases"
+            )
+
+    stage = get_stage(metrics)
+    if load_cases is not None:
+        if cache is not None or incremental:
+            raise ValueError("Load cases cannot use a result cache or incremental run")
+        with stage("load_cases"):
+            return get_load_case_modes(
+                model_path,
+                model,
+                pipe,
+                seabed,
+                system,
+                load_cases,
+                in_place_solver,
+                modal_solver,
+            )
+
+    if incremental:
+        if cache is not None:
+            raise ValueError("An incremental run cannot use a result cache")
+        from .pipeline import run_pipeline
+
+        with stage("pipeline"):
+            return run_pipeline(
+                model_path, model, pipe, seabed, system, in_place_solver, modal_solver
+            )
+
+    if in_place_solver == "native":
+        from .native import solve_in_place
+
+        with stage("in_place_solve"):
+            nodes, gaps = solve_in_place(model, pipe, seabed)
+            write_in_place_results(model_path, nodes, gaps)
+    elif cache is not None:
+        from . import cache as c
+
+        with stage("in_place", files=IN_PLACE_FILES):
+            c.run_in_place(cache, model_path, model, pipe, seabed, system)
+        nodes, gaps = None, None
+    else:
+        with stage("in_place_deck", files=["in_place.inp"]):
+            write_in_place_input_file(model_path, model, pipe, seabed)
+        with stage("in_place_solve", files=JOB_FILES["in_place"], jobname="in_place"):
+            run_abaqus(model_path, "in_place", system)
+        with stage("in_place_pp", files=IN_PLACE_FILES):
+            pp_in_place(model_path, model, system)
+        nodes, gaps = None, None
+
+    if modal_solver == "native":
+        from .native import solve_modal
+
+        with stage("modal_solve"):
+            if nodes is None:
+                nodes, gaps = read_in_place_nodes(model_path), get_gaps(model_path)
+            return solve_modal(nodes, gaps, pipe, seabed, model)
+    if cache is not None:
+        from . import cache as c
+
+        with stage("modal", files=MODAL_FILES):
+            return c.run_modal(cache, model_path, pipe, seabed, model, system)
+    with stage("modal_deck", files=["modal.inp"]):
+        write_modal_inp(model_path, pipe, seabed, model, restart)
+        oldjob = None
+        if restart_from is not None:
+            if not has_restart(restart_from):
+                logger.warning(
+                    "%s has no restart files, running %s in full",
+                    restart_from,
+                    model_path,
+                )
+            elif not write_modal_restart_inp(model_path, restart_from):
+                logger.warning(
+                    "%s differs from %s before the frequency step, running it in full",
+                    model_path,
+                    restart_from,
+                )
+            else:
+                oldjob = RESTART_JOB
+    with stage("modal_solve", files=JOB_FILES["modal"], jobname="modal"):
+        run_abaqus(model_path, "modal", system, oldjob=oldjob)
+    with stage("modal_pp", files=MODAL_FILES):
+        modes = pp_modal(model_path, system)
     return modes
 
 
-def run_in_place(model_path, model: Model, pipe: Pipe, seabed: Seabed, system: System):
-    write_in_place_input_file(model_path, model, pipe, seabed)
+def get_load_case_modes(
+    model_path,
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    system: System,
+    load_cases,
+    in_place_solver="abaqus",
+    modal_solver="abaqus",
+):
+    if len({lc.name for lc in load_cases}) != len(load_cases):
+        raise ValueError("Load case names must be unique")
+
+    if in_place_solver == "native":
+        from .native import solve_in_place
+
+        for lc in load_cases:
+            nodes, gaps = solve_in_place(model, pipe.for_load_case(lc), seabed)
+            write_in_place_results(get_load_case_path(model_path, lc), nodes, gaps)
+    else:
+        # every load case is a step of the same in-place job
+        run_in_place(model_path, model, pipe, seabed, system, load_cases)
+        pp_in_place(model_path, model, system, load_cases)
+
+    paths = [get_load_case_path(model_path, lc) for lc in load_cases]
+    if modal_solver == "native":
+        from .native import solve_modal
+
+        return {
+            lc.name: solve_modal(
+                read_in_place_nodes(path),
+                get_gaps(path),
+                pipe.for_load_case(lc),
+                seabed,
+                model,
+            )
+            for lc, path in zip(load_cases, paths)
+        }
+
+    # each load case has its own deformed mesh and contacts, so its own modal job
+    for lc, path in zip(load_cases, paths):
+        write_modal_inp(path, pipe.for_load_case(lc), seabed, model)
+    asyncio.run(run_jobs([(path, "modal") for path in paths], system))
+    for path in paths:
+        write_modal_pp_file(path)
+        pp_abaqus(path, "modal_pp.py", system, [MODES_FILE, "freqs.dat"])
+    return get_modes(model_path, load_cases)
+
+
+def run_in_place(
+    model_path,
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    system: System,
+    load_cases=None,
+):
+    write_in_place_input_file(model_path, model, pipe, seabed, load_cases)
     run_abaqus(model_path, "in_place", system)
 
 
@@ -33,20 +316,29 @@ def write_in_place_input_file(
     model: Model,
     pipe: Pipe,
     seabed: Seabed,
+    load_cases=None,
 ):
-    number_of_elements = int(
-        (model.bathymetry[-1][0] - model.bathymetry[0][0]) / model.element_length
-    )
+    mesh = get_mesh(model, pipe, seabed)
+    number_of_elements = len(mesh) - 1
     last_node = number_of_elements + 1
     with open(Path(model_path, "in_place.inp"), "w") as i:
+        i.write("*NODE, NSET=PIPELINE\n")
+        if model.min_element_length is None:
+            i.write(
+                dedent(
+                    f"""\
+                    1, {model.bathymetry[0][0]}, 0
+                    {last_node}, {model.bathymetry[-1][0]}, 0
+                    *NGEN, NSET=PIPELINE
+                    1, {last_node}, 1
+                    """
+                )
+            )
+        else:
+            i.write("".join(f"{n+1}, {x:.6f}, 0\n" for n, x in enumerate(mesh)))
         i.write(
             dedent(
                 f"""\
-                *NODE, NSET=PIPELINE
-                1, {model.bathymetry[0][0]}, 0
-                {last_node}, {model.bathymetry[-1][0]}, 0
-                *NGEN, NSET=PIPELINE
-                1, {last_node}, 1
                 *ELEMENT, TYPE=PIPE21H, ELSET=PIPELINE
                 1, 1, 2
                 *ELGEN, ELSET=PIPELINE
@@ -100,71 +392,99 @@ def write_in_place_input_file(
                 SEABED_REF, 6, 6, 0
                 *DLOAD, OP=NEW
                 PIPELINE, GRAV, {model.g}, 0, -1
-                *OUTPUT, FIELD, VARIABLE=PRESELECT
-                *ELEMENT OUTPUT, ELSET=PIPELINE, VARIABLE=PRESELECT
-                ESF1, SF, SE, S
-                *NODE OUTPUT, NSET=PIPELINE, VARIABLE=PRESELECT
-                *END STEP
-                *STEP, NLGEOM=YES
-                *STATIC
-                0.1, 1, 1E-10, 1
-                *DLOAD, OP=MOD
-                PIPELINE, PI, {pipe.Pi:.3e}, {pipe.od-2*pipe.wt:.3e}
-                *TEMPERATURE
-                PIPELINE, {pipe.T:.3e}
-                *OUTPUT, FIELD, VARIABLE=PRESELECT
-                *ELEMENT OUTPUT, ELSET=PIPELINE, VARIABLE=PRESELECT
-                ESF1, SF, SE, S
-                *NODE OUTPUT, NSET=PIPELINE, VARIABLE=PRESELECT
-                *END STEP
                 """
             )
         )
+        i.write(get_output_requests(model, "in_place_set_up"))
+        i.write("*END STEP\n")
+        if load_cases is None:
+            steps = [pipe]
+        else:
+            steps = [pipe.for_load_case(lc) for lc in load_cases]
+        for p in steps:
+            i.write(
+                dedent(
+                    f"""\
+                    *STEP, NLGEOM=YES
+                    *STATIC
+                    0.1, 1, 1E-10, 1
+                    *DLOAD, OP=MOD
+                    PIPELINE, PI, {p.Pi:.3e}, {p.od-2*p.wt:.3e}
+                    """
+                )
+            )
+            if load_cases is not None:
+                # GRAV acts on the base pipe density, so apply the contents change
+                w = (p.rho_contents - pipe.rho_contents) * get_A(p.od - 2 * p.wt)
+                i.write(f"PIPELINE, PY, {-w*model.g:.3e}\n")
+            i.write(
+                dedent(
+                    f"""\
+                    *TEMPERATURE
+                    PIPELINE, {p.T:.3e}
+                    """
+                )
+            )
+            i.write(get_output_requests(model, "in_place_step"))
+            i.write("*END STEP\n")
 
 
-def pp_in_place(model_path, system: System):
-    write_in_place_pp_file(model_path)
-    pp_abaqus(model_path, "in_place_pp.py", system)
+def pp_in_place(model_path, model: Model, system: System, load_cases=None):
+    write_in_place_pp_file(model_path, load_cases)
+    cases = [None] if load_cases is None else load_cases
+    outputs = [get_coords_file(lc) for lc in cases]
+    pp_abaqus(model_path, "in_place_pp.py", system, outputs)
+    for lc in cases:
+        process_in_place(model_path, model, lc)
 
 
-def write_in_place_pp_file(model_path):
+def process_in_place(model_path, model: Model, load_case=None):
+    nodes = np.load(Path(model_path, get_coords_file(load_case)))
+    write_in_place_results(
+        get_load_case_path(model_path, load_case),
+        nodes,
+        calculate_gaps(nodes, model.bathymetry),
+    )
+
+
+def get_coords_file(load_case=None):
+    if load_case is None:
+        return "in_place_coords.npy"
+    return f"in_place_coords_{load_case.name}.npy"
+
+
+def get_load_case_path(model_path, load_case=None):
+    if load_case is None:
+        return Path(model_path)
+    path = Path(model_path, load_case.name)
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def write_in_place_pp_file(model_path, load_cases=None):
+    cases = [None] if load_cases is None else load_cases
+    # step 1 applies gravity, each following step is one load case
+    results = [(f"Step-{n+2}", get_coords_file(lc)) for n, lc in enumerate(cases)]
     with open(Path(model_path, "in_place_pp.py"), "w") as p:
         p.write(
             dedent(
-                """\
+                f"""\
                 import numpy as np
 
                 import odbAccess
 
                 odb = odbAccess.openOdb("in_place.odb")
-                u = odb.steps["Step-2"].frames[-1].fieldOutputs["U"]
-                n = odb.rootAssembly.instances["PART-1-1"].nodes
-                seabed_segments = odb.rootAssembly.instances["SEABED"].analyticSurface.segments
-
-                seabed_surface = np.zeros((len(seabed_segments), 2))
-                for i in range(len(seabed_segments)):
-                    coords = seabed_segments[i].data[0]
-                    seabed_surface[i, 0] = coords[0]
-                    seabed_surface[i, 1] = coords[1]
-
-                with open("in_place_nodes.dat", "w") as f:
-                    f.write("*NODE, NSET=PIPE\\n")
-
-                    with open("gaps.dat", "w") as c:
-                        for i in range(len(n) - 1):
-                            # get displaced coordinates
-                            x = n[i].coordinates[0] + u.values[i].data[0]
-                            y = n[i].coordinates[1] + u.values[i].data[1]
-
-                            node = i + 1
-                            # interpolate seabed elevation below node and calculate vertical gap
-                            # this is required because COPEN also considers the wall of the span
-                            sb_elevation = np.interp(x, seabed_surface[:, 0], seabed_surface[:, 1])
-                            gap = y - sb_elevation
-                            # write modal node file
-                            f.write("{0:4d}, {1:9.3e}, {2:9.3e}, 0\\n".format(node, x, y))
-                            # write gap file
-                            c.write("{0:4d}, {1:9.3e}\\n".format(node, y - sb_elevation))
+                pipeline = odb.rootAssembly.instances["PART-1-1"].nodeSets["PIPELINE"]
+
+                for step, result in {results!r}:
+                    coord = odb.steps[step].frames[-1].fieldOutputs["COORD"]
+
+                    # COORD holds the displaced coordinates of the NLGEOM analysis
+                    blocks = coord.getSubset(region=pipeline).bulkDataBlocks
+                    labels = np.concatenate([b.nodeLabels for b in blocks])
+                    xy = np.concatenate([b.data for b in blocks])[:, :2]
+
+                    np.save(result, xy[np.argsort(labels)])
                 """
             )
         )
@@ -175,12 +495,22 @@ def run_modal(model_path, pipe: Pipe, seabed: Seabed, model: Model, system: Syst
     run_abaqus(model_path, "modal", system)
 
 
-def write_modal_inp(model_path, pipe: Pipe, seabed: Seabed, model: Model):
+def write_modal_inp(
+    model_path, pipe: Pipe, seabed: Seabed, model: Model, restart=False
+):
     gaps = get_gaps(model_path)
     nodes = len(gaps)
 
-    contacts = [n for n in gaps if n[1] <= 0]
-    num_contacts = len(contacts)
+    contacts = [n for n, gap in gaps if gap <= 0]
+    mesh = get_mesh(model, pipe, seabed)
+    if len(mesh) != nodes:
+        raise ValueError(f"Mesh has {len(mesh)} nodes but gaps.dat has {nodes}")
+    lengths = get_tributary_lengths(mesh)
+    stiffnesses = [
+        seabed.K_ax_dyn,
+        get_K_V_d(pipe, seabed, model),
+        get_K_L_d(pipe, seabed, model),
+    ]
 
     with open(Path(model_path, "modal.inp"), "w") as s:
         s.write(
@@ -201,31 +531,11 @@ def write_modal_inp(model_path, pipe: Pipe, seabed: Seabed, model: Model):
                 """
             )
         )
-        for n, contact in enumerate(contacts):
-            s.write(
-                dedent(
-                    f"""\
-                    *ELEMENT, TYPE=SPRING1, ELSET=SPR_AX
-                    {nodes+n}, {contact[0]}
-                    *ELEMENT, TYPE=SPRING1, ELSET=SPR_VERT
-                    {nodes+num_contacts+n}, {contact[0]}
-                    *ELEMENT, TYPE=SPRING1, ELSET=SPR_LAT
-                    {nodes+2*num_contacts+n}, {contact[0]}
-                    """
-                )
-            )
+        if contacts:
+            s.write(get_springs(contacts, lengths, stiffnesses, nodes))
         s.write(
             dedent(
                 f"""\
-                *SPRING, ELSET=SPR_AX
-                1
-                {seabed.K_ax_dyn*model.element_length:9.3e}
-                *SPRING, ELSET=SPR_VERT
-                2
-                {get_K_V_d(pipe, seabed, model)*model.element_length:9.3e}
-                *SPRING, ELSET=SPR_LAT
-                3
-                {get_K_L_d(pipe, seabed, model)*model.element_length:9.3e}
                 *AQUA
                 -{model.water_depth}, 0., {model.g}, {model.rho_sw}
                 *INITIAL CONDITIONS, TYPE=STRESS
@@ -235,24 +545,30 @@ def write_modal_inp(model_path, pipe: Pipe, seabed: Seabed, model: Model):
                 *STATIC
                 0.0001, 1.0, 1.0E-9   
                 *CONTROLS, ANALYSIS=DISCONTINUOUS
+                """
+            )
+        )
+        if restart:
+            s.write(RESTART_WRITE)
+        s.write(
+            dedent(
+                f"""\
                 *BOUNDARY, OP=NEW 
                 1, 1, 6 
                 {nodes}, 2, 3
                 PIPE, 1, 3
-                *OUTPUT, FIELD, FREQ=10, VARIABLE=PRESELECT 
-                **   
-                *ELEMENT OUTPUT, ELSET=PIPE     
-                SF, SE, ESF1, TEMP
-                *NODE OUTPUT, NSET=PIPE
-                U, COORD
-                ** 
-                *OUTPUT, HISTORY, FREQ=0, VARIABLE=PRESELECT
-                **
+                """
+            )
+        )
+        s.write(get_output_requests(model, "modal_set_up"))
+        s.write(
+            dedent(
+                f"""\
                 *END STEP 
-                *STEP, NLGEOM, UNSYMM=YES, INC=2000
+                {FREQUENCY_STEP}\
                 FREQUENCY EXTRACTION
-                *FREQUENCY, EIGENSOLVER=LANCZOS
-                20
+                *FREQUENCY, EIGENSOLVER={model.eigensolver.upper()}
+                {get_frequency_data(model)}
                 **
                 *BOUNDARY, OP=NEW
                 1, 1, 6
@@ -265,28 +581,198 @@ def write_modal_inp(model_path, pipe: Pipe, seabed: Seabed, model: Model):
         for i in range(nodes - 1):
             avg_gap = max((gaps[i + 1][1] + gaps[i][1]) / 2, 0)
             s.write(f"{i+1}, FI, {pipe.od}, {get_added_mass(avg_gap, pipe.od)}\n")
-        s.write(
-            dedent(
-                f"""\
-                *NODE PRINT, GLOBAL=YES, NSET=PIPE, FREQ=999
-                U,
-                *OUTPUT, FIELD, VARIABLE=ALL, FREQUENCY=999
-                *MODAL FILE
-                *END STEP
-                """
+        s.write(get_output_requests(model, "modal_frequency"))
+        s.write("*END STEP\n")
+
+
+def get_springs(contacts, lengths, stiffnesses, element):
+    lengths = [lengths[n - 1] for n in contacts]
+    lo, hi = min(lengths), max(lengths)
+    elements, springs = [], []
+    for d, name in enumerate(["SPR_AX", "SPR_VERT", "SPR_LAT"]):
+        elements.append(f"*ELEMENT, TYPE=SPRING1, ELSET={name}\n")
+        elements += [f"{element+i}, {n}\n" for i, n in enumerate(contacts)]
+        element += len(contacts)
+        k = stiffnesses[d]
+        if hi - lo <= 1e-9 * hi:
+            springs.append(f"*SPRING, ELSET={name}\n{d+1}\n{k*hi:9.3e}\n")
+        else:
+            # on a graded mesh the stiffness is linear in the tributary length,
+            # held in field variable 1, so one table of two points is exact; the
+            # columns are stiffness, frequency, temperature and field variable 1
+            springs.append(
+                f"*SPRING, ELSET={name}, DEPENDENCIES=1\n{d+1}\n"
+                f"{k*lo:.6e}, , , {lo:.6e}\n{k*hi:.6e}, , , {hi:.6e}\n"
             )
+    if hi - lo > 1e-9 * hi:
+        springs.append("*INITIAL CONDITIONS, TYPE=FIELD, VARIABLE=1\n")
+        springs += [f"{n}, {l:.6e}\n" for n, l in zip(contacts, lengths)]
+    return "".join(elements + springs)
+
+
+def get_restart_conflicts(model: Model, pipe: Pipe, seabed: Seabed, base):
+    base_model, base_pipe, base_seabed = base
+    conflicts = [
+        f"Model.{f}"
+        for f in Model._fields
+        if f not in FREQUENCY_STEP_INPUTS
+        and getattr(model, f) != getattr(base_model, f)
+    ]
+    conflicts += [
+        f"Pipe.{f.name}"
+        for f in dataclasses.fields(Pipe)
+        if getattr(pipe, f.name) != getattr(base_pipe, f.name)
+    ]
+    conflicts += [
+        f"Seabed.{f}"
+        for f in Seabed._fields
+        if getattr(seabed, f) != getattr(base_seabed, f)
+    ]
+    return conflicts
+
+
+def write_modal_restart_inp(model_path, base_path):
+    # a restart can only add steps, so the model data and the pre-stressing
+    # step must be those of the base run
+    model_data, frequency_step = read_modal_deck(model_path)
+    base_data, _ = read_modal_deck(base_path)
+    nodes = Path(model_path, "in_place_nodes.dat").read_bytes()
+    if model_data != base_data or nodes != read_bytes(base_path, "in_place_nodes.dat"):
+        return False
+    for suffix in RESTART_FILES:
+        shutil.copyfile(
+            Path(base_path, f"modal{suffix}"),
+            Path(model_path, f"{RESTART_JOB}{suffix}"),
         )
+    with open(Path(model_path, "modal.inp"), "w") as s:
+        s.write("*RESTART, READ, STEP=1\n")
+        s.write(frequency_step)
+    return True
+
+
+def read_modal_deck(model_path):
+    deck = Path(model_path, "modal.inp").read_text().replace(RESTART_WRITE, "")
+    n = deck.index(FREQUENCY_STEP)
+    return deck[:n], deck[n:]
+
+
+def read_bytes(model_path, name):
+    path = Path(model_path, name)
+    return path.read_bytes() if path.is_file() else None
+
+
+def has_restart(model_path):
+    return all(Path(model_path, f"modal{suffix}").is_file() for suffix in RESTART_FILES)
+
+
+def get_output_requests(model: Model, step):
+    if model.output_profile not in OUTPUT_REQUESTS:
+        raise ValueError(f"Unknown output profile: {model.output_profile}")
+    return OUTPUT_REQUESTS[model.output_profile][step]
+
+
+def get_number_of_modes(model: Model):
+    if model.number_of_modes in ALL_MODES:
+        return None
+    return model.number_of_modes
+
+
+def get_frequency_data(model: Model):
+    if model.eigensolver not in EIGENSOLVERS:
+        raise ValueError(f"Unknown eigensolver: {model.eigensolver}")
+    number_of_modes = get_number_of_modes(model)
+    if number_of_modes is None and model.max_frequency is None:
+        raise ValueError("Either number_of_modes or max_frequency is required")
+    # Abaqus expects the shift point in (cycles/time)**2
+    shift = None if model.shift is None else f"{model.shift**2:.6g}"
+    if model.eigensolver == "subspace":
+        fields = [number_of_modes, model.max_frequency, shift]
+    elif model.eigensolver == "ams":
+        fields = [number_of_modes, None, model.max_frequency]
+    else:
+        fields = [number_of_modes, None, model.max_frequency, shift]
+    while fields[-1] is None:
+        fields.pop()
+    return ", ".join("" if f is None else str(f) for f in fields)
 
 
 def get_gaps(model_path):
-    gaps = []
-    lines = 0
-    with open(Path(model_path, "gaps.dat"), "r") as c:
-        for line in c.readlines():
-            lines += 1
-            node, gap = line.split(",")
-            gaps.append((int(node), float(gap)))
-    return gaps
+    gaps = np.loadtxt(Path(model_path, "gaps.dat"), delimiter=",", ndmin=2)
+    return [(int(node), gap) for node, gap in gaps.tolist()]
+
+
+def read_in_place_nodes(model_path):
+    nodes = np.loadtxt(Path(model_path, "in_place_nodes.dat"), delimiter=",", skiprows=1)
+    return nodes[:, 1:3]
+
+
+def get_mesh(model: Model, pipe: Pipe = None, seabed: Seabed = None):
+    x0, x1 = model.bathymetry[0][0], model.bathymetry[-1][0]
+    if model.min_element_length is None:
+        number_of_elements = int((x1 - x0) / model.element_length)
+        return np.linspace(x0, x1, number_of_elements + 1)
+
+    # refine over the flexural length either side of each bathymetry breakpoint,
+    # where spans lift off and touch down, then grow towards element_length
+    zone = 0 if pipe is None or seabed is None else get_flexural_length(pipe, seabed)
+    breakpoints = np.unique([p[0] for p in model.bathymetry])
+    segments = []
+    for a, b in zip(breakpoints[:-1], breakpoints[1:]):
+        x = np.linspace(a, b, 4 * int(np.ceil((b - a) / model.min_element_length)) + 1)
+        d = np.maximum(np.minimum(x - a, b - x) - zone, 0)
+        h = np.minimum(
+            model.min_element_length + (model.mesh_growth - 1) * d,
+            model.element_length,
+        )
+        # nodes are equally spaced in the integral of 1 / h
+        s = np.concatenate(([0], np.cumsum(np.diff(x) * (1 / h[1:] + 1 / h[:-1]) / 2)))
+        n = max(1, int(np.ceil(s[-1] - 1e-9)))
+        segments.append(np.interp(np.linspace(0, s[-1], n + 1), s, x)[:-1])
+    return np.append(np.concatenate(segments), x1)
+
+
+def get_tributary_lengths(x):
+    dx = np.diff(x)
+    # end nodes take their element length, as on the uniform mesh
+    return np.concatenate(([dx[0]], (dx[:-1] + dx[1:]) / 2, [dx[-1]]))
+
+
+def get_flexural_length(pipe: Pipe, seabed: Seabed):
+    I = math.pi * (pipe.od**4 - (pipe.od - 2 * pipe.wt) ** 4) / 64
+    return (4 * pipe.E * I / seabed.K_vert_sta) ** 0.25
+
+
+def get_seabed_elevation(x, bathymetry):
+    xb, yb = np.asarray(bathymetry, dtype=float).T
+    x = np.clip(np.asarray(x, dtype=float), xb[0], xb[-1])
+
+    # evaluate the segment either side of x and keep the higher one so nodes
+    # sitting exactly on a vertical step are measured to the shoulder
+    elevation = []
+    for side in ("left", "right"):
+        i = np.clip(np.searchsorted(xb, x, side=side), 1, len(xb) - 1)
+        dx = xb[i] - xb[i - 1]
+        t = np.divide(x - xb[i - 1], dx, out=np.ones_like(x), where=dx > 0)
+        elevation.append(yb[i - 1] + t * (yb[i] - yb[i - 1]))
+    return np.maximum(*elevation)
+
+
+def calculate_gaps(nodes, bathymetry):
+    nodes = np.asarray(nodes, dtype=float)
+    gaps = nodes[:, 1] - get_seabed_elevation(nodes[:, 0], bathymetry)
+    return np.column_stack((np.arange(1, len(nodes) + 1), gaps))
+
+
+def write_in_place_results(model_path, nodes, gaps):
+    nodes = np.asarray(nodes, dtype=float)
+    np.savetxt(
+        Path(model_path, "in_place_nodes.dat"),
+        np.column_stack((np.arange(1, len(nodes) + 1), nodes)),
+        fmt="%4d, %9.3e, %9.3e, 0",
+        header="*NODE, NSET=PIPE",
+        comments="",
+    )
+    np.savetxt(Path(model_path, "gaps.dat"), gaps, fmt="%4d, %9.3e")
 
 
 def get_added_mass(e, D):
@@ -299,7 +785,7 @@ def get_added_mass(e, D):
 
 def pp_modal(model_path, system: System):
     write_modal_pp_file(model_path)
-    pp_abaqus(model_path, "modal_pp.py", system)
+    pp_abaqus(model_path, "modal_pp.py", system, [MODES_FILE, "freqs.dat"])
     modes = get_modes(model_path)
     return modes
 
@@ -316,35 +802,31 @@ def write_modal_pp_file(model_path):
                 odb = odbAccess.openOdb("modal.odb")
 
                 s = odb.steps["Step-2"]
-                nodes = odb.rootAssembly.instances["PART-1-1"].nodes
-
-                modes = len(s.frames)
+                pipe = odb.rootAssembly.instances["PART-1-1"].nodeSets["PIPE"]
 
-                freqs = []
+                frames = [s.frames[m] for m in range(1, len(s.frames))]
+                freqs = [f.frequency for f in frames]
+                ms = np.zeros((len(frames), len(pipe.nodes), 3))
 
-                for m in range(1, modes):
-                    f = s.frames[m]
-                    freqs.append(f.frequency)
-                    ms = np.zeros((len(nodes), 3))
-                    for n in range(len(nodes)):
-                        ms[n, :] = f.fieldOutputs["U"].values[n].data
-                    fname = "mode_{0}.dat".format(m)
-                    np.savetxt(fname, ms, delimiter=",")
+                for m, f in enumerate(frames):
+                    for b in f.fieldOutputs["U"].getSubset(region=pipe).bulkDataBlocks:
+                        ms[m, np.asarray(b.nodeLabels) - 1, :] = b.data[:, :3]
 
+                np.save("modes.npy", ms)
                 np.savetxt("freqs.dat", freqs, delimiter=",")
                 """
             )
         )
 
 
-def get_modes(model_path):
-    nf = read_natural_freqs(model_path)
-    modes = read_mode_shapes(model_path)
+def get_modes(model_path, load_cases=None):
+    if load_cases is not None:
+        return {lc.name: get_modes(Path(model_path, lc.name)) for lc in load_cases}
 
-    for k in modes.keys():
-        modes[k]["frequency"] = nf[k - 1]
+    nf = read_natural_freqs(model_path)
+    shapes = read_mode_shapes(model_path)
 
-    return modes
+    return ModeSet(np.array(nf), shapes)
 
 
 def read_natural_freqs(model_path):
@@ -355,37 +837,46 @@ def read_natural_freqs(model_path):
 
 
 def read_mode_shapes(model_path):
-    modes = {}
-    mode_shape_files = glob.glob("mode_*.dat", root_dir=model_path)
+    if Path(model_path, MODES_FILE).is_file():
+        return np.load(Path(model_path, MODES_FILE), mmap_mode="r")
 
-    for msf in mode_shape_files:
-        ms = np.loadtxt(model_path / msf, delimiter=",")
-        mode_number = int(msf[msf.find("_") + 1 : msf.find(".")])
-        modes[mode_number] = {
-            "mode_shape": rotate_mode(ms),
-            "direction": get_direction(ms),
-        }
+    mode_shape_files = glob.glob("mode_*.dat", root_dir=model_path)
+    numbers = [int(msf[msf.find("_") + 1 : msf.find(".")]) for msf in mode_shape_files]
 
-    return dict(sorted(modes.items()))
+    return np.array(
+        [
+            np.loadtxt(model_path / msf, delimiter=",")
+            for _, msf in sorted(zip(numbers, mode_shape_files))
+        ]
+    )
 
 
 def rotate_mode(ms):
-    max_amplitude = np.argmax(np.sqrt(ms[:, 1] ** 2 + ms[:, 2] ** 2))
-    angle = -np.arctan2(ms[max_amplitude, 1], ms[max_amplitude, 2])
+    return rotate_modes(ms[None])[0]
 
-    _x = np.cos(angle) * ms[:, 2] - np.sin(angle) * ms[:, 1]
-    _y = np.sin(angle) * ms[:, 2] + np.cos(angle) * ms[:, 1]
 
-    return np.vstack((_x, _y)).T
+def rotate_modes(shapes):
+    # rotate each mode so its largest transverse amplitude lies along x
+    shapes = np.asarray(shapes)
+    m = np.arange(len(shapes))
+    max_amplitude = np.argmax(np.hypot(shapes[:, :, 1], shapes[:, :, 2]), axis=1)
+    angle = -np.arctan2(shapes[m, max_amplitude, 1], shapes[m, max_amplitude, 2])
+    c, s = np.cos(angle)[:, None], np.sin(angle)[:, None]
+
+    _x = c * shapes[:, :, 2] - s * shapes[:, :, 1]
+    _y = s * shapes[:, :, 2] + c * shapes[:, :, 1]
+
+    return np.stack((_x, _y), axis=-1)
 
 
 def get_direction(ms):
-    d = np.unravel_index(np.argmax(ms), ms.shape)[1]
-    if d == 0:
-        return "axial"
-    if d == 1:
-        return "cross-flow"
-    return "inline"
+    return get_directions(ms[None])[0]
+
+
+def get_directions(shapes):
+    shapes = np.asarray(shapes)
+    d = np.argmax(shapes.reshape(len(shapes), -1), axis=1) % shapes.shape[2]
+    return [DIRECTIONS[n] for n in d]
 
 
 def get_K_V_d(pipe: Pipe, seabed: Seabed, model: Model):
@@ -406,21 +897,9 @@ def get_K_L_d(pipe: Pipe, seabed: Seabed, model: Model):
     )
 
 
-def run_abaqus(model_path, jobname, system: System):
-    subprocess.run(
-        [
-            system.abaqus_bat_path,
-            f"j={jobname}",
-            "ask_delete=no",
-            f"cpus={system.cpus}",
-            "-int",
-        ],
-        cwd=model_path,
-    )
+def run_abaqus(model_path, jobname, system: System, oldjob=None):
+    return asyncio.run(run_job(model_path, jobname, system, oldjob=oldjob))
 
 
-def pp_abaqus(model_path, script, system: System):
-    subprocess.run(
-        [system.abaqus_bat_path, "python", script],
-        cwd=model_path,
-    )
+def pp_abaqus(model_path, script, system: System, outputs=()):
+    run_post_processing(model_path, script, system, outputs)
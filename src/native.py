@@ -0,0 +1,372 @@
+import math
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import eigsh, spsolve
+
+from .utils import Pipe, Model, Seabed, get_A
+from .modes import (
+    get_K_V_d,
+    get_K_L_d,
+    get_added_mass,
+    get_number_of_modes,
+    ModeSet,
+    get_mesh,
+    get_tributary_lengths,
+    get_seabed_elevation,
+    calculate_gaps,
+)
+
+DOF = 6
+IN_PLACE_DOF = 3
+
+# fraction of the pipe below the still water level in modal.inp
+SUBMERGED = 0.5
+
+# initial eigenpair count when only a frequency cutoff is given
+BAND_MODES = 20
+
+
+def solve_modal(
+    nodes, gaps, pipe: Pipe, seabed: Seabed, model: Model, number_of_modes=None
+):
+    if number_of_modes is None:
+        number_of_modes = get_number_of_modes(model)
+    nodes = _as_3d(nodes)
+    gaps = np.asarray(gaps, dtype=float)[:, 1]
+    K, M = assemble_modal(nodes, gaps, pipe, seabed, model)
+    size = K.shape[0]
+
+    free = np.ones(size, dtype=bool)
+    free[get_modal_constraints(len(nodes))] = False
+    K = K[free][:, free]
+    M = M[free][:, free]
+
+    frequencies, vectors = get_eigenpairs(
+        K, M, number_of_modes, model.max_frequency, model.shift
+    )
+    k = len(frequencies)
+
+    shapes = np.zeros((k, size))
+    shapes[:, free] = vectors.T
+    shapes = shapes.reshape(k, len(nodes), DOF)[:, :, :3]
+
+    return ModeSet(frequencies, normalise_modes(shapes))
+
+
+def get_eigenpairs(K, M, number_of_modes, max_frequency=None, shift=None):
+    if number_of_modes is None and max_frequency is None:
+        raise ValueError("Either number_of_modes or max_frequency is required")
+    sigma = (2 * np.pi * (shift or 0)) ** 2
+    cutoff = np.inf if max_frequency is None else (2 * np.pi * max_frequency) ** 2
+    limit = K.shape[0] - 2
+    k = min(number_of_modes or BAND_MODES, limit)
+
+    while True:
+        eigenvalues, vectors = eigsh(K, k=k, M=M, sigma=sigma, which="LM")
+        order = np.argsort(eigenvalues)
+        eigenvalues, vectors = eigenvalues[order], vectors[:, order]
+        # shift-invert returns the eigenvalues nearest the shift, so they are
+        # the lowest k once the search radius reaches zero
+        radius = np.max(np.abs(eigenvalues - sigma))
+        lowest = sigma - radius <= 0
+        in_band = eigenvalues <= cutoff
+        found = in_band.sum()
+        if lowest and (
+            k == limit
+            or not in_band[-1]
+            or (number_of_modes is not None and found >= number_of_modes)
+        ):
+            break
+        k = min(2 * k, limit)
+
+    keep = np.flatnonzero(in_band)[:number_of_modes]
+    frequencies = np.sqrt(np.clip(eigenvalues[keep], 0, None)) / (2 * np.pi)
+    return frequencies, vectors[:, keep]
+
+
+def solve_in_place(
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    increments=10,
+    tolerance=1e-8,
+    max_iterations=30,
+    max_cutbacks=10,
+):
+    x = get_mesh(model, pipe, seabed)
+    number_of_nodes = len(x)
+    L = np.diff(x)
+    A, I = get_section(pipe)
+    size = IN_PLACE_DOF * number_of_nodes
+
+    element_dofs = (
+        IN_PLACE_DOF * np.arange(number_of_nodes - 1)[:, None]
+        + np.arange(2 * IN_PLACE_DOF)[None, :]
+    )
+    rows = np.repeat(element_dofs, 2 * IN_PLACE_DOF, axis=1).ravel()
+    cols = np.tile(element_dofs, (1, 2 * IN_PLACE_DOF)).ravel()
+
+    # the in_place.inp boundary conditions: axial and rotation fixed at both ends
+    last = IN_PLACE_DOF * (number_of_nodes - 1)
+    free = np.ones(size, dtype=bool)
+    free[[0, 2, last, last + 2]] = False
+
+    # lumped contact length per node for the linear pressure-overclosure law
+    contact_length = np.zeros(number_of_nodes)
+    contact_length[:-1] += L / 2
+    contact_length[1:] += L / 2
+
+    q = pipe.get_rho_eff() * A * model.g
+    gravity = np.zeros(size)
+    np.add.at(
+        gravity,
+        element_dofs[:, [1, 2, 4, 5]],
+        -q * np.stack((L / 2, L**2 / 12, L / 2, -(L**2) / 12), axis=1),
+    )
+
+    w_dofs = [1, 2, 4, 5]
+    G = _bending(L, [36, 3, 4, -1], 1) / (30 * L[:, None, None])
+    K_b = pipe.E * I / L[:, None, None] ** 3 * _bending(L, [12, 6, 4, 2], 1)
+    EA = pipe.E * A
+    N_0 = get_in_place_force(pipe)
+
+    # the default elastic slip of *FRICTION, 0.5% of the average element length
+    slip = 0.005 * np.mean(L)
+
+    def residual(d, load, anchors):
+        gravity_factor, expansion_factor = load
+        d_e = d[element_dofs]
+        w = d_e[:, w_dofs]
+        Gw = np.einsum("eij,ej->ei", G, w)
+
+        # von Karman axial strain including the sag stretching term
+        b = np.zeros((len(L), 2 * IN_PLACE_DOF))
+        b[:, 0] = -1
+        b[:, 3] = 1
+        b[:, w_dofs] = Gw
+        strain = (d_e[:, 3] - d_e[:, 0]) / L + np.einsum("ei,ei->e", w, Gw) / (2 * L)
+        N = EA * strain - expansion_factor * N_0
+
+        f_e = N[:, None] * b
+        f_e[:, w_dofs] += np.einsum("eij,ej->ei", K_b, w)
+        k_e = EA / L[:, None, None] * np.einsum("ei,ej->eij", b, b)
+        k_e[np.ix_(range(len(L)), w_dofs, w_dofs)] += N[:, None, None] * G + K_b
+
+        f = np.zeros(size)
+        np.add.at(f, element_dofs, f_e)
+        K = sparse.coo_matrix((k_e.ravel(), (rows, cols)), shape=(size, size))
+
+        gap = get_gaps_in_place(x, d, model)
+        k_c = np.zeros(size)
+        k_c[1::IN_PLACE_DOF] = seabed.K_vert_sta * contact_length * (gap <= 0)
+        f[1::IN_PLACE_DOF] += k_c[1::IN_PLACE_DOF] * gap
+
+        # Coulomb friction, sticking within the elastic slip Abaqus allows
+        u = d[0::IN_PLACE_DOF]
+        limit = seabed.mu_ax * k_c[1::IN_PLACE_DOF] * np.maximum(-gap, 0)
+        k_t = limit / slip
+        friction = np.clip(k_t * (u - anchors), -limit, limit)
+        k_c[0::IN_PLACE_DOF] = k_t * (np.abs(friction) < limit)
+        f[0::IN_PLACE_DOF] += friction
+        K = K.tocsc() + sparse.diags(k_c, format="csc")
+
+        # nodes off the seabed carry their anchor so they stick where they land
+        slid = np.divide(friction, k_t, out=np.zeros_like(u), where=k_t > 0)
+        return f - gravity_factor * gravity, K, u - slid
+
+    path = [(k / increments, 0.0) for k in range(1, increments + 1)]
+    path += [(1.0, k / increments) for k in range(1, increments + 1)]
+    load = (0.0, 0.0)
+    d = np.zeros(size)
+    anchors = np.zeros(number_of_nodes)
+    cutbacks = 0
+    scale = max(np.linalg.norm(gravity), 1.0)
+
+    while path:
+        target = path[0]
+        trial = d.copy()
+        for _ in range(max_iterations):
+            R, K, next_anchors = residual(trial, target, anchors)
+            delta = spsolve(K[free][:, free], -R[free])
+            trial[free] += delta
+            if np.linalg.norm(R[free]) < tolerance * scale and np.max(
+                np.abs(delta)
+            ) < tolerance * max(np.max(np.abs(trial)), 1.0):
+                break
+        else:
+            cutbacks += 1
+            if cutbacks > max_cutbacks:
+                raise RuntimeError("In-place analysis did not converge")
+            path.insert(0, tuple((np.array(load) + np.array(target)) / 2))
+            continue
+        anchors = next_anchors
+        d = trial
+        load = target
+        path.pop(0)
+
+    nodes = np.vstack((x + d[0::IN_PLACE_DOF], d[1::IN_PLACE_DOF])).T
+    return nodes, calculate_gaps(nodes, model.bathymetry)
+
+
+def get_in_place_force(pipe: Pipe):
+    # the axial force Abaqus develops in the restrained in_place.inp steps,
+    # thermal compression of the section less a Poisson tension from PI
+    A, _ = get_section(pipe)
+    A_i = get_A(pipe.od - 2 * pipe.wt)
+    return pipe.E * A * pipe.alpha * pipe.T - pipe.nu * pipe.Pi * A_i
+
+
+def get_gaps_in_place(x, d, model: Model):
+    X = x + d[0::IN_PLACE_DOF]
+    return d[1::IN_PLACE_DOF] - get_seabed_elevation(X, model.bathymetry)
+
+
+def assemble_modal(nodes, gaps, pipe: Pipe, seabed: Seabed, model: Model):
+    nodes = _as_3d(nodes)
+    number_of_nodes = len(nodes)
+    A, I = get_section(pipe)
+    m = pipe.get_rho_eff() * A
+
+    # added mass coefficient per element from the average gap, as in *D ADDED MASS;
+    # the modal.inp nodes lie on the *AQUA still water level at z = 0, so Abaqus
+    # applies the FI added mass of a half submerged section
+    avg_gaps = np.maximum((gaps[1:] + gaps[:-1]) / 2, 0)
+    Ca = np.array([get_added_mass(e, pipe.od) for e in avg_gaps])
+    m_a = SUBMERGED * Ca * model.rho_sw * get_A(pipe.od)
+
+    # initial stress applied as *INITIAL CONDITIONS, TYPE=STRESS in the modal deck
+    N = pipe.get_sigma_ax() * A
+
+    L, T = get_element_transformations(nodes)
+    k_e = beam_stiffness(L, pipe.E, pipe.nu, A, I) + geometric_stiffness(L, N)
+    m_e = beam_mass(L, m, m_a, 2 * I / A)
+    k_e = np.einsum("eji,ejk,ekl->eil", T, k_e, T)
+    m_e = np.einsum("eji,ejk,ekl->eil", T, m_e, T)
+
+    element_dofs = (
+        DOF * np.arange(number_of_nodes - 1)[:, None] + np.arange(2 * DOF)[None, :]
+    )
+    rows = np.repeat(element_dofs, 2 * DOF, axis=1).ravel()
+    cols = np.tile(element_dofs, (1, 2 * DOF)).ravel()
+    size = DOF * number_of_nodes
+
+    K = sparse.coo_matrix((k_e.ravel(), (rows, cols)), shape=(size, size)).tocsc()
+    M = sparse.coo_matrix((m_e.ravel(), (rows, cols)), shape=(size, size)).tocsc()
+
+    contacts = np.flatnonzero(gaps <= 0)
+    springs = np.zeros(size)
+    lengths = get_tributary_lengths(nodes[:, 0])[contacts]
+    springs[DOF * contacts] = seabed.K_ax_dyn * lengths
+    springs[DOF * contacts + 1] = get_K_V_d(pipe, seabed, model) * lengths
+    springs[DOF * contacts + 2] = get_K_L_d(pipe, seabed, model) * lengths
+    K = K + sparse.diags(springs, format="csc")
+
+    return K, M
+
+
+def get_modal_constraints(number_of_nodes):
+    # boundary conditions of the FREQUENCY EXTRACTION step in write_modal_inp
+    last = DOF * (number_of_nodes - 1)
+    torsion = DOF * np.arange(number_of_nodes) + 3
+    return np.unique(np.concatenate((np.arange(DOF), [last + 1, last + 2], torsion)))
+
+
+def get_section(pipe: Pipe):
+    # the decks write od on the *BEAM SECTION line, which Abaqus reads as the
+    # outside radius, so this is the section the Abaqus models are solved with
+    r = pipe.od
+    A = math.pi * (r**2 - (r - pipe.wt) ** 2)
+    I = math.pi * (r**4 - (r - pipe.wt) ** 4) / 4
+    return A, I
+
+
+def normalise_modes(shapes):
+    flat = shapes.reshape(len(shapes), -1)
+    peak = flat[np.arange(len(shapes)), np.argmax(np.abs(flat), axis=1)]
+    return shapes / peak[:, None, None]
+
+
+def get_element_transformations(nodes):
+    d = nodes[1:] - nodes[:-1]
+    L = np.linalg.norm(d, axis=1)
+    e1 = d / L[:, None]
+    ref = np.tile([0.0, 0.0, 1.0], (len(L), 1))
+    ref[np.abs(e1[:, 2]) > 0.99] = [0.0, 1.0, 0.0]
+    e2 = np.cross(ref, e1)
+    e2 /= np.linalg.norm(e2, axis=1)[:, None]
+    e3 = np.cross(e1, e2)
+
+    R = np.stack((e1, e2, e3), axis=1)
+    T = np.zeros((len(L), 2 * DOF, 2 * DOF))
+    for b in range(4):
+        T[:, 3 * b : 3 * b + 3, 3 * b : 3 * b + 3] = R
+    return L, T
+
+
+def beam_stiffness(L, E, nu, A, I):
+    G = E / (2 * (1 + nu))
+    k = np.zeros((len(L), 2 * DOF, 2 * DOF))
+    _add(k, (0, 6), E * A / L, [[1, -1], [-1, 1]])
+    _add(k, (3, 9), G * 2 * I / L, [[1, -1], [-1, 1]])
+    EI = E * I / L**3
+    _add(k, (1, 5, 7, 11), EI, _bending(L, [12, 6, 4, 2], 1))
+    _add(k, (2, 4, 8, 10), EI, _bending(L, [12, 6, 4, 2], -1))
+    return k
+
+
+def geometric_stiffness(L, N):
+    k = np.zeros((len(L), 2 * DOF, 2 * DOF))
+    _add(k, (1, 5, 7, 11), N / (30 * L), _bending(L, [36, 3, 4, -1], 1))
+    _add(k, (2, 4, 8, 10), N / (30 * L), _bending(L, [36, 3, 4, -1], -1))
+    return k
+
+
+def beam_mass(L, m, m_a, r2):
+    mass = np.zeros((len(L), 2 * DOF, 2 * DOF))
+    _add(mass, (0, 6), m * L / 6, [[2, 1], [1, 2]])
+    _add(mass, (3, 9), m * r2 * L / 6, [[2, 1], [1, 2]])
+    mt = (m + m_a) * L / 420
+    _add(mass, (1, 5, 7, 11), mt, _bending_mass(L, 1))
+    _add(mass, (2, 4, 8, 10), mt, _bending_mass(L, -1))
+    return mass
+
+
+def _bending(L, c, s):
+    # Hermite beam matrix pattern; s flips the rotation sign for the x-z plane
+    a, b, d, e = c
+    L = L[:, None, None]
+    return np.block(
+        [
+            [a + 0 * L, s * b * L, -a + 0 * L, s * b * L],
+            [s * b * L, d * L**2, -s * b * L, e * L**2],
+            [-a + 0 * L, -s * b * L, a + 0 * L, -s * b * L],
+            [s * b * L, e * L**2, -s * b * L, d * L**2],
+        ]
+    )
+
+
+def _bending_mass(L, s):
+    L = L[:, None, None]
+    return np.block(
+        [
+            [156 + 0 * L, s * 22 * L, 54 + 0 * L, -s * 13 * L],
+            [s * 22 * L, 4 * L**2, s * 13 * L, -3 * L**2],
+            [54 + 0 * L, s * 13 * L, 156 + 0 * L, -s * 22 * L],
+            [-s * 13 * L, -3 * L**2, -s * 22 * L, 4 * L**2],
+        ]
+    )
+
+
+def _add(k, dofs, factor, pattern):
+    idx = np.ix_(range(k.shape[0]), dofs, dofs)
+    k[idx] += np.asarray(factor)[..., None, None] * np.broadcast_to(
+        pattern, (k.shape[0], len(dofs), len(dofs))
+    )
+
+
+def _as_3d(nodes):
+    nodes = np.asarray(nodes, dtype=float)
+    if nodes.shape[1] == 2:
+        nodes = np.hstack((nodes, np.zeros((len(nodes), 1))))
+    return nodes
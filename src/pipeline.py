@@ -0,0 +1,243 @@
+from collections import namedtuple
+import dataclasses
+import glob
+import hashlib
+import json
+from pathlib import Path
+
+from .utils import Pipe, Model, Seabed, System
+from . import modes as m
+
+Stage = namedtuple("Stage", "name inputs dependencies outputs run")
+
+PlanItem = namedtuple("PlanItem", "stage run reason")
+
+STATE_FILE = "pipeline.json"
+
+PIPE_INPUTS = [f"Pipe.{f.name}" for f in dataclasses.fields(Pipe)]
+
+MESH_INPUTS = [
+    "Model.element_length",
+    "Model.min_element_length",
+    "Model.mesh_growth",
+]
+
+IN_PLACE_INPUTS = PIPE_INPUTS + [
+    *MESH_INPUTS,
+    "Model.g",
+    "Model.bathymetry",
+    "Model.output_profile",
+    "Seabed.K_vert_sta",
+    "Seabed.mu_ax",
+]
+
+MODAL_INPUTS = PIPE_INPUTS + [
+    *MESH_INPUTS,
+    "Model.g",
+    "Model.water_depth",
+    "Model.rho_sw",
+    "Model.number_of_modes",
+    "Model.max_frequency",
+    "Model.shift",
+    "Model.eigensolver",
+    "Model.output_profile",
+    "Seabed.K_ax_dyn",
+    "Seabed.C_V",
+    "Seabed.C_L",
+    "Seabed.nu",
+]
+
+
+def get_stages(in_place_solver="abaqus", modal_solver="abaqus"):
+    stages = []
+    if in_place_solver == "native":
+        stages.append(
+            Stage(
+                "in_place",
+                IN_PLACE_INPUTS + ["native"],
+                [],
+                ["in_place_nodes.dat", "gaps.dat"],
+                _run_native_in_place,
+            )
+        )
+    else:
+        stages += [
+            Stage(
+                "in_place",
+                IN_PLACE_INPUTS,
+                [],
+                ["in_place.odb"],
+                lambda p, model, pipe, seabed, system: m.run_in_place(
+                    p, model, pipe, seabed, system
+                ),
+            ),
+            Stage(
+                "in_place_pp",
+                ["Model.bathymetry"],
+                ["in_place.odb"],
+                ["in_place_nodes.dat", "gaps.dat"],
+                lambda p, model, pipe, seabed, system: m.pp_in_place(
+                    p, model, system
+                ),
+            ),
+        ]
+
+    if modal_solver == "native":
+        # results stay in memory, so the native modal stage always runs
+        stages.append(
+            Stage(
+                "modal",
+                MODAL_INPUTS + ["native"],
+                ["in_place_nodes.dat", "gaps.dat"],
+                [],
+                _run_native_modal,
+            )
+        )
+    else:
+        stages += [
+            Stage(
+                "modal",
+                MODAL_INPUTS,
+                ["in_place_nodes.dat", "gaps.dat"],
+                ["modal.odb"],
+                lambda p, model, pipe, seabed, system: m.run_modal(
+                    p, pipe, seabed, model, system
+                ),
+            ),
+            Stage(
+                "modal_pp",
+                [],
+                ["modal.odb"],
+                ["freqs.dat", m.MODES_FILE],
+                lambda p, model, pipe, seabed, system: m.pp_modal(p, system),
+            ),
+        ]
+    return stages
+
+
+def run_pipeline(
+    model_path,
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    system: System,
+    in_place_solver="abaqus",
+    modal_solver="abaqus",
+    dry_run=False,
+):
+    stages = get_stages(in_place_solver, modal_solver)
+    if dry_run:
+        return plan(model_path, stages, model, pipe, seabed)
+
+    state = read_state(model_path)
+    modes = None
+    for stage in stages:
+        run, _ = get_status(model_path, stage, state, model, pipe, seabed)
+        if run:
+            modes = stage.run(model_path, model, pipe, seabed, system)
+            state[stage.name] = get_fingerprint(model_path, stage, model, pipe, seabed)
+            write_state(model_path, state)
+
+    if modal_solver == "native":
+        return modes
+    return m.get_modes(Path(model_path))
+
+
+def plan(model_path, stages, model: Model, pipe: Pipe, seabed: Seabed):
+    state = read_state(model_path)
+    items = []
+    rerun = set()
+    for stage in stages:
+        run, reason = get_status(model_path, stage, state, model, pipe, seabed)
+        produced = set().union(*(s.outputs for s in stages if s.name in rerun))
+        if not run and produced.intersection(stage.dependencies):
+            run, reason = True, "upstream stage reruns"
+        if run:
+            rerun.add(stage.name)
+        items.append(PlanItem(stage.name, run, reason))
+    return items
+
+
+def format_plan(items):
+    return "\n".join(
+        f"{i.stage:<12} {'run' if i.run else 'skip':<5} {i.reason}" for i in items
+    )
+
+
+def get_status(model_path, stage, state, model, pipe, seabed):
+    record = state.get(stage.name)
+    if record is None:
+        return True, "never run"
+    if record["inputs"] != hash_inputs(stage, model, pipe, seabed):
+        return True, "inputs changed"
+    if record["dependencies"] != hash_files(model_path, stage.dependencies):
+        return True, "upstream artifacts changed"
+    if not stage.outputs:
+        return True, "no persisted outputs"
+    if record["outputs"] != hash_files(model_path, stage.outputs):
+        return True, "outputs missing or modified"
+    return False, "up to date"
+
+
+def get_fingerprint(model_path, stage, model, pipe, seabed):
+    return {
+        "inputs": hash_inputs(stage, model, pipe, seabed),
+        "dependencies": hash_files(model_path, stage.dependencies),
+        "outputs": hash_files(model_path, stage.outputs),
+    }
+
+
+def hash_inputs(stage, model, pipe, seabed):
+    sections = {"Model": model, "Pipe": pipe, "Seabed": seabed}
+    values = {}
+    for name in stage.inputs:
+        if "." in name:
+            section, field = name.split(".")
+            values[name] = getattr(sections[section], field)
+        else:
+            values[name] = True
+    return _hash(json.dumps(values, sort_keys=True).encode())
+
+
+def hash_files(model_path, patterns):
+    hashes = {}
+    for pattern in patterns:
+        files = sorted(glob.glob(pattern, root_dir=model_path))
+        if not files:
+            hashes[pattern] = None
+        for f in files:
+            # ODBs run to gigabytes, so files are hashed in chunks
+            with open(Path(model_path, f), "rb") as data:
+                hashes[f] = hashlib.file_digest(data, "sha256").hexdigest()
+    return hashes
+
+
+def read_state(model_path):
+    path = Path(model_path, STATE_FILE)
+    if not path.is_file():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_state(model_path, state):
+    with open(Path(model_path, STATE_FILE), "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def _run_native_in_place(model_path, model, pipe, seabed, system):
+    from .native import solve_in_place
+
+    nodes, gaps = solve_in_place(model, pipe, seabed)
+    m.write_in_place_results(model_path, nodes, gaps)
+
+
+def _run_native_modal(model_path, model, pipe, seabed, system):
+    from .native import solve_modal
+
+    nodes, gaps = m.read_in_place_nodes(model_path), m.get_gaps(model_path)
+    return solve_modal(nodes, gaps, pipe, seabed, model)
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,47 @@
+# Runs under the Abaqus Python interpreter, which may be Python 2.7, so this
+# file must not use anything newer than the shared subset of 2.7 and 3.x.
+import json
+import os
+import sys
+import traceback
+
+MARKER = "@@pp "
+
+
+def reply(**kwargs):
+    # Abaqus may print its own banner, so replies are tagged
+    sys.stdout.write(MARKER + json.dumps(kwargs) + "\n")
+    sys.stdout.flush()
+
+
+def close_odbs(namespace):
+    for value in namespace.values():
+        if type(value).__name__ == "Odb":
+            try:
+                value.close()
+            except Exception:
+                pass
+
+
+def main():
+    reply(ok=True, pid=os.getpid())
+    for line in iter(sys.stdin.readline, ""):
+        request = json.loads(line)
+        if request.get("exit"):
+            break
+        namespace = {"__name__": "__main__"}
+        try:
+            os.chdir(request["cwd"])
+            with open(request["script"]) as f:
+                code = compile(f.read(), request["script"], "exec")
+            exec(code, namespace)
+        except BaseException:
+            reply(ok=False, error=traceback.format_exc())
+        else:
+            reply(ok=True)
+        finally:
+            close_odbs(namespace)
+
+
+if __name__ == "__main__":
+    main()
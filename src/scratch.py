@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import gzip
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+RETENTION = ("results", "compressed", "all")
+
+RESULT_PATTERNS = [
+    "in_place_nodes.dat",
+    "gaps.dat",
+    "in_place_coords*.npy",
+    "modes.npy",
+    "mode_*.dat",
+    "freqs.dat",
+    "metrics.jsonl",
+    "*.png",
+    "*.csv",
+]
+
+# RAM-backed storage on Linux
+TMPFS = "/dev/shm"
+
+
+class ScratchSpace:
+    def __init__(self, root=None, retention="results"):
+        if retention not in RETENTION:
+            raise ValueError(f"Unknown retention policy: {retention}")
+        self.root = get_scratch_root(root)
+        self.retention = retention
+        self._executor = None
+        self._pending = []
+
+    def __getstate__(self):
+        return {"root": self.root, "retention": self.retention}
+
+    def __setstate__(self, state):
+        self.__init__(state["root"], state["retention"])
+
+    @contextmanager
+    def run(self, model_path, keep=()):
+        path = Path(tempfile.mkdtemp(prefix="viv_", dir=self.root))
+        failed = False
+        try:
+            yield path
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # everything is kept when the case failed, to debug it
+            retention = "all" if failed else self.retention
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            self._pending.append(
+                self._executor.submit(retain, path, Path(model_path), retention, keep)
+            )
+
+    def wait(self):
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+
+def get_scratch_root(root=None):
+    if root is None:
+        return Path(tempfile.gettempdir())
+    if root == "tmpfs":
+        return Path(TMPFS if os.path.isdir(TMPFS) else tempfile.gettempdir())
+    Path(root).mkdir(parents=True, exist_ok=True)
+    return Path(root)
+
+
+def retain(scratch_path, model_path, retention, keep=()):
+    files = [p.relative_to(scratch_path) for p in scratch_path.rglob("*")]
+    files = [f for f in files if Path(scratch_path, f).is_file()]
+    for f in files:
+        source, target = Path(scratch_path, f), Path(model_path, f)
+        if retention == "all" or is_result(f, keep):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(source, target)
+        elif retention == "compressed" and f.suffix == ".odb":
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(source, "rb") as i, gzip.open(f"{target}.gz", "wb") as o:
+                shutil.copyfileobj(i, o)
+    shutil.rmtree(scratch_path)
+
+
+def is_result(path, keep=()):
+    return any(path.match(pattern) for pattern in [*RESULT_PATTERNS, *keep])
@@ -0,0 +1,219 @@
+from dataclasses import dataclass
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .utils import Pipe, Model, Seabed, System, get_A
+from .modes import get_added_mass, get_K_V_d, get_K_L_d
+from .sweep import SweepCase, run_sweep
+
+# DNV-RP-F105 boundary condition coefficients for a single span on the seabed
+C1 = 3.56
+C2 = 4.0
+C3 = 0.4
+C6 = 1 / 384
+
+# reduced velocities at the onset of in-line and cross-flow VIV
+ONSET = {"inline": 1.0, "cross-flow": 2.0}
+
+
+@dataclass
+class ScreeningResult:
+    start: np.ndarray
+    end: np.ndarray
+    gap: np.ndarray
+    frequencies: dict
+    risk: np.ndarray
+    critical: np.ndarray
+
+    @property
+    def length(self):
+        return self.end - self.start
+
+    def get_critical_spans(self):
+        return [
+            (s, e) for s, e in zip(self.start[self.critical], self.end[self.critical])
+        ]
+
+    def to_csv(self, path):
+        with open(path, "w") as f:
+            f.write("start,end,length,gap,f_inline,f_cross_flow,risk,critical\n")
+            for n in range(len(self.start)):
+                values = [
+                    self.start[n],
+                    self.end[n],
+                    self.length[n],
+                    self.gap[n],
+                    self.frequencies["inline"][n],
+                    self.frequencies["cross-flow"][n],
+                    self.risk[n],
+                ]
+                f.write(",".join(f"{v:.6e}" for v in values))
+                f.write(f",{bool(self.critical[n])}\n")
+
+
+def cli(input_file_path, model_path=None):
+    import tomllib
+
+    from .survey import apply_survey
+
+    if model_path is None:
+        model_path = os.getcwd()
+
+    with open(Path(input_file_path), "rb") as i:
+        inputs = tomllib.load(i)
+    inputs = apply_survey(inputs, model_path)
+
+    screening = inputs["Screening"]
+    result, sweep = run_screening(
+        model_path,
+        Model(**inputs["Model"]),
+        Pipe(**inputs["Pipe"]),
+        Seabed(**inputs["Seabed"]),
+        System(**inputs["System"]),
+        screening["current_velocity"],
+        threshold=screening.get("threshold", 1.0),
+        margin=screening.get("margin"),
+        max_cpus=screening.get("max_cpus"),
+        max_tokens=screening.get("max_tokens"),
+        in_place_solver=screening.get("in_place_solver", "abaqus"),
+        modal_solver=screening.get("modal_solver", "abaqus"),
+    )
+    result.to_csv(Path(model_path, "spans.csv"))
+    if sweep is not None:
+        sweep.to_csv(Path(model_path, "span_freqs.csv"))
+    return result, sweep
+
+
+def screen_spans(
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    current_velocity,
+    threshold=1.0,
+    min_gap=1e-3,
+):
+    start, end, gap = get_spans(model.bathymetry, min_gap)
+    frequencies = get_span_frequencies(end - start, gap, pipe, seabed, model)
+    # ratio of the onset frequency to the span frequency, VIV starts at 1
+    risk = np.zeros_like(start)
+    for direction, f in frequencies.items():
+        f_onset = current_velocity / (ONSET[direction] * pipe.od)
+        # a zero frequency is a span predicted to buckle, always forwarded
+        with np.errstate(divide="ignore"):
+            risk = np.maximum(risk, f_onset / f)
+    return ScreeningResult(start, end, gap, frequencies, risk, risk >= threshold)
+
+
+def get_spans(bathymetry, min_gap=1e-3):
+    points = np.asarray(bathymetry, dtype=float)
+    x, z = points[:, 0], points[:, 1]
+    hull = get_upper_hull(x, z)
+
+    # the unloaded pipe rests on the upper hull, so the seabed under each
+    # hull edge is the span gap
+    line = np.interp(x, x[hull], z[hull])
+    edge = np.clip(
+        np.searchsorted(hull, np.arange(len(x)), "right") - 1, 0, len(hull) - 2
+    )
+    gaps = np.zeros(len(hull) - 1)
+    np.maximum.at(gaps, edge, line - z)
+
+    spans = gaps > min_gap
+    return x[hull[:-1]][spans], x[hull[1:]][spans], gaps[spans]
+
+
+def get_upper_hull(x, z):
+    hull = []
+    for k in range(len(x)):
+        # collinear points are kept, they are where the pipe is supported
+        while len(hull) > 1:
+            o, a = hull[-2], hull[-1]
+            cross = (x[a] - x[o]) * (z[k] - z[o]) - (z[a] - z[o]) * (x[k] - x[o])
+            if cross <= 0:
+                break
+            hull.pop()
+        hull.append(k)
+    return np.array(hull)
+
+
+def get_span_frequencies(lengths, gaps, pipe: Pipe, seabed: Seabed, model: Model):
+    from .native import get_section, SUBMERGED
+
+    # the section, added mass and axial force of the FE model, so the screen
+    # forwards the spans the FE pipeline would find at risk; as in the modal
+    # deck's initial stress, get_sigma_ax is positive in tension
+    A, I = get_section(pipe)
+    EI = pipe.E * I
+    m_pipe = pipe.get_rho_eff() * A
+    Ca = np.array([get_added_mass(e, pipe.od) for e in gaps])
+    m_e = m_pipe + SUBMERGED * Ca * model.rho_sw * get_A(pipe.od)
+    q = (m_pipe - model.rho_sw * get_A(pipe.od)) * model.g
+    S_eff = pipe.get_sigma_ax() * A
+
+    frequencies = {}
+    for direction, K, c3 in [
+        ("inline", get_K_L_d(pipe, seabed, model), 0),
+        ("cross-flow", get_K_V_d(pipe, seabed, model), C3),
+    ]:
+        L_eff = lengths * get_effective_length_ratio(K * lengths**4 / EI)
+        P_cr = C2 * math.pi**2 * EI / L_eff**2
+        # the sag cannot exceed the gap, the pipe would touch down
+        delta = C6 * q * L_eff**4 / (EI * (1 + S_eff / P_cr))
+        delta = np.clip(delta, 0, gaps)
+        factor = np.clip(1 + S_eff / P_cr + c3 * (delta / pipe.od) ** 2, 0, None)
+        frequencies[direction] = C1 * np.sqrt(EI / (m_e * L_eff**4) * factor)
+    return frequencies
+
+
+def get_effective_length_ratio(stiffness_ratio):
+    beta = np.log10(stiffness_ratio)
+    return np.where(
+        beta >= 2.7,
+        4.73 / (-0.066 * beta**2 + 1.02 * beta + 0.63),
+        4.73 / (0.036 * beta**2 + 0.61 * beta + 1.0),
+    )
+
+
+def crop_model(model: Model, start, end, margin=None):
+    if margin is None:
+        margin = end - start
+    points = np.asarray(model.bathymetry, dtype=float)
+    x0, x1 = points[0, 0], points[-1, 0]
+    # keep the cropped nodes on the same grid as the full route
+    h = model.element_length
+    a = float(max(x0, x0 + math.floor((start - margin - x0) / h) * h))
+    b = float(min(x1, x0 + math.ceil((end + margin - x0) / h) * h))
+    inside = [p.tolist() for p in points if a < p[0] < b]
+    z_a, z_b = np.interp([a, b], points[:, 0], points[:, 1]).tolist()
+    return model._replace(bathymetry=[[a, z_a]] + inside + [[b, z_b]])
+
+
+def run_screening(
+    model_path,
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    system: System,
+    current_velocity,
+    threshold=1.0,
+    margin=None,
+    **kwargs,
+):
+    screening = screen_spans(model, pipe, seabed, current_velocity, threshold)
+    cases = [
+        SweepCase(
+            f"span_{n+1:03d}",
+            {"start": start, "end": end},
+            crop_model(model, start, end, margin),
+            pipe,
+            seabed,
+            system,
+        )
+        for n, (start, end) in enumerate(screening.get_critical_spans())
+    ]
+    if not cases:
+        return screening, None
+    return screening, run_sweep(model_path, cases, **kwargs)
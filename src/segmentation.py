@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .utils import Pipe, Model, Seabed, System
+from .modes import ModeSet, get_mode_shapes, get_mesh
+from .screening import get_spans, crop_model
+from .sweep import SweepCase, get_workers
+
+
+def cli(input_file_path, model_path=None):
+    import tomllib
+
+    from .survey import apply_survey
+
+    if model_path is None:
+        model_path = os.getcwd()
+
+    with open(Path(input_file_path), "rb") as i:
+        inputs = tomllib.load(i)
+    inputs = apply_survey(inputs, model_path)
+
+    segmentation = inputs["Segmentation"]
+    modes = run_segmented(
+        model_path,
+        Model(**inputs["Model"]),
+        Pipe(**inputs["Pipe"]),
+        Seabed(**inputs["Seabed"]),
+        System(**inputs["System"]),
+        segmentation["support_length"],
+        max_cpus=segmentation.get("max_cpus"),
+        max_tokens=segmentation.get("max_tokens"),
+        in_place_solver=segmentation.get("in_place_solver", "abaqus"),
+        modal_solver=segmentation.get("modal_solver", "abaqus"),
+    )
+    with open(Path(model_path, "route_freqs.csv"), "w") as f:
+        f.write("mode,frequency,direction,window\n")
+        for k, v in modes.items():
+            f.write(f"{k},{v['frequency']:.6e},{v['direction']},{v['window']}\n")
+    return modes
+
+
+def get_windows(model: Model, support_length, min_gap=1e-3):
+    start, end, _ = get_spans(model.bathymetry, min_gap)
+    spans = []
+    for a, b in zip(start.tolist(), end.tolist()):
+        # spans separated by less than the support length interact, so they
+        # share a window
+        if spans and a - spans[-1][1] < support_length:
+            spans[-1][1] = b
+        else:
+            spans.append([a, b])
+    return [crop_model(model, a, b, support_length) for a, b in spans]
+
+
+def run_segmented(
+    model_path,
+    model: Model,
+    pipe: Pipe,
+    seabed: Seabed,
+    system: System,
+    support_length,
+    max_cpus=None,
+    max_tokens=None,
+    in_place_solver="abaqus",
+    modal_solver="abaqus",
+):
+    cases = [
+        SweepCase(
+            f"window_{n+1:03d}",
+            {"start": w.bathymetry[0][0], "end": w.bathymetry[-1][0]},
+            w,
+            pipe,
+            seabed,
+            system,
+        )
+        for n, w in enumerate(get_windows(model, support_length))
+    ]
+    if not cases:
+        return ModeSet(np.zeros(0), np.zeros((0, 0, 3)))
+    workers = get_workers(
+        cases, max_cpus, max_tokens, "abaqus" in (in_place_solver, modal_solver)
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for case in cases:
+            case_path = Path(model_path, case.name)
+            case_path.mkdir(parents=True, exist_ok=True)
+            futures.append(
+                pool.submit(run_window, case_path, case, in_place_solver, modal_solver)
+            )
+        results = [f.result() for f in futures]
+
+    return stitch_modes(get_mesh(model, pipe, seabed), cases, results)
+
+
+def run_window(case_path, case: SweepCase, in_place_solver, modal_solver):
+    modes = get_mode_shapes(
+        case_path,
+        case.model,
+        case.pipe,
+        case.seabed,
+        case.system,
+        in_place_solver=in_place_solver,
+        modal_solver=modal_solver,
+    )
+    return get_mesh(case.model, case.pipe, case.seabed), modes
+
+
+def stitch_modes(x, cases, results):
+    frequencies, shapes, windows = [], [], []
+    for case, (kp, modes) in zip(cases, results):
+        # the window is zero outside its own extent along the route
+        inside = (x >= kp[0]) & (x <= kp[-1])
+        stitched = np.zeros((len(modes), len(x), modes.shapes.shape[2]))
+        for c in range(stitched.shape[2]):
+            for n, ms in enumerate(modes.shapes):
+                stitched[n, inside, c] = np.interp(x[inside], kp, ms[:, c])
+        frequencies.append(modes.frequencies)
+        shapes.append(stitched)
+        windows += [case.name] * len(modes)
+    frequencies = np.concatenate(frequencies)
+    order = np.argsort(frequencies, kind="stable")
+    return ModeSet(
+        frequencies[order],
+        np.concatenate(shapes)[order],
+        fields={"window": [windows[n] for n in order]},
+    )
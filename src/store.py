@@ -0,0 +1,172 @@
+from contextlib import closing
+from datetime import datetime
+import numbers
+import os
+from pathlib import Path
+import sqlite3
+import uuid
+
+import numpy as np
+
+from .modes import ModeSet, DIRECTIONS
+
+DATABASE = "results.sqlite"
+
+OPERATORS = ("<", "<=", ">", ">=", "=", "!=")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    run TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (run, name)
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    case_id INTEGER NOT NULL REFERENCES cases(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS parameters_value ON parameters(name, value, case_id);
+CREATE INDEX IF NOT EXISTS parameters_text ON parameters(name, text, case_id);
+CREATE TABLE IF NOT EXISTS modes (
+    case_id INTEGER NOT NULL REFERENCES cases(id) ON DELETE CASCADE,
+    mode INTEGER NOT NULL,
+    frequency REAL NOT NULL,
+    direction TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS modes_direction ON modes(case_id, direction, frequency);
+CREATE INDEX IF NOT EXISTS modes_number ON modes(case_id, mode);
+"""
+
+
+class ResultStore:
+    def __init__(self, path, run=None):
+        # cases are recorded under a run, so sweeps reusing case names do not
+        # replace each other, and are found by "<run>/<case>" keys
+        if run is None:
+            run = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        if "/" in run:
+            raise ValueError(f"Run names cannot contain '/': {run}")
+        self.path = Path(path)
+        self.run = run
+        Path(self.path, "shapes").mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    def __getstate__(self):
+        return {"path": self.path, "run": self.run}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["run"])
+
+    def add(self, name, parameters, modes: ModeSet):
+        # the shapes are written first so a recorded case always has them
+        shapes = self._get_shapes_path(self.run, name)
+        shapes.parent.mkdir(exist_ok=True)
+        partial = shapes.with_name(f"{name}.{uuid.uuid4().hex}.npy")
+        np.save(partial, np.asarray(modes.shapes))
+        os.replace(partial, shapes)
+
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM cases WHERE run = ? AND name = ?", (self.run, name))
+            case_id = db.execute(
+                "INSERT INTO cases (run, name) VALUES (?, ?)", (self.run, name)
+            ).lastrowid
+            db.executemany(
+                "INSERT INTO parameters VALUES (?, ?, ?, ?)",
+                [(case_id, k, *_split(v)) for k, v in parameters.items()],
+            )
+            db.executemany(
+                "INSERT INTO modes VALUES (?, ?, ?, ?)",
+                [
+                    (case_id, k, float(f), d)
+                    for k, f, d in zip(
+                        modes.numbers, modes.frequencies, modes.directions
+                    )
+                ],
+            )
+
+    def find(self, *conditions, run=None):
+        # a condition is (key, operator, value) where key is a parameter name,
+        # "f<n>" for the frequency of mode n or a direction for the first
+        # mode in that direction
+        clauses, values = [], []
+        for key, op, value in conditions:
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator: {op}")
+            if key in DIRECTIONS:
+                clauses.append(
+                    "(SELECT MIN(m.frequency) FROM modes m "
+                    f"WHERE m.case_id = c.id AND m.direction = ?) {op} ?"
+                )
+                values += [key, value]
+            elif key[0] == "f" and key[1:].isdigit():
+                clauses.append(
+                    "(SELECT m.frequency FROM modes m "
+                    f"WHERE m.case_id = c.id AND m.mode = ?) {op} ?"
+                )
+                values += [int(key[1:]), value]
+            else:
+                column = "text" if isinstance(value, str) else "value"
+                clauses.append(
+                    "c.id IN (SELECT p.case_id FROM parameters p "
+                    f"WHERE p.name = ? AND p.{column} {op} ?)"
+                )
+                values += [key, value]
+
+        if run is not None:
+            clauses.append("c.run = ?")
+            values.append(run)
+
+        sql = "SELECT c.run || '/' || c.name FROM cases c"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with closing(self._connect()) as db:
+            return [r[0] for r in db.execute(sql + " ORDER BY c.run, c.name", values)]
+
+    def get_parameters(self, key):
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT p.name, p.value, p.text FROM parameters p "
+                "JOIN cases c ON c.id = p.case_id WHERE c.run = ? AND c.name = ?",
+                self._split_key(key),
+            ).fetchall()
+        return {k: value if text is None else text for k, value, text in rows}
+
+    def get_modes(self, key):
+        run, name = self._split_key(key)
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT m.mode, m.frequency FROM modes m "
+                "JOIN cases c ON c.id = m.case_id "
+                "WHERE c.run = ? AND c.name = ? ORDER BY m.mode",
+                (run, name),
+            ).fetchall()
+        if not rows:
+            raise KeyError(key)
+        numbers, frequencies = zip(*rows)
+        shapes = np.load(self._get_shapes_path(run, name), mmap_mode="r")
+        return ModeSet(np.array(frequencies), shapes, numbers)
+
+    def _split_key(self, key):
+        # a bare case name is a case of this store's run
+        run, _, name = key.rpartition("/")
+        return run or self.run, name
+
+    def _get_shapes_path(self, run, name):
+        return Path(self.path, "shapes", run, f"{name}.npy")
+
+    def _connect(self):
+        db = sqlite3.connect(Path(self.path, DATABASE), timeout=60)
+        db.execute("PRAGMA foreign_keys = ON")
+        return db
+
+
+def _split(value):
+    if value is None:
+        return None, None
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return float(value), None
+    return None, str(value)
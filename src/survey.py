@@ -0,0 +1,136 @@
+import csv
+from dataclasses import dataclass
+import itertools
+from pathlib import Path
+
+import numpy as np
+
+from .screening import get_spans
+
+CHUNK_SIZE = 100_000
+
+BINARY = (".npy", ".bin")
+
+
+@dataclass
+class SurveyProfile:
+    points: np.ndarray
+    raw_points: int
+    error: float
+
+    @property
+    def bathymetry(self):
+        return self.points.tolist()
+
+    def to_csv(self, path):
+        with open(path, "w") as f:
+            f.write(f"# {self.raw_points} survey points, max error {self.error:.6e}\n")
+            f.write("x,z\n")
+            for x, z in self.points:
+                f.write(f"{x:.6f},{z:.6f}\n")
+
+
+def apply_survey(inputs, model_path=None):
+    if "Survey" not in inputs:
+        return inputs
+    survey = inputs["Survey"]
+    profile = load_survey(
+        survey["path"],
+        tolerance=survey.get("tolerance"),
+        columns=survey.get("columns", (0, 1)),
+        chunk_size=survey.get("chunk_size", CHUNK_SIZE),
+    )
+    if model_path is not None:
+        profile.to_csv(Path(model_path, "bathymetry.csv"))
+    return {**inputs, "Model": {**inputs["Model"], "bathymetry": profile.bathymetry}}
+
+
+def load_survey(path, tolerance=None, columns=(0, 1), chunk_size=CHUNK_SIZE):
+    raw_points = 0
+    error = 0.0
+    kept = []
+    last = None
+    for chunk in read_survey(path, columns, chunk_size):
+        raw_points += len(chunk)
+        # carry the last kept point over so the chunks join without a gap
+        if last is not None:
+            chunk = np.vstack([last, chunk])
+        if tolerance is not None:
+            keep = simplify_profile(chunk, tolerance)
+            error = max(error, get_profile_error(chunk, chunk[keep]))
+            chunk = chunk[keep]
+        kept.append(chunk if last is None else chunk[1:])
+        last = chunk[-1:]
+    if raw_points < 2:
+        raise ValueError(f"The survey {path} has fewer than two points")
+    return SurveyProfile(np.vstack(kept), raw_points, error)
+
+
+def read_survey(path, columns=(0, 1), chunk_size=CHUNK_SIZE):
+    path = Path(path)
+    if path.suffix in BINARY:
+        reader = read_binary(path, columns, chunk_size)
+    else:
+        reader = read_csv(path, columns, chunk_size)
+    last = -np.inf
+    for chunk in reader:
+        if np.any(np.diff(chunk[:, 0]) <= 0) or chunk[0, 0] <= last:
+            raise ValueError(f"The survey {path} is not sorted by increasing KP")
+        last = chunk[-1, 0]
+        yield chunk
+
+
+def read_csv(path, columns, chunk_size):
+    with open(path, newline="") as f:
+        rows = (r for r in csv.reader(f) if r and not r[0].startswith("#"))
+        first = next(rows, None)
+        if first is None:
+            return
+        try:
+            head = [[float(first[c]) for c in columns]]
+        except ValueError:
+            # a header row
+            head = []
+        rows = itertools.chain(head, ([float(r[c]) for c in columns] for r in rows))
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            yield np.array(chunk, dtype=float)
+
+
+def read_binary(path, columns, chunk_size):
+    if path.suffix == ".npy":
+        data = np.load(path, mmap_mode="r")
+    else:
+        # raw little endian float64 records of x and z
+        data = np.memmap(path, dtype="<f8", mode="r").reshape(-1, 2)
+    for n in range(0, len(data), chunk_size):
+        yield np.array(data[n : n + chunk_size][:, list(columns)], dtype=float)
+
+
+def simplify_profile(points, tolerance):
+    x, z = points[:, 0], points[:, 1]
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    # the span shoulders are where the pipe lifts off the seabed, they are
+    # kept whatever the tolerance
+    start, end, _ = get_spans(points, tolerance)
+    keep[np.searchsorted(x, np.concatenate([start, end]))] = True
+    anchors = np.flatnonzero(keep)
+
+    stack = list(zip(anchors[:-1], anchors[1:]))
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        # the vertical deviation is the error in the seabed elevation and gaps
+        chord = z[a] + (z[b] - z[a]) * (x[a + 1 : b] - x[a]) / (x[b] - x[a])
+        deviation = np.abs(z[a + 1 : b] - chord)
+        k = int(np.argmax(deviation))
+        if deviation[k] > tolerance:
+            keep[a + 1 + k] = True
+            stack += [(a, a + 1 + k), (a + 1 + k, b)]
+    return np.flatnonzero(keep)
+
+
+def get_profile_error(points, simplified):
+    z = np.interp(points[:, 0], simplified[:, 0], simplified[:, 1])
+    return float(np.max(np.abs(points[:, 1] - z)))
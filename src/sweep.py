@@ -0,0 +1,295 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import dataclasses
+from dataclasses import dataclass
+import itertools
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .utils import Pipe, Model, Seabed, System
+from .modes import (
+    get_mode_shapes,
+    get_restart_conflicts,
+    FREQUENCY_STEP_INPUTS,
+    RESTART_FILES,
+)
+from .metrics import Metrics, read_metrics, aggregate_metrics, write_metrics_summary
+
+SweepCase = namedtuple("SweepCase", "name parameters model pipe seabed system")
+
+RESTART_KEEP = ["modal.inp", *(f"modal{suffix}" for suffix in RESTART_FILES)]
+
+SECTIONS = {"Pipe": Pipe, "Model": Model, "Seabed": Seabed, "System": System}
+
+
+@dataclass
+class SweepResult:
+    cases: list
+    frequencies: np.ndarray
+    directions: list
+    metrics: dict = None
+
+    def get_case(self, name):
+        return [c.name for c in self.cases].index(name)
+
+    def to_csv(self, path):
+        parameters = sorted({p for c in self.cases for p in c.parameters})
+        modes = self.frequencies.shape[1]
+        with open(path, "w") as f:
+            f.write(
+                ",".join(["case"] + parameters + [f"f{m+1}" for m in range(modes)])
+                + "\n"
+            )
+            for case, freqs in zip(self.cases, self.frequencies):
+                values = [str(case.parameters.get(p, "")) for p in parameters]
+                values += [f"{v:.6e}" for v in freqs]
+                f.write(",".join([case.name] + values) + "\n")
+
+
+def cli(input_file_path, model_path=None):
+    import tomllib
+
+    from .survey import apply_survey
+
+    if model_path is None:
+        model_path = os.getcwd()
+
+    with open(Path(input_file_path), "rb") as i:
+        inputs = tomllib.load(i)
+    inputs = apply_survey(inputs, model_path)
+
+    sweep = inputs.get("Sweep", {})
+    cache = None
+    if "cache" in sweep:
+        from .cache import ResultCache
+
+        cache = ResultCache(sweep["cache"], sweep.get("cache_size", 2**30))
+    store = None
+    if "store" in sweep:
+        from .store import ResultStore
+
+        store = ResultStore(sweep["store"], sweep.get("run"))
+    scratch = None
+    if "Scratch" in inputs:
+        from .scratch import ScratchSpace
+
+        scratch = ScratchSpace(**inputs["Scratch"])
+
+    result = run_sweep(
+        model_path,
+        expand_cases(inputs),
+        max_cpus=sweep.get("max_cpus"),
+        max_tokens=sweep.get("max_tokens"),
+        in_place_solver=sweep.get("in_place_solver", "abaqus"),
+        modal_solver=sweep.get("modal_solver", "abaqus"),
+        cache=cache,
+        metrics=sweep.get("metrics", False),
+        restart=sweep.get("restart", False),
+        scratch=scratch,
+        store=store,
+    )
+    result.to_csv(Path(model_path, "sweep_freqs.csv"))
+    if result.metrics is not None:
+        write_metrics_summary(Path(model_path, "metrics_summary.csv"), result.metrics)
+    return result
+
+
+def expand_cases(inputs):
+    sweep = inputs.get("Sweep", {})
+    grid = sweep.get("grid", {})
+    listed = sweep.get("cases", [{}])
+
+    keys = list(grid.keys())
+    combinations = [dict(zip(keys, v)) for v in itertools.product(*grid.values())]
+
+    cases = []
+    for n, parameters in enumerate({**l, **g} for l in listed for g in combinations):
+        sections = {s: dict(inputs[s]) for s in SECTIONS}
+        for key, value in parameters.items():
+            section, field = key.split(".")
+            if section not in SECTIONS or field not in get_fields(SECTIONS[section]):
+                raise ValueError(f"Unknown sweep parameter: {key}")
+            sections[section][field] = value
+        cases.append(
+            SweepCase(
+                f"case_{n+1:03d}",
+                parameters,
+                Model(**sections["Model"]),
+                Pipe(**sections["Pipe"]),
+                Seabed(**sections["Seabed"]),
+                System(**sections["System"]),
+            )
+        )
+    return cases
+
+
+def get_inputs(case: SweepCase):
+    # every resolved input that reaches the solvers, not only the swept ones
+    return {
+        f"{section}.{field}": getattr(value, field)
+        for section, value in [
+            ("Model", case.model),
+            ("Pipe", case.pipe),
+            ("Seabed", case.seabed),
+        ]
+        for field in get_fields(SECTIONS[section])
+    }
+
+
+def get_fields(section):
+    if dataclasses.is_dataclass(section):
+        return [f.name for f in dataclasses.fields(section)]
+    return section._fields
+
+
+def run_sweep(
+    model_path,
+    cases,
+    max_cpus=None,
+    max_tokens=None,
+    in_place_solver="abaqus",
+    modal_solver="abaqus",
+    cache=None,
+    metrics=False,
+    restart=False,
+    scratch=None,
+    store=None,
+):
+    workers = get_workers(
+        cases, max_cpus, max_tokens, "abaqus" in (in_place_solver, modal_solver)
+    )
+
+    if restart:
+        check_restart(cases)
+        restart = len(cases) > 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+
+        def submit(n, restart_from=None):
+            case_path = Path(model_path, cases[n].name)
+            case_path.mkdir(parents=True, exist_ok=True)
+            futures[n] = pool.submit(
+                run_case,
+                case_path,
+                cases[n],
+                in_place_solver,
+                modal_solver,
+                cache,
+                metrics,
+                restart and n == 0,
+                restart_from,
+                scratch,
+                store,
+            )
+
+        submit(0)
+        if restart:
+            # the other cases restart from the pre-stressed first case
+            futures[0].result()
+        for n in range(1, len(cases)):
+            submit(n, Path(model_path, cases[0].name) if restart else None)
+        results = [futures[n].result() for n in range(len(cases))]
+
+    modes = max(len(r[0]) for r in results)
+    frequencies = np.full((len(cases), modes), np.nan)
+    for i, (freqs, _) in enumerate(results):
+        frequencies[i, : len(freqs)] = freqs
+
+    stages = aggregate_metrics(read_metrics(model_path)) if metrics else None
+    return SweepResult(cases, frequencies, [r[1] for r in results], stages)
+
+
+def run_case(
+    case_path,
+    case: SweepCase,
+    in_place_solver,
+    modal_solver,
+    cache=None,
+    metrics=False,
+    restart=False,
+    restart_from=None,
+    scratch=None,
+    store=None,
+):
+    args = (
+        case,
+        in_place_solver,
+        modal_solver,
+        cache,
+        metrics,
+        restart,
+        restart_from,
+        store,
+    )
+    if scratch is None:
+        return solve_case(case_path, *args)
+
+    # the other cases of a restarted sweep read the base case's restart files
+    keep = RESTART_KEEP if restart else ()
+    with scratch.run(case_path, keep) as path:
+        result = solve_case(path, *args)
+    if restart:
+        scratch.wait()
+    return result
+
+
+def solve_case(
+    case_path,
+    case: SweepCase,
+    in_place_solver,
+    modal_solver,
+    cache,
+    metrics,
+    restart,
+    restart_from,
+    store,
+):
+    modes = get_mode_shapes(
+        case_path,
+        case.model,
+        case.pipe,
+        case.seabed,
+        case.system,
+        in_place_solver=in_place_solver,
+        modal_solver=modal_solver,
+        cache=cache,
+        metrics=Metrics(case_path, case.name) if metrics else None,
+        restart=restart,
+        restart_from=restart_from,
+    )
+    if store is not None:
+        store.add(case.name, get_inputs(case), modes)
+    return list(modes.frequencies), modes.directions
+
+
+def check_restart(cases):
+    # a restart shares the model data and pre-stressing step of the first
+    # case, so only inputs confined to the frequency step may be swept
+    base = cases[0]
+    for case in cases[1:]:
+        conflicts = get_restart_conflicts(
+            case.model, case.pipe, case.seabed, (base.model, base.pipe, base.seabed)
+        )
+        if conflicts:
+            raise ValueError(
+                f"{case.name} cannot restart from {base.name}, it changes "
+                f"{', '.join(conflicts)}; a restarted sweep can only vary "
+                f"{', '.join(f'Model.{f}' for f in FREQUENCY_STEP_INPUTS)}"
+            )
+
+
+def get_workers(cases, max_cpus=None, max_tokens=None, abaqus=True):
+    if max_cpus is None:
+        max_cpus = os.cpu_count()
+    cpus = max(c.system.cpus for c in cases) if abaqus else 1
+    workers = max_cpus // cpus
+    if abaqus and max_tokens is not None:
+        workers = min(workers, max_tokens // get_abaqus_tokens(cpus))
+    return max(1, min(workers, len(cases)))
+
+
+def get_abaqus_tokens(cpus):
+    return int(5 * cpus**0.422)
@@ -1,12 +1,24 @@
 from collections import namedtuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import math
 
 Seabed = namedtuple("Seabed", "K_vert_sta K_ax_dyn mu_ax C_V C_L nu")
 
-Model = namedtuple("Model", "element_length g water_depth rho_sw bathymetry")
+Model = namedtuple(
+    "Model",
+    "element_length g water_depth rho_sw bathymetry "
+    "number_of_modes max_frequency shift eigensolver min_element_length mesh_growth "
+    "output_profile",
+    defaults=(20, None, None, "lanczos", None, 1.2, "full"),
+)
 
-System = namedtuple("System", "abaqus_bat_path cpus")
+System = namedtuple(
+    "System",
+    "abaqus_bat_path cpus max_wall_time max_increments max_cutbacks pp_worker",
+    defaults=(None, None, None, True),
+)
+
+LoadCase = namedtuple("LoadCase", "name rho_contents Pi T")
 
 
 @dataclass
@@ -40,6 +52,11 @@ class Pipe:
         )
         return eaf / A_steel
 
+    def for_load_case(self, load_case: LoadCase):
+        return replace(
+            self, rho_contents=load_case.rho_contents, Pi=load_case.Pi, T=load_case.T
+        )
+
     def get_rho_s_rho(self, rho_seawater):
         A_OA = get_A(self.od)
         m_total = self._get_total_mass()
@@ -2,41 +2,95 @@ from pathlib import Path
 from collections import namedtuple
 from dataclasses import dataclass
 
-import numpy as np
 import matplotlib.pyplot as plt
 
-from .utils import Pipe, Model, Seabed, System
-from .modes import get_mode_shapes
+from .utils import Pipe, Model, Seabed, System, LoadCase
+from .modes import get_mode_shapes, get_mesh
+from .metrics import Metrics, get_stage
 
 
 def cli(input_file_path, model_path=None):
     import tomllib
     import os
 
+    from .survey import apply_survey
+
     if model_path is None:
         model_path = os.getcwd()
 
     f = Path(input_file_path)
     with open(f, "rb") as i:
         inputs = tomllib.load(i)
+    inputs = apply_survey(inputs, model_path)
 
     pipe = Pipe(**inputs["Pipe"])
     model = Model(**inputs["Model"])
     seabed = Seabed(**inputs["Seabed"])
     system = System(**inputs["System"])
+    metrics = None
+    if inputs.get("Metrics", {}).get("enabled", False):
+        metrics = Metrics(model_path)
+
+    pipeline = inputs.get("Pipeline", {})
+    if pipeline.get("dry_run", False):
+        from .pipeline import run_pipeline, format_plan
+
+        items = run_pipeline(model_path, model, pipe, seabed, system, dry_run=True)
+        print(format_plan(items))
+        return items
 
-    plot_modes(model_path, pipe, model, seabed, system)
+    if "LoadCase" in inputs:
+        load_cases = [LoadCase(**lc) for lc in inputs["LoadCase"]]
+        plot_load_cases(model_path, pipe, model, seabed, system, load_cases, metrics)
+    else:
+        incremental = pipeline.get("incremental", False)
+        plot_modes(model_path, pipe, model, seabed, system, metrics, incremental)
 
 
 def plot_modes(
-    model_path: str, pipe: Pipe, model: Model, seabed: Seabed, system: System
+    model_path: str,
+    pipe: Pipe,
+    model: Model,
+    seabed: Seabed,
+    system: System,
+    metrics=None,
+    incremental=False,
+):
+    modes = get_mode_shapes(
+        model_path,
+        model,
+        pipe,
+        seabed,
+        system,
+        metrics=metrics,
+        incremental=incremental,
+    )
+    x = get_mesh(model, pipe, seabed)
+    with get_stage(metrics)("plot", files=["mode_shapes.png"]):
+        plot_mode_shapes(modes, x - x[0], Path(model_path, "mode_shapes.png"))
+
+
+def plot_load_cases(
+    model_path: str,
+    pipe: Pipe,
+    model: Model,
+    seabed: Seabed,
+    system: System,
+    load_cases,
+    metrics=None,
 ):
-    modes = get_mode_shapes(model_path, model, pipe, seabed, system)
-    pts = modes[1]["mode_shape"].shape[0]
-    x = np.linspace(0, (pts - 1) * model.element_length, pts)
+    results = get_mode_shapes(
+        model_path, model, pipe, seabed, system, load_cases=load_cases, metrics=metrics
+    )
+    x = get_mesh(model, pipe, seabed)
+    files = [f"mode_shapes_{name}.png" for name in results]
+    with get_stage(metrics)("plot", files=files):
+        for name, modes in results.items():
+            path = Path(model_path, f"mode_shapes_{name}.png")
+            plot_mode_shapes(modes, x - x[0], path)
 
-    fig_path = Path(model_path, "mode_shapes.png")
 
+def plot_mode_shapes(modes, x, fig_path):
     fig, ax = plt.subplots(figsize=(8, 5), layout="constrained")
 
     labels = []
@@ -65,11 +119,27 @@ def plot_modes(
     )
     plt.title("Mode Shapes")
     plt.savefig(fig_path)
+    plt.close(fig)
 
 
 if __name__ == "__main__":
     import sys
 
-    input_file = sys.argv[1]
+    if sys.argv[1] == "sweep":
+        from .sweep import cli as sweep_cli
+
+        sweep_cli(sys.argv[2])
+    elif sys.argv[1] == "convergence":
+        from .convergence import cli as convergence_cli
+
+        convergence_cli(sys.argv[2])
+    elif sys.argv[1] == "screen":
+        from .screening import cli as screening_cli
+
+        screening_cli(sys.argv[2])
+    elif sys.argv[1] == "segment":
+        from .segmentation import cli as segmentation_cli
 
-    cli(input_file)
+        segmentation_cli(sys.argv[2])
+    else:
+        cli(sys.argv[1])
@@ -0,0 +1,5 @@
+@echo off
+rem Windows cannot run the stand-in from its shebang, so it is run with the
+rem interpreter running the tests, or the python on the PATH
+if not defined VIV_STAND_IN_PYTHON set VIV_STAND_IN_PYTHON=python
+"%VIV_STAND_IN_PYTHON%" "%~dp0abaqus" %*
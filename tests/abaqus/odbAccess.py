@@ -0,0 +1,57 @@
+# Reads the synthetic .odb written by the abaqus stand-in.
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def openOdb(path):
+    data = np.load(path)
+    if "U" in data:
+        return get_modal_odb(data)
+    return get_in_place_odb(data)
+
+
+def get_in_place_odb(data):
+    nodes = len(data["Step-1"])
+    steps = {
+        step: SimpleNamespace(
+            frames=[get_frame(COORD=data[step])],
+        )
+        for step in data.files
+    }
+    return get_odb(steps, "PIPELINE", nodes)
+
+
+def get_modal_odb(data):
+    nodes = data["U"].shape[1]
+    frames = [get_frame(frequency=f, U=u) for f, u in zip(data["freqs"], data["U"])]
+    steps = {"Step-2": SimpleNamespace(frames=frames)}
+    return get_odb(steps, "PIPE", nodes)
+
+
+def get_odb(steps, node_set, nodes):
+    instance = SimpleNamespace(
+        nodeSets={node_set: SimpleNamespace(nodes=list(range(nodes)))}
+    )
+    return SimpleNamespace(
+        steps=steps,
+        rootAssembly=SimpleNamespace(instances={"PART-1-1": instance}),
+    )
+
+
+def get_frame(frequency=0.0, **outputs):
+    return SimpleNamespace(
+        frequency=frequency,
+        fieldOutputs={k: FieldOutput(v) for k, v in outputs.items()},
+    )
+
+
+class FieldOutput:
+    def __init__(self, values):
+        self.values = values
+
+    def getSubset(self, region=None):
+        block = SimpleNamespace(
+            nodeLabels=np.arange(1, len(self.values) + 1), data=self.values
+        )
+        return SimpleNamespace(bulkDataBlocks=[block])
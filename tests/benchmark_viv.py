@@ -0,0 +1,77 @@
+import pytest
+
+import src.modes as m
+import src.jobs as jobs
+import src.viv as viv
+import src.utils as utils
+import tests.conftest as ct
+
+pytest.importorskip("pytest_benchmark")
+
+NODES = [10**2, 10**3, 10**4, 10**5]
+
+# one 20 m span every 100 m of route
+SPAN = [[0, 0], [40, 0], [40, -1], [60, -1], [60, 0]]
+
+
+@pytest.fixture(scope="module", params=NODES, ids=lambda n: f"{n}_nodes")
+def route(request, tmp_path_factory):
+    n = request.param
+    bathymetry = [[x + k, z] for k in range(0, n - 1, 100) for x, z in SPAN]
+    bathymetry.append([n - 1, 0])
+    model = utils.Model(**{**ct.inputs["Model"], "bathymetry": bathymetry})
+    pipe = utils.Pipe(**ct.inputs["Pipe"])
+    seabed = utils.Seabed(**ct.inputs["Seabed"])
+    system = utils.System(**ct.inputs["System"])._replace(
+        abaqus_bat_path=str(ct.STAND_IN), cpus=1
+    )
+
+    model_path = tmp_path_factory.mktemp(f"route_{n}")
+    m.get_mode_shapes(model_path, model, pipe, seabed, system)
+    yield model_path, model, pipe, seabed, system
+    jobs.close_workers()
+
+
+def test_write_in_place_input_file(benchmark, route):
+    model_path, model, pipe, seabed, _ = route
+
+    benchmark(m.write_in_place_input_file, model_path, model, pipe, seabed)
+
+
+def test_write_modal_inp(benchmark, route):
+    model_path, model, pipe, seabed, _ = route
+
+    benchmark(m.write_modal_inp, model_path, pipe, seabed, model)
+
+
+def test_pp_in_place(benchmark, route):
+    model_path, model, _, _, system = route
+
+    benchmark.pedantic(m.pp_in_place, (model_path, model, system), rounds=3)
+
+
+def test_pp_modal(benchmark, route):
+    model_path, _, _, _, system = route
+
+    benchmark.pedantic(m.pp_modal, (model_path, system), rounds=3)
+
+
+def test_get_gaps(benchmark, route):
+    model_path = route[0]
+
+    benchmark(m.get_gaps, model_path)
+
+
+def test_read_mode_shapes(benchmark, route):
+    model_path = route[0]
+
+    benchmark(lambda: m.get_modes(model_path).mode_shapes)
+
+
+def test_plot_modes(benchmark, route, mocker):
+    model_path, model, pipe, seabed, system = route
+    mocker.patch("src.viv.get_mode_shapes", return_value=m.get_modes(model_path))
+
+    benchmark.pedantic(
+        viv.plot_modes, (model_path, pipe, model, seabed, system), rounds=3
+    )
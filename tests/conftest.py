@@ -1,4 +1,6 @@
+import os
 from pathlib import Path
+import sys
 import tomllib
 import pytest
 
@@ -7,6 +9,12 @@ import numpy as np
 import src.utils as utils
 
 
+# the abaqus stand-in, Windows runs it through the batch file shim
+STAND_IN = Path(
+    "tests/abaqus/abaqus.bat" if sys.platform == "win32" else "tests/abaqus/abaqus"
+).resolve()
+os.environ.setdefault("VIV_STAND_IN_PYTHON", sys.executable)
+
 f = Path("tests/refs/viv.toml")
 with open(f, "rb") as i:
     inputs = tomllib.load(i)
@@ -43,3 +51,34 @@ def mode_shape():
             [0, 0, 0],
         ]
     )
+
+
+class FakeProcess:
+    def __init__(self, returncode=0):
+        self.returncode = returncode
+
+    async def wait(self):
+        return self.returncode
+
+    def kill(self):
+        pass
+
+
+@pytest.fixture
+def abaqus(mocker, system):
+    def patch(side_effect=None):
+        def run(*args, cwd=None):
+            if side_effect is not None:
+                side_effect(list(args), cwd)
+            sta = Path(cwd, args[1][2:] + ".sta")
+            if args[1].startswith("j=") and not sta.exists():
+                sta.write_text(" THE ANALYSIS HAS COMPLETED SUCCESSFULLY\n")
+            return FakeProcess()
+
+        # no persistent worker, so scripts run through the per-script launch
+        mocker.patch.dict(
+            "src.jobs._workers", {(os.getpid(), system.abaqus_bat_path): None}
+        )
+        return mocker.patch("src.jobs.asyncio.create_subprocess_exec", side_effect=run)
+
+    return patch
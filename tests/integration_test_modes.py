@@ -18,8 +18,7 @@ def test_get_mode_shapes(tmp_path, seabed, model, pipe, system):
     assert filecmp.cmp(Path(tmp_path, "in_place.inp"), Path("tests/refs/in_place.inp"))
     assert filecmp.cmp(Path(tmp_path, "modal.inp"), Path("tests/refs/modal.inp"))
     assert filecmp.cmp(Path(tmp_path, "modal_pp.py"), Path("tests/refs/modal_pp.py"))
-    for n in range(20):
-        assert Path(tmp_path, f"mode_{n+1}.dat").is_file()
+    assert Path(tmp_path, "modes.npy").is_file()
     assert filecmp.cmp(Path(tmp_path, "freqs.dat"), Path("tests/refs/freqs.dat"))
     assert filecmp.cmp(
         Path(tmp_path, "in_place_nodes.dat"), Path("tests/refs/in_place_nodes.dat")
@@ -35,8 +34,7 @@ def test_cli(tmp_path):
     assert filecmp.cmp(Path(tmp_path, "in_place.inp"), Path("tests/refs/in_place.inp"))
     assert filecmp.cmp(Path(tmp_path, "modal.inp"), Path("tests/refs/modal.inp"))
     assert filecmp.cmp(Path(tmp_path, "modal_pp.py"), Path("tests/refs/modal_pp.py"))
-    for n in range(20):
-        assert Path(tmp_path, f"mode_{n+1}.dat").is_file()
+    assert Path(tmp_path, "modes.npy").is_file()
     assert filecmp.cmp(Path(tmp_path, "freqs.dat"), Path("tests/refs/freqs.dat"))
     assert filecmp.cmp(
         Path(tmp_path, "in_place_nodes.dat"), Path("tests/refs/in_place_nodes.dat")
@@ -5,19 +5,15 @@ import odbAccess
 odb = odbAccess.openOdb("modal.odb")
 
 s = odb.steps["Step-2"]
-nodes = odb.rootAssembly.instances["PART-1-1"].nodes
+pipe = odb.rootAssembly.instances["PART-1-1"].nodeSets["PIPE"]
 
-modes = len(s.frames)
+frames = [s.frames[m] for m in range(1, len(s.frames))]
+freqs = [f.frequency for f in frames]
+ms = np.zeros((len(frames), len(pipe.nodes), 3))
 
-freqs = []
-
-for m in range(1, modes):
-    f = s.frames[m]
-    freqs.append(f.frequency)
-    ms = np.zeros((len(nodes), 3))
-    for n in range(len(nodes)):
-        ms[n, :] = f.fieldOutputs["U"].values[n].data
-    fname = "mode_{0}.dat".format(m)
-    np.savetxt(fname, ms, delimiter=",")
+for m, f in enumerate(frames):
+    for b in f.fieldOutputs["U"].getSubset(region=pipe).bulkDataBlocks:
+        ms[m, np.asarray(b.nodeLabels) - 1, :] = b.data[:, :3]
 
+np.save("modes.npy", ms)
 np.savetxt("freqs.dat", freqs, delimiter=",")
@@ -0,0 +1,103 @@
+import os
+from pathlib import Path
+import shutil
+
+import pytest
+
+import src.cache as c
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return c.ResultCache(Path(tmp_path, "cache"), max_size=1000)
+
+
+@pytest.fixture(autouse=True)
+def abaqus_version(mocker):
+    return mocker.patch("src.cache.get_abaqus_version", return_value="2023")
+
+
+def test_get_key():
+    assert c.ResultCache.get_key("a", "b") == c.ResultCache.get_key("a", b"b")
+    assert c.ResultCache.get_key("ab", "") != c.ResultCache.get_key("a", "b")
+
+
+def test_store_restore(tmp_path, cache):
+    source = Path(tmp_path, "source")
+    source.mkdir()
+    Path(source, "gaps.dat").write_text("1, 0\n")
+    Path(source, "mode_1.dat").write_text("0,0,1\n")
+    Path(source, "modal.odb").write_text("odb")
+
+    assert not cache.restore("k", source, ["gaps.dat", "mode_*.dat"])
+    cache.store("k", source, ["gaps.dat", "mode_*.dat"])
+
+    target = Path(tmp_path, "target")
+    target.mkdir()
+    assert cache.restore("k", target, ["gaps.dat", "mode_*.dat"])
+    assert sorted(os.listdir(target)) == ["gaps.dat", "mode_1.dat"]
+    assert cache.get_stats() == {
+        "hits": 1,
+        "misses": 1,
+        "total_hits": 1,
+        "total_misses": 1,
+        "entries": 1,
+        "size": 11,
+    }
+
+
+def test_evict_least_recently_used(tmp_path, cache):
+    cache.max_size = 2000
+    for key in ["a", "b", "c"]:
+        Path(tmp_path, "r.dat").write_text(key * 400)
+        cache.store(key, tmp_path, ["r.dat"])
+        os.utime(Path(cache.path, key), (0, {"a": 1, "b": 2, "c": 3}[key]))
+    cache.restore("a", tmp_path, ["r.dat"])
+    cache.max_size = 1000
+    Path(tmp_path, "r.dat").write_text("d" * 400)
+    cache.store("d", tmp_path, ["r.dat"])
+
+    assert sorted(e.name for e in cache.path.iterdir() if e.is_dir()) == ["a", "d"]
+
+
+def test_run_in_place(tmp_path, abaqus, cache, model, pipe, seabed, system):
+    def fake_pp(args, cwd):
+        if args[1] == "python":
+            f = "in_place_coords.npy"
+            shutil.copyfile(Path("tests/refs", f), Path(cwd, f))
+
+    mocked_abaqus = abaqus(fake_pp)
+
+    first = Path(tmp_path, "first")
+    second = Path(tmp_path, "second")
+    for p in [first, second]:
+        p.mkdir()
+    cache.max_size = 2**20
+
+    c.run_in_place(cache, first, model, pipe, seabed, system)
+    c.run_in_place(cache, second, model, pipe, seabed, system)
+
+    assert mocked_abaqus.call_count == 2
+    assert cache.hits == 1
+    assert Path(second, "gaps.dat").read_text() == Path(first, "gaps.dat").read_text()
+
+
+def test_run_modal(tmp_path, abaqus, cache, model, pipe, seabed, system):
+    for f in ["gaps.dat", "in_place_nodes.dat", "freqs.dat", "mode_1.dat"]:
+        shutil.copyfile(Path("tests/refs", f), Path(tmp_path, f))
+
+    def fake_pp(args, cwd):
+        if args[1] == "python":
+            shutil.copyfile(Path("tests/refs/modes.npy"), Path(cwd, "modes.npy"))
+
+    cache.max_size = 2**20
+    mocked_abaqus = abaqus(fake_pp)
+
+    modes = c.run_modal(cache, tmp_path, pipe, seabed, model, system)
+    Path(tmp_path, "mode_1.dat").unlink()
+    cached = c.run_modal(cache, tmp_path, pipe, seabed, model, system)
+
+    assert mocked_abaqus.call_count == 2
+    assert cache.hits == 1
+    assert cached[1]["frequency"] == modes[1]["frequency"]
+    assert Path(tmp_path, "mode_1.dat").is_file()
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.convergence as c
+
+
+def test_get_changes():
+    frequencies = [np.array([1.0, 2.2]), np.array([1.1, 2.0]), None]
+    directions = [["cross-flow", "inline"], ["cross-flow", "inline"], None]
+
+    changes = c.get_changes(frequencies, directions)
+
+    assert changes[0] == pytest.approx(0.1)
+    assert np.isnan(changes[1])
+    changes = c.get_changes(frequencies[:2], directions[:2], modes_per_direction=1)
+    assert changes[0] == pytest.approx(0.1)
+
+
+def test_get_changes_matches_directions():
+    # the inline mode drops below the cross-flow mode on the finer mesh
+    frequencies = [np.array([1.0, 1.05, 2.0]), np.array([1.02, 1.0, 2.0])]
+    directions = [
+        ["cross-flow", "inline", "axial"],
+        ["inline", "cross-flow", "axial"],
+    ]
+
+    assert c.get_changes(frequencies, directions)[0] == pytest.approx(0.03 / 1.02)
+    assert c.get_mode_pairs(*directions) == [(0, 1), (1, 0), (2, 2)]
+    directions[1][2] = directions[0][2] = "cross-flow"
+    assert c.get_mode_pairs(*directions, modes_per_direction=1) == [(0, 1), (1, 0)]
+
+
+def test_get_converged():
+    assert c.get_converged(np.array([0.2, 0.005, 0.001]), 0.01) == 1
+    assert c.get_converged(np.array([np.nan, 0.005]), 0.01) is None
+    assert c.get_converged(np.array([0.2, 0.1]), 0.01) is None
+
+
+def test_run_convergence(tmp_path, model, pipe, seabed, system):
+    result = c.run_convergence(
+        tmp_path,
+        model,
+        pipe,
+        seabed,
+        system,
+        [1, 4, 0.5, 2],
+        tolerance=0.07,
+        modes_per_direction=2,
+        max_cpus=1,
+        in_place_solver="native",
+        modal_solver="native",
+    )
+
+    # 2 m is within tolerance of 1 m, so 0.5 m is never needed
+    assert result.element_lengths == [4, 2, 1]
+    assert result.element_length == 2
+    assert result.changes[0] > 0.07 >= result.changes[1]
+    assert np.isnan(result.changes[2])
+    assert Path(tmp_path, "element_length_4", "gaps.dat").is_file()
+    assert not Path(tmp_path, "element_length_0.5").exists()
+
+    result.to_csv(Path(tmp_path, "convergence.csv"))
+    lines = Path(tmp_path, "convergence.csv").read_text().splitlines()
+    assert lines[0].startswith("element_length,change,f1,")
+    assert len(lines) == len(result.element_lengths) + 1
+
+
+def test_run_convergence_needs_two_lengths(tmp_path, model, pipe, seabed, system):
+    with pytest.raises(ValueError):
+        c.run_convergence(tmp_path, model, pipe, seabed, system, [1])
+
+
+def test_stop_terminates_running_jobs(tmp_path, mocker, model, pipe, seabed, system):
+    cases = [c.SweepCase("element_length_1", {}, model, pipe, seabed, system)]
+    running = mocker.Mock(**{"running.return_value": True})
+    futures = {running: 0}
+    mocker.patch("src.convergence.wait", return_value=({running}, set()))
+    terminate = mocker.patch("src.convergence.terminate_jobs")
+
+    c.stop(futures, cases, tmp_path)
+
+    terminate.assert_called_once_with(Path(tmp_path, "element_length_1"), system)
+    assert futures == {}
@@ -0,0 +1,262 @@
+import asyncio
+from pathlib import Path
+import sys
+
+import pytest
+
+import src.jobs as j
+
+STA = """\
+ SUMMARY OF JOB INFORMATION:
+ STEP  INC ATT SEVERE EQUIL TOTAL  TOTAL      STEP       INC OF       DOF    IF
+               DISCON ITERS ITERS  TIME/      TIME/LPF   TIME/LPF     MONITOR RIKS
+               ITERS               FREQ
+   1     1   1     0     3     3  0.100      0.100      0.1000
+   1     2   1U    0     5     5  0.100      0.100      0.1000
+   1     2   2     0     4     4  0.125      0.125      0.02500
+"""
+
+
+class HangingProcess:
+    def __init__(self):
+        self.stopped = asyncio.Event()
+        self.returncode = None
+
+    async def wait(self):
+        await self.stopped.wait()
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+        self.stopped.set()
+
+
+class Finished:
+    returncode = 0
+
+    async def wait(self):
+        return 0
+
+
+def test_parse_sta():
+    increments, completed = j.parse_sta(
+        STA + " THE ANALYSIS HAS COMPLETED SUCCESSFULLY\n"
+    )
+
+    assert [i.cutback for i in increments] == [False, True, False]
+    assert increments[2] == j.StaIncrement(1, 2, 2, False, 0, 4, 4, 0.125, 0.125, 0.025)
+    assert completed is True
+    assert j.parse_sta(" THE ANALYSIS HAS NOT BEEN COMPLETED\n") == ([], False)
+
+
+def test_run_job_diverged(tmp_path, abaqus, system):
+    def fail(args, cwd):
+        Path(cwd, "in_place.sta").write_text(
+            STA + " THE ANALYSIS HAS NOT BEEN COMPLETED\n"
+        )
+        Path(cwd, "in_place.msg").write_text(
+            " ***NOTE: THE SOLUTION APPEARS TO BE DIVERGING.\n"
+            " ***ERROR: TOO MANY ATTEMPTS MADE FOR THIS INCREMENT\n"
+        )
+
+    abaqus(fail)
+
+    with pytest.raises(j.JobDiverged, match="TOO MANY ATTEMPTS") as e:
+        asyncio.run(j.run_job(tmp_path, "in_place", system))
+    assert len(e.value.status.increments) == 3
+
+
+def test_run_job_aborts_on_cutbacks(tmp_path, mocker, system):
+    job = HangingProcess()
+    Path(tmp_path, "modal.sta").write_text(STA + STA.splitlines()[-2] + "\n")
+
+    def run(*args, cwd=None):
+        if args[1] == "terminate":
+            job.returncode = 1
+            job.stopped.set()
+            return Finished()
+        return job
+
+    mocked = mocker.patch("src.jobs.asyncio.create_subprocess_exec", side_effect=run)
+    system = system._replace(max_cutbacks=1)
+
+    with pytest.raises(j.JobDiverged, match="1 consecutive cutbacks"):
+        asyncio.run(j.run_job(tmp_path, "modal", system, poll_interval=0.01))
+
+    assert mocked.call_args.args == (system.abaqus_bat_path, "terminate", "job=modal")
+
+
+def test_run_job_kills_after_wall_time(tmp_path, mocker, system):
+    job = HangingProcess()
+    mocker.patch(
+        "src.jobs.asyncio.create_subprocess_exec",
+        side_effect=lambda *args, cwd=None: (
+            Finished() if args[1] == "terminate" else job
+        ),
+    )
+    mocker.patch("src.jobs.TERMINATE_GRACE", 0.01)
+    system = system._replace(max_wall_time=0.02)
+
+    with pytest.raises(j.JobTimeout, match="wall-clock"):
+        asyncio.run(j.run_job(tmp_path, "modal", system, poll_interval=0.01))
+
+    assert job.returncode == -9
+
+
+def test_run_job_terminates_when_cancelled(tmp_path, mocker, system):
+    job = HangingProcess()
+
+    def run(*args, cwd=None):
+        if args[1] == "terminate":
+            job.kill()
+            return Finished()
+        return job
+
+    mocked = mocker.patch("src.jobs.asyncio.create_subprocess_exec", side_effect=run)
+
+    async def cancel():
+        task = asyncio.ensure_future(
+            j.run_job(tmp_path, "modal", system, poll_interval=0.01)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel())
+
+    assert mocked.call_args.args == (system.abaqus_bat_path, "terminate", "job=modal")
+    assert job.returncode == -9
+
+
+def test_run_job_oldjob(tmp_path, abaqus, system):
+    mocked_abaqus = abaqus()
+
+    asyncio.run(j.run_job(tmp_path, "modal", system, oldjob="modal_base"))
+
+    mocked_abaqus.assert_called_once_with(
+        system.abaqus_bat_path,
+        "j=modal",
+        "ask_delete=no",
+        "cpus=2",
+        "oldjob=modal_base",
+        "-int",
+        cwd=tmp_path,
+    )
+
+
+def test_run_jobs(tmp_path, abaqus, system):
+    mocked_abaqus = abaqus()
+
+    statuses = asyncio.run(
+        j.run_jobs([(tmp_path, "in_place"), (tmp_path, "modal")], system)
+    )
+
+    assert [s.completed for s in statuses] == [True, True]
+    assert mocked_abaqus.call_count == 2
+
+
+def test_terminate_jobs(tmp_path, mocker, system):
+    Path(tmp_path, "modal.lck").touch()
+    mocked = mocker.patch("src.jobs.subprocess.run")
+
+    j.terminate_jobs(tmp_path, system)
+
+    mocked.assert_called_once_with(
+        [system.abaqus_bat_path, "terminate", "job=modal"], cwd=tmp_path
+    )
+
+
+def test_run_script_missing_results(tmp_path, abaqus, system):
+    abaqus()
+
+    with pytest.raises(j.MissingResults, match="modes.npy"):
+        asyncio.run(j.run_script(tmp_path, "modal_pp.py", system, ["modes.npy"]))
+
+
+@pytest.fixture
+def abaqus_python(tmp_path):
+    # stands in for "abaqus python" with the local interpreter
+    if sys.platform == "win32":
+        path = Path(tmp_path, "abaqus.bat")
+        path.write_text(f'@echo off\n"{sys.executable}" %2 %3 %4 %5 %6 %7 %8 %9\n')
+        return str(path)
+    path = Path(tmp_path, "abaqus")
+    path.write_text(f'#!/bin/sh\nshift\nexec "{sys.executable}" "$@"\n')
+    path.chmod(0o755)
+    return str(path)
+
+
+def test_worker_runs_scripts_in_one_process(tmp_path, mocker, abaqus_python, system):
+    mocker.patch.dict("src.jobs._workers", clear=True)
+    system = system._replace(abaqus_bat_path=abaqus_python)
+    for case in ["a", "b"]:
+        Path(tmp_path, case).mkdir()
+        Path(tmp_path, case, "pp.py").write_text(
+            "import os\nopen('pid.txt', 'w').write(str(os.getpid()))\n"
+        )
+
+    try:
+        for case in ["a", "b"]:
+            j.run_post_processing(Path(tmp_path, case), "pp.py", system, ["pid.txt"])
+        worker = j.get_worker(abaqus_python)
+        with pytest.raises(j.ScriptFailed, match="ZeroDivisionError"):
+            Path(tmp_path, "a", "bad.py").write_text("1 / 0\n")
+            worker.run(Path(tmp_path, "a"), "bad.py")
+    finally:
+        j.close_workers()
+
+    pids = {Path(tmp_path, case, "pid.txt").read_text() for case in ["a", "b"]}
+    assert len(pids) == 1
+    if sys.platform != "win32":
+        # on Windows the worker process is the cmd.exe running the batch file
+        assert pids == {str(worker.process.pid)}
+
+
+def test_hung_worker_falls_back(tmp_path, mocker, abaqus_python, system):
+    mocker.patch.dict("src.jobs._workers", clear=True)
+    mocker.patch("src.jobs.WORKER_TIMEOUT", 2)
+    system = system._replace(abaqus_bat_path=abaqus_python)
+    # only hangs on the first run, which is the one in the worker
+    Path(tmp_path, "hang").touch()
+    Path(tmp_path, "pp.py").write_text(
+        "import os, time\n"
+        "if os.path.exists('hang'):\n"
+        "    os.remove('hang')\n"
+        "    time.sleep(60)\n"
+        "open('done.txt', 'w').write('done')\n"
+    )
+
+    try:
+        worker = j.get_worker(abaqus_python)
+        j.run_post_processing(tmp_path, "pp.py", system, ["done.txt"])
+        assert j.get_worker(abaqus_python) is None
+    finally:
+        j.close_workers()
+
+    assert worker.process.poll() is not None
+
+
+def test_get_worker_ignores_inherited_workers(mocker, system):
+    # a forked child sees the parent's worker under the parent's pid
+    inherited = object()
+    mocker.patch.dict("src.jobs._workers", {(-1, system.abaqus_bat_path): inherited})
+    mocker.patch("src.jobs.PostProcessingWorker", side_effect=j.WorkerUnavailable)
+
+    assert j.get_worker(system.abaqus_bat_path) is None
+    j.close_workers()
+
+
+def test_run_post_processing_falls_back(tmp_path, mocker, system):
+    mocker.patch.dict("src.jobs._workers", clear=True)
+    mocked = mocker.patch(
+        "src.jobs.asyncio.create_subprocess_exec", return_value=Finished()
+    )
+    system = system._replace(abaqus_bat_path=str(Path(tmp_path, "missing")))
+
+    j.run_post_processing(tmp_path, "modal_pp.py", system)
+
+    assert j.get_worker(system.abaqus_bat_path) is None
+    mocked.assert_called_once_with(
+        system.abaqus_bat_path, "python", "modal_pp.py", cwd=tmp_path
+    )
@@ -0,0 +1,117 @@
+import copy
+from pathlib import Path
+
+import pytest
+
+import src.metrics as mt
+import src.modes as m
+import src.sweep as s
+import tests.conftest as ct
+
+JOB_TIME = """\
+ THE ANALYSIS HAS BEEN COMPLETED
+
+
+           JOB TIME SUMMARY
+             USER TIME (SEC)      =   1.2000
+             SYSTEM TIME (SEC)    =  0.30000
+             TOTAL CPU TIME (SEC) =   1.5000
+             WALLCLOCK TIME (SEC) =          2
+"""
+
+
+def test_parse_job_time():
+    assert mt.parse_job_time(JOB_TIME) == {
+        "user_time": 1.2,
+        "system_time": 0.3,
+        "total_cpu_time": 1.5,
+        "wallclock_time": 2,
+    }
+    assert mt.parse_job_time("") == {}
+
+
+def test_stage(tmp_path):
+    Path(tmp_path, "job.inp").write_text("*HEADING\n")
+    Path(tmp_path, "job.dat").write_text(JOB_TIME)
+    metrics = mt.Metrics(tmp_path, "case_001")
+
+    with metrics.stage("solve", files=["job.inp", "job.odb"], jobname="job"):
+        pass
+    with mt.get_stage(None)("solve"):
+        pass
+
+    [record] = mt.read_metrics(tmp_path)
+    assert record["case"] == "case_001"
+    assert record["stage"] == "solve"
+    assert record["wall_time"] >= 0
+    assert record["files"] == {"job.inp": 9}
+    assert record["solver"]["total_cpu_time"] == 1.5
+    assert "error" not in record
+
+
+def test_stage_failed(tmp_path):
+    metrics = mt.Metrics(tmp_path, "case_001")
+
+    with pytest.raises(ValueError):
+        with metrics.stage("solve"):
+            raise ValueError("no gaps.dat")
+
+    [record] = mt.read_metrics(tmp_path)
+    assert record["stage"] == "solve"
+    assert record["error"] == "ValueError: no gaps.dat"
+    assert mt.aggregate_metrics([record])["solve"]["failed"] == 1
+
+
+def test_get_mode_shapes_metrics(tmp_path, model, pipe, seabed, system):
+    system = system._replace(abaqus_bat_path=str(ct.STAND_IN), cpus=1, pp_worker=False)
+
+    m.get_mode_shapes(
+        tmp_path, model, pipe, seabed, system, metrics=mt.Metrics(tmp_path)
+    )
+
+    records = mt.read_metrics(tmp_path)
+    assert [r["stage"] for r in records] == [
+        "in_place_deck",
+        "in_place_solve",
+        "in_place_pp",
+        "modal_deck",
+        "modal_solve",
+        "modal_pp",
+    ]
+    solve = records[1]
+    assert solve["solver"]["total_cpu_time"] == pytest.approx(0.3)
+    # the stand-in job ran as a child process of the stage
+    assert solve["child_cpu_time"] > 0
+    assert set(solve["files"]) == {
+        "in_place.odb",
+        "in_place.dat",
+        "in_place.msg",
+        "in_place.sta",
+    }
+    assert records[5]["files"]["modes.npy"] > 0
+
+
+def test_run_sweep_metrics(tmp_path):
+    inputs = copy.deepcopy(ct.inputs)
+    inputs["Model"]["element_length"] = 4
+    inputs["Sweep"] = {"grid": {"Pipe.T": [10, 50]}}
+    cases = s.expand_cases(inputs)
+
+    result = s.run_sweep(
+        tmp_path,
+        cases,
+        max_cpus=2,
+        in_place_solver="native",
+        modal_solver="native",
+        metrics=True,
+    )
+
+    assert result.metrics["in_place_solve"]["count"] == 2
+    assert result.metrics["modal_solve"]["count"] == 2
+    records = mt.read_metrics(tmp_path)
+    assert {r["case"] for r in records} == {"case_001", "case_002"}
+
+    mt.write_metrics_summary(Path(tmp_path, "metrics_summary.csv"), result.metrics)
+    lines = Path(tmp_path, "metrics_summary.csv").read_text().splitlines()
+    assert lines[0].startswith("stage,count,failed,wall_time")
+    assert len(lines) == 3
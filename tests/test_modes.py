@@ -6,6 +6,7 @@ from pathlib import Path
 import shutil
 from unittest.mock import call
 import tests.conftest as ct
+from src.utils import LoadCase
 
 import numpy as np
 
@@ -24,38 +25,96 @@ def test_write_in_place_input_file(tmp_path, pipe, model, seabed):
     assert filecmp.cmp(Path(tmp_path, "in_place.inp"), Path("tests/refs/in_place.inp"))
 
 
-def test_run_in_place(tmp_path, mocker, pipe, model, seabed, system):
-    mocked_subprocess_run = mocker.patch("src.modes.subprocess.run")
+def test_run_in_place(tmp_path, abaqus, pipe, model, seabed, system):
+    mocked_abaqus = abaqus()
 
     m.run_in_place(tmp_path, model, pipe, seabed, system)
 
     assert filecmp.cmp(Path(tmp_path, "in_place.inp"), Path("tests/refs/in_place.inp"))
-    mocked_subprocess_run.assert_called_once_with(
-        [
-            system.abaqus_bat_path,
-            "j=in_place",
-            "ask_delete=no",
-            "cpus=2",
-            "-int",
-        ],
+    mocked_abaqus.assert_called_once_with(
+        system.abaqus_bat_path,
+        "j=in_place",
+        "ask_delete=no",
+        "cpus=2",
+        "-int",
         cwd=tmp_path,
     )
 
 
-def test_pp_in_place(tmp_path, mocker, system):
-    mocked_subprocess_run = mocker.patch("src.modes.subprocess.run")
+def test_pp_in_place(tmp_path, abaqus, model, system):
+    shutil.copyfile(
+        Path("tests/refs/in_place_coords.npy"), Path(tmp_path, "in_place_coords.npy")
+    )
+    mocked_abaqus = abaqus()
 
-    m.pp_in_place(tmp_path, system)
+    m.pp_in_place(tmp_path, model, system)
 
     assert filecmp.cmp(
         Path(tmp_path, "in_place_pp.py"), Path("tests/refs/in_place_pp.py")
     )
-    mocked_subprocess_run.assert_called_once_with(
-        [system.abaqus_bat_path, "python", "in_place_pp.py"],
-        cwd=tmp_path,
+    mocked_abaqus.assert_called_once_with(
+        system.abaqus_bat_path, "python", "in_place_pp.py", cwd=tmp_path
     )
 
 
+def test_process_in_place(tmp_path, model):
+    shutil.copyfile(
+        Path("tests/refs/in_place_coords.npy"), Path(tmp_path, "in_place_coords.npy")
+    )
+
+    m.process_in_place(tmp_path, model)
+
+    assert filecmp.cmp(Path(tmp_path, "gaps.dat"), Path("tests/refs/gaps.dat"))
+    assert filecmp.cmp(
+        Path(tmp_path, "in_place_nodes.dat"), Path("tests/refs/in_place_nodes.dat")
+    )
+
+
+def test_calculate_gaps(model):
+    nodes = np.array([[0, -0.01], [80, 0.02], [100, -0.5], [200.5, 0.0]])
+
+    gaps = m.calculate_gaps(nodes, model.bathymetry)
+
+    assert gaps[:, 0] == pytest.approx([1, 2, 3, 4])
+    assert gaps[:, 1] == pytest.approx([-0.01, 0.02, 0.5, 0.0])
+
+
+@pytest.mark.parametrize(
+    "changes, line",
+    [
+        ({}, "20"),
+        ({"number_of_modes": 6}, "6"),
+        ({"number_of_modes": None, "max_frequency": 5.0}, ", , 5.0"),
+        ({"number_of_modes": "all", "max_frequency": 5.0}, ", , 5.0"),
+        ({"number_of_modes": 0, "max_frequency": 5.0, "shift": 0.5}, ", , 5.0, 0.25"),
+        ({"max_frequency": 5.0, "shift": 0.5}, "20, , 5.0, 0.25"),
+        ({"eigensolver": "ams", "max_frequency": 5.0, "shift": 0.5}, "20, , 5.0"),
+        ({"eigensolver": "subspace", "shift": 2}, "20, , 4"),
+    ],
+)
+def test_get_frequency_data(model, changes, line):
+    assert m.get_frequency_data(model._replace(**changes)) == line
+
+
+def test_get_frequency_data_invalid(model):
+    with pytest.raises(ValueError, match="eigensolver"):
+        m.get_frequency_data(model._replace(eigensolver="qr"))
+    with pytest.raises(ValueError, match="max_frequency"):
+        m.get_frequency_data(model._replace(number_of_modes=None))
+    with pytest.raises(ValueError, match="max_frequency"):
+        m.get_frequency_data(model._replace(number_of_modes="all"))
+
+
+def test_write_modal_inp_eigensolver(tmp_path, seabed, pipe, model):
+    shutil.copyfile(Path("tests/refs/gaps.dat"), Path(tmp_path, "gaps.dat"))
+    model = model._replace(eigensolver="ams", number_of_modes=6)
+
+    m.write_modal_inp(tmp_path, pipe, seabed, model)
+
+    deck = Path(tmp_path, "modal.inp").read_text()
+    assert "*FREQUENCY, EIGENSOLVER=AMS\n6\n" in deck
+
+
 def test_get_gaps():
     gaps = m.get_gaps(Path("tests/refs"))
 
@@ -90,22 +149,146 @@ def test_write_modal_inp(tmp_path, seabed, pipe, model):
     assert filecmp.cmp(Path(tmp_path, "modal.inp"), Path("tests/refs/modal.inp"))
 
 
-def test_run_modal(tmp_path, mocker, seabed, pipe, model, system):
+def test_write_modal_inp_springs_match_per_node_layout(tmp_path, seabed, pipe, model):
+    shutil.copyfile(Path("tests/refs/gaps.dat"), Path(tmp_path, "gaps.dat"))
+
+    m.write_modal_inp(tmp_path, pipe, seabed, model)
+
+    compact = parse_deck(Path(tmp_path, "modal.inp"))
+    per_node = parse_deck(Path("tests/refs/modal_per_node_springs.inp"))
+    # same spring elements, nodes and sets plus an identical remainder of the
+    # deck means Abaqus builds the same model and extracts the same frequencies
+    assert compact == per_node
+    assert len(compact[0]) == 3 * 136
+
+
+def parse_deck(path):
+    springs = set()
+    other = []
+    elset = None
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("*"):
+                elset = None
+                if line.startswith("*ELEMENT, TYPE=SPRING1"):
+                    elset = line.strip().split("ELSET=")[1]
+                    continue
+            if elset is None:
+                other.append(line)
+            else:
+                element, node = line.split(",")
+                springs.add((elset, int(element), int(node)))
+    return springs, other
+
+
+def test_write_decks_minimal_output(tmp_path, seabed, pipe, model):
+    shutil.copyfile(Path("tests/refs/gaps.dat"), Path(tmp_path, "gaps.dat"))
+    model = model._replace(output_profile="minimal")
+
+    m.write_in_place_input_file(tmp_path, model, pipe, seabed, LOAD_CASES)
+    m.write_modal_inp(tmp_path, pipe, seabed, model)
+
+    in_place = Path(tmp_path, "in_place.inp").read_text()
+    modal = Path(tmp_path, "modal.inp").read_text()
+    for deck in (in_place, modal):
+        assert "PRESELECT" not in deck
+        assert "ELEMENT OUTPUT" not in deck
+    assert in_place.count("*NODE OUTPUT, NSET=PIPELINE\nCOORD\n") == len(LOAD_CASES)
+    assert "*NODE PRINT" not in modal
+    assert "*MODAL FILE" not in modal
+    assert modal.endswith("*NODE OUTPUT, NSET=PIPE\nU\n*END STEP\n")
+
+
+def test_write_modal_inp_unknown_output_profile(tmp_path, seabed, pipe, model):
     shutil.copyfile(Path("tests/refs/gaps.dat"), Path(tmp_path, "gaps.dat"))
 
-    mocked_subprocess_run = mocker.patch("src.modes.subprocess.run")
+    with pytest.raises(ValueError, match="output profile"):
+        m.write_modal_inp(tmp_path, pipe, seabed, model._replace(output_profile="x"))
+
+
+def test_write_modal_inp_restart(tmp_path, seabed, pipe, model):
+    shutil.copyfile(Path("tests/refs/gaps.dat"), Path(tmp_path, "gaps.dat"))
+
+    m.write_modal_inp(tmp_path, pipe, seabed, model, restart=True)
+
+    deck = Path(tmp_path, "modal.inp").read_text()
+    ref = Path("tests/refs/modal.inp").read_text()
+    assert deck.replace(m.RESTART_WRITE, "") == ref
+    # restart data is written in the pre-stressing step only
+    assert ref.index("INITIAL SET UP") < deck.index(m.RESTART_WRITE)
+    assert deck.index(m.RESTART_WRITE) < deck.index(m.FREQUENCY_STEP)
+
+
+def write_base(path, seabed, pipe, model):
+    path.mkdir()
+    shutil.copyfile(Path("tests/refs/gaps.dat"), Path(path, "gaps.dat"))
+    shutil.copyfile(
+        Path("tests/refs/in_place_nodes.dat"), Path(path, "in_place_nodes.dat")
+    )
+    m.write_modal_inp(path, pipe, seabed, model, restart=True)
+    for suffix in m.RESTART_FILES:
+        Path(path, f"modal{suffix}").write_text(suffix)
+
+
+def test_write_modal_restart_inp(tmp_path, seabed, pipe, model):
+    base, variant = Path(tmp_path, "base"), Path(tmp_path, "variant")
+    write_base(base, seabed, pipe, model)
+    write_base(variant, seabed, pipe, model._replace(number_of_modes=10))
+
+    assert m.has_restart(base)
+    assert m.write_modal_restart_inp(variant, base)
+
+    deck = Path(variant, "modal.inp").read_text()
+    assert deck.startswith("*RESTART, READ, STEP=1\n" + m.FREQUENCY_STEP)
+    assert "*FREQUENCY, EIGENSOLVER=LANCZOS\n10\n" in deck
+    assert "*SPRING" not in deck
+    assert Path(variant, f"{m.RESTART_JOB}.res").read_text() == ".res"
+
+
+def test_write_modal_restart_inp_model_changed(tmp_path, seabed, pipe, model):
+    base, variant = Path(tmp_path, "base"), Path(tmp_path, "variant")
+    write_base(base, seabed, pipe, model)
+    write_base(variant, seabed._replace(C_V=2 * seabed.C_V), pipe, model)
+    deck = Path(variant, "modal.inp").read_text()
+
+    # springs are model data, a restart cannot change them
+    assert not m.write_modal_restart_inp(variant, base)
+    assert Path(variant, "modal.inp").read_text() == deck
+
+
+def test_get_restart_conflicts(seabed, pipe, model):
+    base = (model, pipe, seabed)
+    variant = model._replace(number_of_modes=10, eigensolver="subspace")
+    changed = model._replace(water_depth=2 * model.water_depth)
+
+    assert m.get_restart_conflicts(variant, pipe, seabed, base) == []
+    conflicts = m.get_restart_conflicts(
+        changed, pipe, seabed._replace(C_V=2 * seabed.C_V), base
+    )
+    assert conflicts == ["Model.water_depth", "Seabed.C_V"]
+
+
+def test_get_mode_shapes_restart_native(tmp_path, seabed, pipe, model, system):
+    with pytest.raises(ValueError):
+        m.get_mode_shapes(
+            tmp_path, model, pipe, seabed, system, modal_solver="native", restart=True
+        )
+
+
+def test_run_modal(tmp_path, abaqus, seabed, pipe, model, system):
+    shutil.copyfile(Path("tests/refs/gaps.dat"), Path(tmp_path, "gaps.dat"))
+
+    mocked_abaqus = abaqus()
 
     m.run_modal(tmp_path, pipe, seabed, model, system)
 
     assert filecmp.cmp(Path(tmp_path, "modal.inp"), Path("tests/refs/modal.inp"))
-    mocked_subprocess_run.assert_called_once_with(
-        [
-            system.abaqus_bat_path,
-            "j=modal",
-            "ask_delete=no",
-            "cpus=2",
-            "-int",
-        ],
+    mocked_abaqus.assert_called_once_with(
+        system.abaqus_bat_path,
+        "j=modal",
+        "ask_delete=no",
+        "cpus=2",
+        "-int",
         cwd=tmp_path,
     )
 
@@ -116,30 +299,34 @@ def test_write_modal_pp_file(tmp_path):
     assert filecmp.cmp(Path(tmp_path, "modal_pp.py"), Path("tests/refs/modal_pp.py"))
 
 
-def test_pp_modal(tmp_path, mocker, system):
-    mocked_subprocess_run = mocker.patch("src.modes.subprocess.run")
+def test_pp_modal(tmp_path, mocker, abaqus, system):
+    for f in ["modes.npy", "freqs.dat"]:
+        shutil.copyfile(Path("tests/refs", f), Path(tmp_path, f))
+    mocked_abaqus = abaqus()
     mocked_read_natural_freqs = mocker.patch("src.modes.read_natural_freqs")
     mocked_read_mode_shapes = mocker.patch("src.modes.read_mode_shapes")
 
     m.pp_modal(tmp_path, system)
 
     assert filecmp.cmp(Path(tmp_path, "modal_pp.py"), Path("tests/refs/modal_pp.py"))
-    mocked_subprocess_run.assert_called_once_with(
-        [system.abaqus_bat_path, "python", "modal_pp.py"],
-        cwd=tmp_path,
+    mocked_abaqus.assert_called_once_with(
+        system.abaqus_bat_path, "python", "modal_pp.py", cwd=tmp_path
     )
     mocked_read_natural_freqs.assert_called_once_with(tmp_path)
     mocked_read_mode_shapes.assert_called_once_with(tmp_path)
 
 
-def test_get_mode_shapes(tmp_path, mocker, seabed, pipe, model, system):
-    shutil.copyfile(Path("tests/refs/gaps.dat"), Path(tmp_path, "gaps.dat"))
+def test_get_mode_shapes(tmp_path, abaqus, seabed, pipe, model, system):
+    shutil.copyfile(
+        Path("tests/refs/in_place_coords.npy"), Path(tmp_path, "in_place_coords.npy")
+    )
     ref_mode_shape_files = glob.glob("mode_*.dat", root_dir=Path("tests/refs"))
     for f in ref_mode_shape_files:
         shutil.copyfile(Path("tests/refs", f), Path(tmp_path, f))
-    shutil.copyfile(Path("tests/refs/freqs.dat"), Path(tmp_path, "freqs.dat"))
+    for f in ["modes.npy", "freqs.dat"]:
+        shutil.copyfile(Path("tests/refs", f), Path(tmp_path, f))
 
-    mocked_subprocess_run = mocker.patch("src.modes.subprocess.run")
+    mocked_abaqus = abaqus()
 
     m.get_mode_shapes(
         tmp_path,
@@ -151,36 +338,26 @@ def test_get_mode_shapes(tmp_path, mocker, seabed, pipe, model, system):
 
     calls = [
         call(
-            [
-                system.abaqus_bat_path,
-                "j=in_place",
-                "ask_delete=no",
-                "cpus=2",
-                "-int",
-            ],
-            cwd=tmp_path,
-        ),
-        call(
-            [system.abaqus_bat_path, "python", "in_place_pp.py"],
-            cwd=tmp_path,
-        ),
-        call(
-            [
-                system.abaqus_bat_path,
-                "j=modal",
-                "ask_delete=no",
-                "cpus=2",
-                "-int",
-            ],
+            system.abaqus_bat_path,
+            "j=in_place",
+            "ask_delete=no",
+            "cpus=2",
+            "-int",
             cwd=tmp_path,
         ),
+        call(system.abaqus_bat_path, "python", "in_place_pp.py", cwd=tmp_path),
         call(
-            [system.abaqus_bat_path, "python", "modal_pp.py"],
+            system.abaqus_bat_path,
+            "j=modal",
+            "ask_delete=no",
+            "cpus=2",
+            "-int",
             cwd=tmp_path,
         ),
+        call(system.abaqus_bat_path, "python", "modal_pp.py", cwd=tmp_path),
     ]
 
-    mocked_subprocess_run.assert_has_calls(calls)
+    mocked_abaqus.assert_has_calls(calls)
 
     assert filecmp.cmp(
         Path(tmp_path, "in_place_pp.py"), Path("tests/refs/in_place_pp.py")
@@ -190,6 +367,192 @@ def test_get_mode_shapes(tmp_path, mocker, seabed, pipe, model, system):
     assert filecmp.cmp(Path(tmp_path, "modal_pp.py"), Path("tests/refs/modal_pp.py"))
 
 
+def test_get_mode_shapes_native(tmp_path, abaqus, seabed, pipe, model, system):
+    shutil.copyfile(
+        Path("tests/refs/in_place_coords.npy"), Path(tmp_path, "in_place_coords.npy")
+    )
+
+    mocked_abaqus = abaqus()
+
+    modes = m.get_mode_shapes(
+        tmp_path, model, pipe, seabed, system, modal_solver="native"
+    )
+
+    assert mocked_abaqus.call_count == 2
+    assert not Path(tmp_path, "modal.inp").exists()
+    assert list(modes.keys()) == list(range(1, 21))
+    assert modes[1]["mode_shape"].shape == (201, 2)
+
+
+def test_get_mode_shapes_native_in_place(
+    tmp_path, mocker, abaqus, seabed, pipe, model, system
+):
+    mocked_abaqus = abaqus()
+    mocked_pp_modal = mocker.patch("src.modes.pp_modal")
+
+    m.get_mode_shapes(tmp_path, model, pipe, seabed, system, in_place_solver="native")
+
+    mocked_abaqus.assert_called_once_with(
+        system.abaqus_bat_path,
+        "j=modal",
+        "ask_delete=no",
+        "cpus=2",
+        "-int",
+        cwd=tmp_path,
+    )
+    mocked_pp_modal.assert_called_once_with(tmp_path, system)
+    assert not Path(tmp_path, "in_place.inp").exists()
+    assert len(m.get_gaps(tmp_path)) == 201
+    assert m.read_in_place_nodes(tmp_path).shape == (201, 2)
+
+
+LOAD_CASES = [
+    LoadCase("empty", 0, 0, 0),
+    LoadCase("flooded", 1025, 0, 0),
+    LoadCase("operating", 900, 1e7, 10),
+]
+
+
+def test_write_in_place_input_file_load_cases(tmp_path, pipe, model, seabed):
+    m.write_in_place_input_file(tmp_path, model, pipe, seabed, LOAD_CASES)
+
+    deck = Path(tmp_path, "in_place.inp").read_text()
+    assert deck.count("*STEP") == 4
+    py = [float(l.split(",")[2]) for l in deck.splitlines() if ", PY," in l]
+    A_i = np.pi * (pipe.od - 2 * pipe.wt) ** 2 / 4
+    expected = [
+        (pipe.rho_contents - lc.rho_contents) * A_i * model.g for lc in LOAD_CASES
+    ]
+    assert py == pytest.approx(expected, rel=1e-3)
+    assert "PIPELINE, PI, 1.000e+07" in deck.split("*STEP")[-1]
+
+
+def test_get_mode_shapes_load_cases_native(tmp_path, seabed, pipe, model, system):
+    results = m.get_mode_shapes(
+        tmp_path,
+        model,
+        pipe,
+        seabed,
+        system,
+        in_place_solver="native",
+        modal_solver="native",
+        load_cases=LOAD_CASES[:2],
+    )
+
+    assert list(results.keys()) == ["empty", "flooded"]
+    # contents add mass, so the flooded pipe is slower
+    assert results["flooded"][1]["frequency"] < results["empty"][1]["frequency"]
+    assert Path(tmp_path, "flooded", "gaps.dat").is_file()
+
+
+def test_get_mode_shapes_load_cases(tmp_path, abaqus, seabed, pipe, model, system):
+    def fake_abaqus(args, cwd):
+        if args[1:] == ["python", "in_place_pp.py"]:
+            for lc in LOAD_CASES:
+                shutil.copyfile(
+                    Path("tests/refs/in_place_coords.npy"),
+                    Path(cwd, f"in_place_coords_{lc.name}.npy"),
+                )
+        elif args[1:] == ["python", "modal_pp.py"]:
+            for f in ["modes.npy", "freqs.dat"]:
+                shutil.copyfile(Path("tests/refs", f), Path(cwd, f))
+
+    mocked_abaqus = abaqus(fake_abaqus)
+
+    results = m.get_mode_shapes(
+        tmp_path, model, pipe, seabed, system, load_cases=LOAD_CASES
+    )
+
+    jobs = [(c.args[1], c.kwargs["cwd"]) for c in mocked_abaqus.call_args_list]
+    assert jobs[0] == ("j=in_place", tmp_path)
+    assert jobs.count(("python", tmp_path)) == 1
+    for lc in LOAD_CASES:
+        assert ("j=modal", Path(tmp_path, lc.name)) in jobs
+    assert list(results.keys()) == ["empty", "flooded", "operating"]
+    assert len(results["operating"]) == 20
+    assert m.get_modes(tmp_path, LOAD_CASES).keys() == results.keys()
+
+
+def test_get_mode_shapes_unknown_solver(tmp_path, seabed, pipe, model, system):
+    with pytest.raises(ValueError):
+        m.get_mode_shapes(tmp_path, model, pipe, seabed, system, modal_solver="x")
+
+
+def test_get_mesh_adaptive(pipe, seabed, model):
+    model = model._replace(element_length=4, min_element_length=0.25)
+
+    x = m.get_mesh(model, pipe, seabed)
+    dx = np.diff(x)
+
+    assert x[0] == 0 and x[-1] == 200
+    assert np.all(np.isin([80, 120], x))
+    assert dx.min() == pytest.approx(0.25, rel=0.05)
+    assert dx.max() <= 4 + 1e-9
+    assert len(x) < 200 / 0.25
+    # fine within the flexural length of the shoulders, coarse far from them
+    zone = m.get_flexural_length(pipe, seabed)
+    assert np.all(dx[(x[:-1] > 80) & (x[1:] < 80 + zone)] < 0.3)
+    assert dx[np.searchsorted(x, 40)] > 2
+
+
+def test_get_tributary_lengths():
+    lengths = m.get_tributary_lengths(np.array([0, 1, 3, 4]))
+
+    assert lengths.tolist() == [1, 1.5, 1.5, 1]
+
+
+def test_write_adaptive_decks(tmp_path, pipe, seabed, model):
+    from src.native import solve_in_place
+
+    model = model._replace(element_length=4, min_element_length=0.5)
+    x = m.get_mesh(model, pipe, seabed)
+    m.write_in_place_input_file(tmp_path, model, pipe, seabed)
+    nodes, gaps = solve_in_place(model, pipe, seabed)
+    m.write_in_place_results(tmp_path, nodes, gaps)
+
+    m.write_modal_inp(tmp_path, pipe, seabed, model)
+
+    deck = Path(tmp_path, "in_place.inp").read_text()
+    assert "*NGEN" not in deck
+    assert f"{len(x)}, 200.000000, 0\n" in deck
+    springs, other = parse_deck(Path(tmp_path, "modal.inp"))
+    text = "".join(other)
+    assert {elset for elset, _, _ in springs} == {"SPR_AX", "SPR_VERT", "SPR_LAT"}
+    table = text.split("*SPRING, ELSET=SPR_VERT, DEPENDENCIES=1\n2\n")[1]
+    rows = [line.split(",") for line in table.splitlines()[:2]]
+    # stiffness, frequency, temperature, field variable 1
+    assert all(len(r) == 4 and r[1].strip() == r[2].strip() == "" for r in rows)
+    table = np.array([[r[0], r[3]] for r in rows], float)
+    fields = text.split("*INITIAL CONDITIONS, TYPE=FIELD, VARIABLE=1\n")[1]
+    fields = dict(line.split(", ") for line in fields.split("*")[0].splitlines())
+    lengths = m.get_tributary_lengths(x)
+    K_V_d = m.get_K_V_d(pipe, seabed, model)
+    for elset, _, node in springs:
+        if elset == "SPR_VERT":
+            l = float(fields[str(node)])
+            assert l == pytest.approx(lengths[node - 1], rel=1e-6)
+            stiffness = np.interp(l, table[:, 1], table[:, 0])
+            assert stiffness == pytest.approx(K_V_d * lengths[node - 1], rel=1e-6)
+    contacts = {int(n) for n, gap in gaps if gap <= 0}
+    assert {node for _, _, node in springs} == contacts
+    assert len({element for _, element, _ in springs}) == 3 * len(contacts)
+
+
+def test_get_seabed_elevation(model):
+    x = np.array([-5, 40, 80, 100, 120, 160, 250])
+
+    actual = m.get_seabed_elevation(x, model.bathymetry)
+
+    assert actual == pytest.approx([0, 0, 0, -1, 0, 0, 0])
+
+
+def test_read_in_place_nodes():
+    nodes = m.read_in_place_nodes(Path("tests/refs"))
+
+    assert nodes.shape == (201, 2)
+    assert nodes[1] == pytest.approx([1.0, -5.792e-03])
+
+
 def test_read_natural_freqs(tmp_path):
     shutil.copyfile(Path("tests/refs/freqs.dat"), Path(tmp_path, "freqs.dat"))
 
@@ -204,14 +567,25 @@ def test_read_mode_shape_files(tmp_path):
     for f in ref_mode_shape_files:
         shutil.copyfile(Path("tests/refs", f), Path(tmp_path, f))
 
-    modes = m.read_mode_shapes(tmp_path)
+    shapes = m.read_mode_shapes(tmp_path)
+
+    assert shapes.shape[0] == len(ref_mode_shape_files)
+    assert shapes.shape[2] == 3
+    assert m.get_directions(shapes) == [REF_DIRS[k] for k in range(1, 21)]
 
-    assert len(modes.keys()) == len(ref_mode_shape_files)
-    for k, v in modes.items():
-        assert type(v["mode_shape"]) is np.ndarray
-        assert v["mode_shape"].shape[1] == 2
-        print(k)
-        assert v["direction"] == REF_DIRS[k]
+
+def test_read_mode_shapes_binary(tmp_path):
+    legacy_path = Path(tmp_path, "legacy")
+    legacy_path.mkdir()
+    for f in glob.glob("mode_*.dat", root_dir=Path("tests/refs")):
+        shutil.copyfile(Path("tests/refs", f), Path(legacy_path, f))
+    shutil.copyfile(Path("tests/refs/modes.npy"), Path(tmp_path, "modes.npy"))
+
+    shapes = m.read_mode_shapes(tmp_path)
+    legacy = m.read_mode_shapes(legacy_path)
+
+    assert isinstance(shapes, np.memmap)
+    assert shapes == pytest.approx(legacy)
 
 
 def test_get_modes(tmp_path):
@@ -222,11 +596,36 @@ def test_get_modes(tmp_path):
 
     actual = m.get_modes(tmp_path)
 
-    assert type(actual) is dict
+    assert type(actual) is m.ModeSet
     assert len(actual.keys()) == len(ref_mode_shape_files)
     freqs = np.array([(k, actual[k]["frequency"]) for k in actual.keys()])
     for i in [0, 1]:
         assert np.all(np.diff(freqs[:, i]) > 0)
+    for k, v in actual.items():
+        assert v["direction"] == REF_DIRS[k]
+        assert v["mode_shape"].shape[1] == 2
+
+
+def test_mode_set(tmp_path):
+    shapes = np.load("tests/refs/modes.npy", mmap_mode="r")
+    frequencies = np.arange(1, len(shapes) + 1, dtype=float)
+
+    modes = m.ModeSet(
+        frequencies, shapes, fields={"label": list("abcdefghijklmnopqrst")}
+    )
+
+    assert list(modes) == list(range(1, 21))
+    assert modes[3]["frequency"] == 3
+    assert modes[3]["label"] == "c"
+    assert modes.mode_shapes.shape == (20, shapes.shape[1], 2)
+    for n, ms in enumerate(shapes):
+        # the rotated shape is the transverse shape with its peak along x
+        rotated = modes[n + 1]["mode_shape"]
+        assert np.allclose(np.hypot(*rotated.T), np.hypot(ms[:, 1], ms[:, 2]))
+        peak = np.argmax(np.hypot(ms[:, 1], ms[:, 2]))
+        assert rotated[peak, 1] == pytest.approx(0, abs=1e-12)
+        assert modes[n + 1]["direction"] == m.get_direction(ms)
+    assert np.array_equal(m.rotate_mode(shapes[0]), modes[1]["mode_shape"])
 
 
 def test_get_direction(mode_shape):
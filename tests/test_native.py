@@ -0,0 +1,101 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+import src.native as n
+from src.utils import get_A
+
+
+def test_solve_modal_fixed_pinned_beam(pipe, seabed, model):
+    pipe = dataclasses.replace(pipe, Pi=0, T=0)
+    length = 40
+    x = np.linspace(0, length, 81)
+    nodes = np.vstack((x, np.zeros_like(x))).T
+    gaps = [(i + 1, 10.0) for i in range(len(x))]
+
+    modes = n.solve_modal(nodes, gaps, pipe, seabed, model, number_of_modes=4)
+
+    A, I = n.get_section(pipe)
+    m = pipe.get_rho_eff() * A + n.SUBMERGED * model.rho_sw * get_A(pipe.od)
+    f_1 = 3.9266**2 / (2 * np.pi * length**2) * np.sqrt(pipe.E * I / m)
+
+    assert np.isclose(modes[1]["frequency"], f_1, rtol=1e-3)
+    assert np.isclose(modes[2]["frequency"], f_1, rtol=1e-3)
+    assert {modes[1]["direction"], modes[2]["direction"]} == {"inline", "cross-flow"}
+
+
+def test_solve_modal_reference_model(pipe, seabed, model):
+    nodes = np.loadtxt("tests/refs/in_place_nodes.dat", delimiter=",", skiprows=1)
+    gaps = np.loadtxt("tests/refs/gaps.dat", delimiter=",")
+    freqs = np.loadtxt("tests/refs/freqs.dat")
+
+    modes = n.solve_modal(nodes[:, 1:3], gaps, pipe, seabed, model)
+
+    assert list(modes.keys()) == list(range(1, 21))
+    assert modes[1]["mode_shape"].shape == (len(nodes), 2)
+    # the span modes agree with Abaqus to 0.5%, the higher modes to 2.5% as the
+    # PIPE31H elements are linear where the native beam is cubic
+    assert np.allclose(modes.frequencies[:6], freqs[:6], rtol=5e-3, atol=0)
+    assert np.allclose(modes.frequencies, freqs, rtol=2.5e-2, atol=0)
+
+
+def test_solve_modal_frequency_band(pipe, seabed, model):
+    nodes = np.loadtxt("tests/refs/in_place_nodes.dat", delimiter=",", skiprows=1)
+    gaps = np.loadtxt("tests/refs/gaps.dat", delimiter=",")
+    full = n.solve_modal(nodes[:, 1:3], gaps, pipe, seabed, model, number_of_modes=40)
+    frequencies = np.array([v["frequency"] for v in full.values()])
+    cutoff = frequencies[24] + 1e-6
+
+    band = n.solve_modal(
+        nodes[:, 1:3],
+        gaps,
+        pipe,
+        seabed,
+        model._replace(number_of_modes=None, max_frequency=cutoff, shift=2.0),
+    )
+
+    assert len(band) == 25
+    assert np.allclose([v["frequency"] for v in band.values()], frequencies[:25])
+
+
+@pytest.mark.parametrize("number_of_modes", ["all", 0])
+def test_solve_modal_all_modes_below_cutoff(pipe, seabed, model, number_of_modes):
+    nodes = np.loadtxt("tests/refs/in_place_nodes.dat", delimiter=",", skiprows=1)
+    gaps = np.loadtxt("tests/refs/gaps.dat", delimiter=",")
+    full = n.solve_modal(nodes[:, 1:3], gaps, pipe, seabed, model, number_of_modes=60)
+
+    band = n.solve_modal(
+        nodes[:, 1:3],
+        gaps,
+        pipe,
+        seabed,
+        model._replace(number_of_modes=number_of_modes, max_frequency=30.0),
+    )
+
+    expected = full.frequencies[full.frequencies <= 30.0]
+    assert len(expected) > 20
+    assert np.allclose(band.frequencies, expected)
+
+
+def test_solve_in_place(pipe, seabed, model):
+    ref_nodes = np.loadtxt("tests/refs/in_place_nodes.dat", delimiter=",", skiprows=1)
+    ref_gaps = np.loadtxt("tests/refs/gaps.dat", delimiter=",")
+
+    nodes, gaps = n.solve_in_place(model, pipe, seabed)
+
+    assert nodes.shape == (201, 2)
+    assert np.all(gaps[:, 0] == np.arange(1, 202))
+    # the references are written to four significant figures
+    assert np.allclose(nodes[:, 0], ref_nodes[:, 1], rtol=1e-3, atol=1e-3)
+    assert np.allclose(nodes[:, 1], ref_nodes[:, 2], rtol=0, atol=1e-3)
+    assert np.allclose(gaps[:, 1], ref_gaps[:, 1], rtol=0, atol=1e-3)
+    assert np.array_equal(gaps[:, 1] <= 0, ref_gaps[:, 1] <= 0)
+
+
+def test_solve_in_place_friction_free(pipe, seabed, model):
+    # without friction the supported sections slide, so the span pulls in further
+    free = n.solve_in_place(model, pipe, seabed._replace(mu_ax=0))[0]
+    nodes = n.solve_in_place(model, pipe, seabed)[0]
+
+    assert free[79, 0] - 79 > nodes[79, 0] - 79 > 0
@@ -0,0 +1,98 @@
+import hashlib
+from pathlib import Path
+import shutil
+
+import pytest
+
+import src.modes as m
+import src.pipeline as pl
+
+
+def fake_abaqus(args, cwd):
+    if args[1] == "python":
+        results = {
+            "in_place_pp.py": ["in_place_coords.npy"],
+            "modal_pp.py": ["freqs.dat", "modes.npy"],
+        }[args[2]]
+        for f in results:
+            shutil.copyfile(Path("tests/refs", f), Path(cwd, f))
+    else:
+        job = args[1][2:]
+        shutil.copyfile(Path(cwd, job + ".inp"), Path(cwd, job + ".odb"))
+
+
+def test_run_pipeline_skips_unchanged_stages(
+    tmp_path, abaqus, model, pipe, seabed, system
+):
+    mocked_abaqus = abaqus(fake_abaqus)
+
+    modes = pl.run_pipeline(tmp_path, model, pipe, seabed, system)
+    assert mocked_abaqus.call_count == 4
+    assert len(modes) == 20
+
+    pl.run_pipeline(tmp_path, model, pipe, seabed, system)
+    assert mocked_abaqus.call_count == 4
+
+    seabed = seabed._replace(C_V=1e7)
+    plan = pl.run_pipeline(tmp_path, model, pipe, seabed, system, dry_run=True)
+    assert [(i.stage, i.run, i.reason) for i in plan] == [
+        ("in_place", False, "up to date"),
+        ("in_place_pp", False, "up to date"),
+        ("modal", True, "inputs changed"),
+        ("modal_pp", True, "upstream stage reruns"),
+    ]
+
+    m.get_mode_shapes(tmp_path, model, pipe, seabed, system, incremental=True)
+    assert [c.args[1] for c in mocked_abaqus.call_args_list[4:]] == [
+        "j=modal",
+        "python",
+    ]
+
+
+def test_plan_upstream_change(tmp_path, abaqus, model, pipe, seabed, system):
+    abaqus(fake_abaqus)
+    pl.run_pipeline(tmp_path, model, pipe, seabed, system)
+
+    plan = pl.run_pipeline(tmp_path, model, pipe, seabed, system, dry_run=True)
+    assert not any(i.run for i in plan)
+
+    Path(tmp_path, "gaps.dat").unlink()
+    plan = pl.run_pipeline(tmp_path, model, pipe, seabed, system, dry_run=True)
+    assert [(i.stage, i.reason) for i in plan] == [
+        ("in_place", "up to date"),
+        ("in_place_pp", "outputs missing or modified"),
+        ("modal", "upstream artifacts changed"),
+        ("modal_pp", "upstream stage reruns"),
+    ]
+    assert "modal_pp     run" in pl.format_plan(plan)
+
+
+def test_run_pipeline_native(tmp_path, model, pipe, seabed, system):
+    modes = pl.run_pipeline(
+        tmp_path, model, pipe, seabed, system, "native", "native"
+    )
+    plan = pl.run_pipeline(
+        tmp_path, model, pipe, seabed, system, "native", "native", dry_run=True
+    )
+
+    assert len(modes) == 20
+    assert [(i.stage, i.run) for i in plan] == [("in_place", False), ("modal", True)]
+
+
+def test_incremental_with_cache(tmp_path, model, pipe, seabed, system):
+    with pytest.raises(ValueError):
+        m.get_mode_shapes(
+            tmp_path, model, pipe, seabed, system, cache=object(), incremental=True
+        )
+
+
+def test_hash_files(tmp_path):
+    data = bytes(range(256)) * 4096
+    Path(tmp_path, "modal.odb").write_bytes(data)
+
+    hashes = pl.hash_files(tmp_path, ["*.odb", "gaps.dat"])
+
+    assert hashes == {
+        "modal.odb": hashlib.sha256(data).hexdigest(),
+        "gaps.dat": None,
+    }
@@ -0,0 +1,103 @@
+import copy
+import gzip
+import os
+from pathlib import Path
+
+import pytest
+
+import src.scratch as sc
+import src.sweep as s
+import tests.conftest as ct
+
+FILES = {
+    "in_place.inp": "deck",
+    "in_place.odb": "odb",
+    "modal.res": "restart",
+    "gaps.dat": "gaps",
+    "modes.npy": "modes",
+    "load_case/gaps.dat": "gaps",
+}
+
+
+def write_files(path):
+    for name, text in FILES.items():
+        Path(path, name).parent.mkdir(parents=True, exist_ok=True)
+        Path(path, name).write_text(text)
+
+
+@pytest.fixture
+def root(tmp_path):
+    return Path(tmp_path, "scratch")
+
+
+def test_run_results(tmp_path, root):
+    scratch = sc.ScratchSpace(root)
+    case_path = Path(tmp_path, "case")
+
+    with scratch.run(case_path) as path:
+        assert path.parent == root
+        write_files(path)
+    scratch.wait()
+
+    kept = sorted(str(p.relative_to(case_path)) for p in case_path.rglob("*.*"))
+    assert kept == ["gaps.dat", "load_case/gaps.dat", "modes.npy"]
+    assert list(root.iterdir()) == []
+
+
+def test_run_compressed(tmp_path, root):
+    scratch = sc.ScratchSpace(root, retention="compressed")
+    case_path = Path(tmp_path, "case")
+
+    with scratch.run(case_path, keep=["modal.res"]) as path:
+        write_files(path)
+    scratch.wait()
+
+    with gzip.open(Path(case_path, "in_place.odb.gz"), "rt") as f:
+        assert f.read() == "odb"
+    assert Path(case_path, "modal.res").is_file()
+    assert not Path(case_path, "in_place.odb").exists()
+    assert not Path(case_path, "in_place.inp").exists()
+
+
+def test_run_failed(tmp_path, root):
+    scratch = sc.ScratchSpace(root)
+    case_path = Path(tmp_path, "case")
+
+    with pytest.raises(RuntimeError):
+        with scratch.run(case_path) as path:
+            write_files(path)
+            raise RuntimeError("job failed")
+    scratch.wait()
+
+    for name in FILES:
+        assert Path(case_path, name).is_file()
+
+
+def test_get_scratch_root(tmp_path):
+    if os.path.isdir(sc.TMPFS):
+        assert sc.get_scratch_root("tmpfs") == Path(sc.TMPFS)
+    assert sc.get_scratch_root(Path(tmp_path, "a")).is_dir()
+
+    with pytest.raises(ValueError):
+        sc.ScratchSpace(tmp_path, retention="none")
+
+
+def test_run_sweep_scratch(tmp_path, root):
+    inputs = copy.deepcopy(ct.inputs)
+    inputs["Model"]["element_length"] = 4
+    inputs["Sweep"] = {"grid": {"Pipe.T": [10, 50]}}
+    cases = s.expand_cases(inputs)
+
+    result = s.run_sweep(
+        tmp_path,
+        cases,
+        max_cpus=2,
+        in_place_solver="native",
+        modal_solver="native",
+        scratch=sc.ScratchSpace(root),
+    )
+
+    assert result.frequencies.shape == (2, 20)
+    for case in cases:
+        assert Path(tmp_path, case.name, "gaps.dat").is_file()
+    assert list(root.iterdir()) == []
@@ -0,0 +1,118 @@
+import dataclasses
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.screening as s
+
+ROUTE = [
+    [0, 0],
+    [100, 0],
+    [100, -1],
+    [140, -1],
+    [140, 0],
+    [300, 0],
+    [310, -0.5],
+    [320, 0],
+    [500, 0],
+]
+
+
+@pytest.fixture
+def route(model):
+    return model._replace(bathymetry=ROUTE, element_length=2)
+
+
+def test_get_upper_hull():
+    x = np.array([0, 1, 1, 2, 2, 3, 4.0])
+    z = np.array([0, 0, -1, -1, 0, 0.5, 0])
+
+    assert s.get_upper_hull(x, z).tolist() == [0, 5, 6]
+
+
+def test_get_spans(model):
+    start, end, gap = s.get_spans(ROUTE)
+
+    assert start.tolist() == [100, 300]
+    assert end.tolist() == [140, 320]
+    assert gap.tolist() == [1, 0.5]
+    assert [a.tolist() for a in s.get_spans(model.bathymetry)] == [[80], [120], [1]]
+
+
+def test_screen_spans(route, pipe, seabed):
+    pipe = dataclasses.replace(pipe, Pi=0, T=0)
+
+    result = s.screen_spans(route, pipe, seabed, current_velocity=0.2)
+
+    f_il = result.frequencies["inline"]
+    f_cf = result.frequencies["cross-flow"]
+    # the 20 m span is roughly four times stiffer than the 40 m span
+    assert 3 < f_il[1] / f_il[0] < 5
+    assert np.all(f_cf > f_il)
+    assert result.critical.tolist() == [True, False]
+    assert result.get_critical_spans() == [(100, 140)]
+    assert s.screen_spans(route, pipe, seabed, 0.2, threshold=10).critical.sum() == 0
+
+
+def test_screen_spans_buckled(route, pipe, seabed):
+    # cooling puts the restrained pipe in compression
+    pipe = dataclasses.replace(pipe, T=-500)
+
+    result = s.screen_spans(route, pipe, seabed, current_velocity=0.1)
+
+    assert result.frequencies["inline"][0] == 0
+    assert result.critical[0]
+
+
+def test_get_span_frequencies_reference(model, pipe, seabed):
+    from src.native import solve_in_place, solve_modal
+
+    start, end, gap = s.get_spans(model.bathymetry)
+    nodes, gaps = solve_in_place(model, pipe, seabed)
+    modes = solve_modal(nodes, gaps, pipe, seabed, model)
+
+    frequencies = s.get_span_frequencies(end - start, gap, pipe, seabed, model)
+
+    # the analytical screen is within 10% of the FE frequency of the span
+    for direction in ["inline", "cross-flow"]:
+        fe = modes.frequencies[modes.directions.index(direction)]
+        assert frequencies[direction][0] == pytest.approx(fe, rel=0.1)
+
+
+def test_crop_model(route):
+    cropped = s.crop_model(route, 100, 140, margin=15)
+
+    assert cropped.bathymetry == [
+        [84, 0],
+        [100, 0],
+        [100, -1],
+        [140, -1],
+        [140, 0],
+        [156, 0],
+    ]
+    assert s.crop_model(route, 300, 320).bathymetry[0] == [280, 0]
+    assert s.crop_model(route, 100, 140, margin=200).bathymetry[0] == [0, 0]
+
+
+def test_run_screening(tmp_path, route, pipe, seabed, system):
+    pipe = dataclasses.replace(pipe, Pi=0, T=0)
+
+    screening, sweep = s.run_screening(
+        tmp_path,
+        route,
+        pipe,
+        seabed,
+        system,
+        current_velocity=0.2,
+        max_cpus=1,
+        in_place_solver="native",
+        modal_solver="native",
+    )
+
+    assert [c.name for c in sweep.cases] == ["span_001"]
+    assert sweep.cases[0].parameters == {"start": 100, "end": 140}
+    assert sweep.frequencies.shape == (1, 20)
+    assert Path(tmp_path, "span_001", "gaps.dat").is_file()
+    screening.to_csv(Path(tmp_path, "spans.csv"))
+    assert len(Path(tmp_path, "spans.csv").read_text().splitlines()) == 3
@@ -0,0 +1,66 @@
+import dataclasses
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.segmentation as sg
+
+ROUTE = [
+    [0, 0],
+    [100, 0],
+    [100, -1],
+    [140, -1],
+    [140, 0],
+    [300, 0],
+    [310, -0.5],
+    [320, 0],
+    [330, 0],
+    [340, -0.5],
+    [350, 0],
+    [500, 0],
+]
+
+
+@pytest.fixture
+def route(model):
+    return model._replace(bathymetry=ROUTE, element_length=2, number_of_modes=4)
+
+
+def test_get_windows(route):
+    windows = sg.get_windows(route, support_length=20)
+
+    assert [(w.bathymetry[0][0], w.bathymetry[-1][0]) for w in windows] == [
+        (80, 160),
+        (280, 370),
+    ]
+    assert len(sg.get_windows(route, support_length=5)) == 3
+
+
+def test_run_segmented(tmp_path, route, pipe, seabed, system):
+    pipe = dataclasses.replace(pipe, Pi=0, T=0)
+
+    modes = sg.run_segmented(
+        tmp_path,
+        route,
+        pipe,
+        seabed,
+        system,
+        support_length=20,
+        max_cpus=2,
+        in_place_solver="native",
+        modal_solver="native",
+    )
+
+    frequencies = [v["frequency"] for v in modes.values()]
+    assert len(modes) == 8
+    assert frequencies == sorted(frequencies)
+    assert {v["window"] for v in modes.values()} == {"window_001", "window_002"}
+    x = np.linspace(0, 500, 251)
+    for v in modes.values():
+        assert v["mode_shape"].shape == (251, 2)
+        outside = (x < 80) | ((x > 160) & (x < 280)) | (x > 370)
+        assert np.all(v["mode_shape"][outside] == 0)
+    assert Path(tmp_path, "window_002", "gaps.dat").is_file()
+    # the longest span governs the fundamental mode
+    assert modes[1]["window"] == "window_001"
@@ -0,0 +1,122 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.modes as m
+import src.jobs as jobs
+import src.sweep as s
+from src.scratch import ScratchSpace
+import tests.conftest as ct
+
+
+@pytest.fixture
+def stand_in(system):
+    yield system._replace(abaqus_bat_path=str(ct.STAND_IN), cpus=1)
+    jobs.close_workers()
+
+
+@pytest.mark.parametrize(
+    "pp_worker, output_profile", [(True, "full"), (False, "minimal")]
+)
+def test_get_mode_shapes(
+    tmp_path, model, pipe, seabed, stand_in, pp_worker, output_profile
+):
+    system = stand_in._replace(pp_worker=pp_worker)
+    model = model._replace(output_profile=output_profile)
+
+    modes = m.get_mode_shapes(tmp_path, model, pipe, seabed, system)
+
+    assert len(modes) == 20
+    assert modes.shapes.shape == (20, 201, 3)
+    assert modes.directions[:2] == ["cross-flow", "inline"]
+    gaps = np.array(m.get_gaps(tmp_path))
+    # the pipe bridges the 80 m to 120 m span
+    assert np.all(gaps[81:120, 1] > 0)
+    assert np.all(gaps[:81, 1] < 0)
+    for f in ["in_place.odb", "modal.odb", "modal.sta", "in_place_nodes.dat"]:
+        assert Path(tmp_path, f).is_file()
+
+
+def test_get_mode_shapes_restart(
+    tmp_path, model, pipe, seabed, stand_in, mocker, caplog
+):
+    base, variant, changed = [Path(tmp_path, n) for n in ("base", "variant", "changed")]
+    for path in (base, variant, changed):
+        path.mkdir()
+    spy = mocker.spy(m, "run_abaqus")
+
+    m.get_mode_shapes(base, model, pipe, seabed, stand_in, restart=True)
+    modes = m.get_mode_shapes(
+        variant,
+        model._replace(number_of_modes=10),
+        pipe,
+        seabed,
+        stand_in,
+        restart_from=base,
+    )
+    m.get_mode_shapes(
+        changed,
+        model,
+        pipe,
+        seabed._replace(C_V=2 * seabed.C_V),
+        stand_in,
+        restart_from=base,
+    )
+
+    assert len(modes) == 10
+    assert Path(variant, "modal.inp").read_text().startswith("*RESTART, READ")
+    assert [c.kwargs["oldjob"] for c in spy.call_args_list[1::2]] == [
+        None,
+        m.RESTART_JOB,
+        None,
+    ]
+    assert "differs from" in caplog.text
+
+
+@pytest.mark.parametrize("scratch", [False, True])
+def test_run_sweep_restart(tmp_path, stand_in, scratch):
+    inputs = copy.deepcopy(ct.inputs)
+    inputs["System"] = stand_in._asdict()
+    inputs["Sweep"] = {"grid": {"Model.number_of_modes": [20, 10, 6]}}
+    cases = s.expand_cases(inputs)
+
+    if scratch:
+        scratch = ScratchSpace(Path(tmp_path, "scratch"))
+
+    result = s.run_sweep(
+        tmp_path, cases, max_cpus=2, restart=True, scratch=scratch or None
+    )
+
+    assert [np.count_nonzero(~np.isnan(f)) for f in result.frequencies] == [20, 10, 6]
+    if scratch:
+        # only the base case keeps its deck and restart files
+        kept = [Path(tmp_path, c.name, "modal.res").is_file() for c in cases]
+        assert kept == [True, False, False]
+        assert Path(tmp_path, cases[0].name, "modal.sim").is_file()
+        assert not Path(tmp_path, cases[1].name, "modal.inp").exists()
+    else:
+        decks = [Path(tmp_path, c.name, "modal.inp").read_text() for c in cases]
+        assert [d.startswith("*RESTART, READ") for d in decks] == [False, True, True]
+
+
+def test_run_sweep_restart_model_data(tmp_path, stand_in):
+    inputs = copy.deepcopy(ct.inputs)
+    inputs["System"] = stand_in._asdict()
+    inputs["Sweep"] = {"grid": {"Seabed.C_V": [10e6, 20e6]}}
+    cases = s.expand_cases(inputs)
+
+    # springs are model data, so the sweep is rejected before anything runs
+    with pytest.raises(ValueError, match="Seabed.C_V"):
+        s.run_sweep(tmp_path, cases, max_cpus=2, restart=True)
+    assert not Path(tmp_path, cases[0].name).exists()
+
+
+def test_restart_needs_sim_file(tmp_path, model, pipe, seabed, stand_in):
+    m.get_mode_shapes(tmp_path, model, pipe, seabed, stand_in, restart=True)
+    assert m.has_restart(tmp_path)
+
+    Path(tmp_path, "modal.sim").unlink()
+
+    assert not m.has_restart(tmp_path)
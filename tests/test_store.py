@@ -0,0 +1,117 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.modes as m
+import src.store as st
+import src.sweep as s
+import tests.conftest as ct
+
+
+def get_mode_set(first):
+    shapes = np.load("tests/refs/modes.npy")
+    frequencies = first + np.arange(len(shapes), dtype=float) / 10
+    return m.ModeSet(frequencies, shapes)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = st.ResultStore(Path(tmp_path, "store"), "a")
+    for n, (T, first) in enumerate([(50, 0.3), (90, 0.4), (100, 0.8)]):
+        parameters = {"Pipe.T": T, "Model.eigensolver": "lanczos"}
+        store.add(f"case_{n+1:03d}", parameters, get_mode_set(first))
+    return store
+
+
+def test_find(store):
+    directions = get_mode_set(0).directions
+    f_cross_flow = 0.3 + directions.index("cross-flow") / 10
+
+    assert store.find(("Pipe.T", ">", 80)) == ["a/case_002", "a/case_003"]
+    assert store.find(("Pipe.T", ">", 80), ("cross-flow", "<", 0.6)) == ["a/case_002"]
+    assert store.find(("cross-flow", "=", f_cross_flow)) == ["a/case_001"]
+    assert store.find(("f1", ">=", 0.4)) == ["a/case_002", "a/case_003"]
+    assert store.find(("Model.eigensolver", "=", "lanczos")) == [
+        "a/case_001",
+        "a/case_002",
+        "a/case_003",
+    ]
+    assert store.find() == ["a/case_001", "a/case_002", "a/case_003"]
+
+
+def test_find_unknown_operator(store):
+    with pytest.raises(ValueError):
+        store.find(("Pipe.T", "; DROP TABLE cases", 1))
+
+
+def test_add_replaces_case(store):
+    store.add("case_001", {"Pipe.T": 200}, get_mode_set(2))
+
+    assert store.get_parameters("case_001") == {"Pipe.T": 200}
+    assert store.get_modes("case_001")[1]["frequency"] == 2
+    assert store.find(("f1", ">", 1)) == ["a/case_001"]
+
+
+def test_add_keeps_other_runs(store):
+    other = st.ResultStore(store.path, "b")
+    other.add("case_001", {"Pipe.T": 200}, get_mode_set(2))
+
+    assert store.find(("Pipe.T", ">", 0)) == [
+        "a/case_001",
+        "a/case_002",
+        "a/case_003",
+        "b/case_001",
+    ]
+    assert store.find(run="b") == ["b/case_001"]
+    assert store.get_parameters("a/case_001")["Pipe.T"] == 50
+    assert store.get_modes("b/case_001")[1]["frequency"] == 2
+    assert other.get_modes("case_001")[1]["frequency"] == 2
+    with pytest.raises(ValueError):
+        st.ResultStore(store.path, "a/b")
+
+
+def test_get_modes(store):
+    modes = store.get_modes("a/case_002")
+    expected = get_mode_set(0.4)
+
+    assert list(modes) == list(expected)
+    assert np.allclose(modes.frequencies, expected.frequencies)
+    assert np.array_equal(modes.shapes, expected.shapes)
+    assert modes.directions == expected.directions
+    assert store.get_parameters("a/case_002") == {
+        "Pipe.T": 90,
+        "Model.eigensolver": "lanczos",
+    }
+    with pytest.raises(KeyError):
+        store.get_modes("case_999")
+
+
+def test_run_sweep_store(tmp_path):
+    inputs = copy.deepcopy(ct.inputs)
+    inputs["Model"]["element_length"] = 4
+    inputs["Sweep"] = {"grid": {"Pipe.T": [10, 50, 90]}}
+    cases = s.expand_cases(inputs)
+    store = st.ResultStore(Path(tmp_path, "store"))
+
+    result = s.run_sweep(
+        tmp_path,
+        cases,
+        max_cpus=3,
+        in_place_solver="native",
+        modal_solver="native",
+        store=store,
+    )
+
+    keys = [f"{store.run}/case_002", f"{store.run}/case_003"]
+    assert store.find(("Pipe.T", ">", 20)) == keys
+    # every resolved input is recorded, not only the swept ones
+    parameters = store.get_parameters("case_003")
+    assert parameters["Pipe.od"] == cases[2].pipe.od
+    assert parameters["Seabed.C_V"] == cases[2].seabed.C_V
+    assert parameters["Model.eigensolver"] == "lanczos"
+    assert parameters["Model.max_frequency"] is None
+    modes = store.get_modes("case_003")
+    assert np.allclose(modes.frequencies, result.frequencies[2])
+    assert modes.directions == result.directions[2]
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+import src.survey as sv
+import src.utils as utils
+
+
+@pytest.fixture
+def profile():
+    x = np.linspace(0, 200, 20001)
+    z = 0.01 * np.sin(x / 3)
+    # a 40 m span with a 1 m gap
+    z[(x > 80) & (x < 120)] -= 1
+    return np.column_stack([x, z])
+
+
+def test_simplify_profile(profile):
+    keep = sv.simplify_profile(profile, 0.05)
+    simplified = profile[keep]
+
+    assert len(simplified) < 100
+    assert sv.get_profile_error(profile, simplified) <= 0.05
+    assert np.any(np.isclose(simplified[:, 0], 80, atol=0.01))
+    assert np.any(np.isclose(simplified[:, 0], 120, atol=0.01))
+
+
+def test_simplify_profile_keeps_span_shoulders():
+    points = np.array([[0, 0], [10, 0.01], [20, -0.6], [30, 0.01], [40, 0]])
+
+    keep = sv.simplify_profile(points, 0.5)
+
+    # the chords either side of the span trough are within tolerance
+    assert keep.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_load_survey_csv(tmp_path, profile):
+    path = tmp_path / "survey.csv"
+    with open(path, "w") as f:
+        f.write("kp,easting,z\n")
+        for x, z in profile:
+            f.write(f"{x},0,{z}\n")
+
+    survey = sv.load_survey(path, tolerance=0.05, columns=(0, 2), chunk_size=1000)
+    whole = sv.load_survey(path, columns=(0, 2))
+
+    assert survey.raw_points == len(profile)
+    assert 0 < survey.error <= 0.05
+    assert survey.points[0].tolist() == profile[0].tolist()
+    assert survey.points[-1].tolist() == profile[-1].tolist()
+    assert np.all(np.diff(survey.points[:, 0]) > 0)
+    assert np.allclose(whole.points, profile)
+    assert whole.error == 0
+
+
+@pytest.mark.parametrize("name", ["survey.npy", "survey.bin"])
+def test_load_survey_binary(tmp_path, profile, name):
+    path = tmp_path / name
+    if name.endswith(".npy"):
+        np.save(path, profile)
+    else:
+        profile.astype("<f8").tofile(path)
+
+    survey = sv.load_survey(path, tolerance=0.05, chunk_size=4096)
+
+    assert survey.raw_points == len(profile)
+    assert sv.get_profile_error(profile, survey.points) <= 0.05
+
+
+def test_load_survey_unsorted(tmp_path, profile):
+    path = tmp_path / "survey.npy"
+    np.save(path, profile[::-1])
+
+    with pytest.raises(ValueError):
+        sv.load_survey(path)
+
+
+def test_apply_survey(tmp_path, profile):
+    path = tmp_path / "survey.npy"
+    np.save(path, profile)
+    inputs = {
+        "Model": {"element_length": 1, "bathymetry": []},
+        "Survey": {"path": str(path), "tolerance": 0.05},
+    }
+
+    inputs = sv.apply_survey(inputs, tmp_path)
+
+    assert len(inputs["Model"]["bathymetry"]) < 100
+    assert (tmp_path / "bathymetry.csv").read_text().startswith("# 20001 survey")
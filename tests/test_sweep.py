@@ -0,0 +1,100 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.sweep as s
+import tests.conftest as ct
+
+
+@pytest.fixture
+def inputs():
+    inputs = copy.deepcopy(ct.inputs)
+    inputs["Model"]["element_length"] = 4
+    inputs["Sweep"] = {
+        "grid": {"Pipe.T": [10, 50], "Seabed.C_V": [10e6, 20e6]},
+        "cases": [{"Pipe.rho_contents": 0}, {"Pipe.rho_contents": 1025}],
+    }
+    return inputs
+
+
+def test_expand_cases(inputs):
+    cases = s.expand_cases(inputs)
+
+    assert len(cases) == 8
+    assert cases[0].name == "case_001"
+    assert cases[0].parameters == {
+        "Pipe.rho_contents": 0,
+        "Pipe.T": 10,
+        "Seabed.C_V": 10e6,
+    }
+    assert cases[-1].pipe.rho_contents == 1025
+    assert cases[-1].pipe.T == 50
+    assert cases[-1].seabed.C_V == 20e6
+    assert cases[-1].model.element_length == 4
+
+
+def test_expand_cases_optional_field(inputs):
+    inputs["Sweep"] = {"grid": {"Model.number_of_modes": [4, 6]}}
+
+    cases = s.expand_cases(inputs)
+
+    assert [c.model.number_of_modes for c in cases] == [4, 6]
+
+
+def test_expand_cases_unknown_parameter(inputs):
+    inputs["Sweep"]["grid"]["Pipe.X"] = [1]
+
+    with pytest.raises(ValueError):
+        s.expand_cases(inputs)
+
+
+def test_get_workers(inputs):
+    cases = s.expand_cases(inputs)
+
+    assert s.get_workers(cases, max_cpus=8) == 4
+    assert s.get_workers(cases, max_cpus=8, max_tokens=12) == 2
+    assert s.get_workers(cases, max_cpus=8, abaqus=False) == 8
+    assert s.get_workers(cases[:1], max_cpus=1) == 1
+
+
+def test_check_restart(inputs):
+    inputs["Sweep"] = {
+        "cases": [
+            {},
+            {"Model.number_of_modes": 10},
+            {"Seabed.C_V": 20e6},
+        ]
+    }
+    cases = s.expand_cases(inputs)
+
+    s.check_restart(cases[:2])
+    with pytest.raises(ValueError, match="case_003 .* changes Seabed.C_V"):
+        s.check_restart(cases)
+
+
+def test_get_abaqus_tokens():
+    assert s.get_abaqus_tokens(1) == 5
+    assert s.get_abaqus_tokens(2) == 6
+    assert s.get_abaqus_tokens(8) == 12
+
+
+def test_run_sweep(tmp_path, inputs):
+    cases = s.expand_cases(inputs)[::4]
+
+    result = s.run_sweep(
+        tmp_path, cases, max_cpus=2, in_place_solver="native", modal_solver="native"
+    )
+
+    assert result.frequencies.shape == (2, 20)
+    assert np.all(np.isfinite(result.frequencies))
+    assert len(result.directions[0]) == 20
+    for case in cases:
+        assert Path(tmp_path, case.name, "gaps.dat").is_file()
+    assert not np.allclose(result.frequencies[0], result.frequencies[1])
+
+    result.to_csv(Path(tmp_path, "sweep_freqs.csv"))
+    lines = Path(tmp_path, "sweep_freqs.csv").read_text().splitlines()
+    assert lines[0].startswith("case,Pipe.T,Pipe.rho_contents,Seabed.C_V,f1,")
+    assert len(lines) == 3
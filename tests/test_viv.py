@@ -3,6 +3,9 @@ import os
 from pathlib import Path
 import shutil
 
+import numpy as np
+
+import src.metrics as mt
 import src.viv as viv
 import src.modes as m
 import tests.conftest as ct
@@ -10,14 +13,32 @@ import tests.conftest as ct
 
 def test_cli(mocker, model, pipe, seabed, system):
     mocked_get_mode_shapes = mocker.patch("src.viv.get_mode_shapes")
+    mocker.patch("src.viv.plt.savefig")
 
-    viv.cli("tests\\refs\\viv.toml")
+    viv.cli(Path("tests/refs/viv.toml"))
 
     mocked_get_mode_shapes.assert_called_once_with(
-        os.getcwd(), model, pipe, seabed, system
+        os.getcwd(), model, pipe, seabed, system, metrics=None, incremental=False
     )
 
 
+def test_cli_pipeline(tmp_path, mocker, model, pipe, seabed, system, capsys):
+    toml = Path("tests/refs/viv.toml").read_text()
+    Path(tmp_path, "viv.toml").write_text(toml + "\n[Pipeline]\nincremental = true\n")
+    Path(tmp_path, "dry_run.toml").write_text(toml + "\n[Pipeline]\ndry_run = true\n")
+    mocked_get_mode_shapes = mocker.patch("src.viv.get_mode_shapes")
+    mocker.patch("src.viv.plot_mode_shapes")
+
+    viv.cli(Path(tmp_path, "viv.toml"), tmp_path)
+    plan = viv.cli(Path(tmp_path, "dry_run.toml"), tmp_path)
+
+    mocked_get_mode_shapes.assert_called_once_with(
+        tmp_path, model, pipe, seabed, system, metrics=None, incremental=True
+    )
+    assert [(i.stage, i.run) for i in plan][0] == ("in_place", True)
+    assert "in_place     run   never run" in capsys.readouterr().out
+
+
 def test_plot_modes(tmp_path, model, pipe, seabed, system, mocker):
     ref_mode_shape_files = glob.glob("mode_*.dat", root_dir=Path("tests/refs"))
     for f in ref_mode_shape_files:
@@ -33,5 +54,24 @@ def test_plot_modes(tmp_path, model, pipe, seabed, system, mocker):
 
     mocked_savefig.assert_called_once_with(Path(tmp_path / "mode_shapes.png"))
     mocked_get_mode_shapes.assert_called_once_with(
-        tmp_path, model, pipe, seabed, system
+        tmp_path, model, pipe, seabed, system, metrics=None, incremental=False
+    )
+
+
+def test_cli_load_cases_metrics(tmp_path, mocker, model, pipe, seabed, system):
+    toml = Path("tests/refs/viv.toml").read_text()
+    toml += '\n[Metrics]\nenabled = true\n\n[[LoadCase]]\nname = "empty"\n'
+    toml += "rho_contents = 0\nPi = 0\nT = 0\n"
+    Path(tmp_path, "viv.toml").write_text(toml)
+    modes = m.ModeSet([1.0], np.zeros((1, 3, 3)))
+    mocked_get_mode_shapes = mocker.patch(
+        "src.viv.get_mode_shapes", return_value={"empty": modes}
     )
+    mocker.patch("src.viv.plot_mode_shapes")
+
+    viv.cli(Path(tmp_path, "viv.toml"), tmp_path)
+
+    metrics = mocked_get_mode_shapes.call_args.kwargs["metrics"]
+    assert metrics.path == Path(tmp_path, mt.METRICS_FILE)
+    [record] = mt.read_metrics(tmp_path)
+    assert record["stage"] == "plot"